@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+End-to-end client benchmark against the local stub ComfyUI server. No GUI and no real GPU server needed.
+
+    python -m benchmarks.run_benchmark --jobs 20 --concurrency 1 4 8 --output-size 50MB
+
+Reports submit latency, time from server-side completion to a result on disk (job done and
+/view download), HTTP requests per job, and throughput at each concurrency level.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import StubComfyServer, StubConfig
+from modules.comfy_client import ComfyClient
+from modules.monitor_core import MonitorCore
+from modules import workflows
+from modules.job_manager import JobManager, JobState
+from modules.trace_recorder import TraceRecorder
+
+WORKFLOW_PATH = os.path.join(workflows.WORKFLOW_DIR, "trellis2_img2mesh.json")
+
+
+def parse_size(text: str) -> int:
+    units = {"KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+    for suffix, factor in units.items():
+        if text.upper().endswith(suffix):
+            return int(float(text[:-len(suffix)]) * factor)
+    return int(text)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+def summarize(values) -> dict:
+    return {
+        "mean": statistics.fmean(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "max": max(values) if values else 0.0,
+    }
+
+
+def make_build_workflow(template: workflows.WorkflowTemplate):
+    def build_workflow(image_name: str, save_path: str, params: dict = None) -> dict:
+        return template.render(params, image=image_name, save_path=save_path)
+    return build_workflow
+
+
+async def start_session(config: StubConfig, work_dir: str):
+    server = await StubComfyServer(config).start()
+    client_id = str(uuid.uuid4())
+    client = ComfyClient([server.api_url], None, client_id, upload_index_path=os.path.join(work_dir, f"uploads_{client_id}.json"),
+                         object_info_dir=os.path.join(work_dir, "object_info"))
+    # 미리보기 프레임은 디코딩 없이 스로틀만 거치게 함
+    monitor = MonitorCore(server.api_url, client_id, decode_preview=lambda data, image_format: data)
+    client.pool.primary.monitor = monitor
+    monitor.queue_updated.connect(lambda queue_remaining: client.pool.update_queue(client.pool.primary, queue_remaining))
+    listen_task = asyncio.create_task(monitor.connect_and_listen())
+    for _ in range(100):
+        if monitor.connected:
+            break
+        await asyncio.sleep(0.02)
+    return server, client, monitor, listen_task
+
+
+async def end_session(server, client, monitor, listen_task):
+    monitor.stop()
+    listen_task.cancel()
+    await asyncio.gather(listen_task, return_exceptions=True)
+    await client.aclose()
+    await server.stop()
+
+
+async def bench_submit(args, template, work_dir) -> dict:
+    """Latency of a single POST /prompt round trip."""
+    config = StubConfig(node_delay=0.0, progress_steps=0, output_size=1024, workers=4, request_delay=args.request_delay)
+    server, client, monitor, listen_task = await start_session(config, work_dir)
+    build_workflow = make_build_workflow(template)
+    latencies = []
+    # 업로드 없이 /prompt만 재므로 입력 이미지는 이미 올라간 것으로 둠
+    server.uploads["input.png"] = 0
+    try:
+        for i in range(args.submits):
+            workflow = build_workflow("input.png", os.path.join(work_dir, "submit", f"{i}.glb"))
+            start = time.perf_counter()
+            await client.queue_prompt(workflow)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        await end_session(server, client, monitor, listen_task)
+    return summarize(latencies)
+
+
+async def bench_jobs(args, template, work_dir, concurrency: int, image_path: str) -> dict:
+    """Run args.jobs full generations through JobManager with `concurrency` jobs in flight."""
+    config = StubConfig(
+        node_delay=args.node_delay, progress_steps=args.progress_steps, output_size=args.output_size,
+        workers=args.server_workers, request_delay=args.request_delay, preview_size=args.preview_size,
+    )
+    server, client, monitor, listen_task = await start_session(config, work_dir)
+    tracer = None
+    if args.trace:
+        tracer = TraceRecorder(os.path.join(args.trace, f"c{concurrency}"), max_traces=args.jobs)
+        monitor.trace = tracer
+    manager = JobManager(client, make_build_workflow(template), max_in_flight=concurrency, job_timeout=600.0, tracer=tracer)
+    monitor.execution_start.connect(manager.on_execution_start)
+    monitor.node_executing.connect(manager.on_node_executing)
+    monitor.reconnected.connect(lambda: manager.on_reconnected(client.pool.primary))
+
+    out_dir = os.path.join(work_dir, f"c{concurrency}")
+    downloads = []
+    loaded_at = {}
+
+    async def download(job):
+        files = client.get_output_files(job.history.get("outputs", {}))
+        if files:
+            item = files[0]
+            url = client.get_view_url(item["filename"], item["subfolder"], item["type"], backend=job.backend)
+            if tracer:
+                tracer.begin(job.job_id, "download")
+            await client.download_file(url, os.path.join(out_dir, "view", item["filename"]))
+            if tracer:
+                tracer.end(job.job_id, "download")
+                manager.write_trace(job)
+        loaded_at[job.job_id] = time.time()
+
+    def on_job(job):
+        if job.state == JobState.DONE and args.download:
+            downloads.append(asyncio.ensure_future(download(job)))
+
+    manager.add_listener(on_job)
+    try:
+        start = time.perf_counter()
+        jobs = manager.submit([(image_path, os.path.join(out_dir, f"job_{i}.glb")) for i in range(args.jobs)])
+        await manager.wait(jobs)
+        await asyncio.gather(*downloads)
+        elapsed = time.perf_counter() - start
+        stats = client.connection_stats()
+    finally:
+        await end_session(server, client, monitor, listen_task)
+
+    done = [job for job in jobs if job.state == JobState.DONE]
+    to_done = [job.finished_at - server.finished_at[job.prompt_id] for job in done]
+    to_loaded = [loaded_at[job.job_id] - server.finished_at[job.prompt_id] for job in done if job.job_id in loaded_at]
+    return {
+        "concurrency": concurrency,
+        "jobs": len(jobs),
+        "failed": len(jobs) - len(done),
+        "elapsed": elapsed,
+        "throughput": len(done) / elapsed if elapsed else 0.0,
+        "completion_to_done": summarize(to_done),
+        "completion_to_loaded": summarize(to_loaded),
+        "requests_per_job": server.total_requests / max(len(jobs), 1),
+        "requests": dict(server.requests),
+        "connections": stats,
+    }
+
+
+def print_report(report: dict):
+    submit = report["submit_latency"]
+    print(f"Submit latency (ms): mean {submit['mean'] * 1000:.2f}  p50 {submit['p50'] * 1000:.2f}  "
+          f"p95 {submit['p95'] * 1000:.2f}  max {submit['max'] * 1000:.2f}")
+    print()
+    print(f"{'N':>4} {'jobs':>5} {'fail':>5} {'jobs/s':>8} {'done p50 ms':>12} {'done p95 ms':>12} "
+          f"{'loaded p50 ms':>14} {'req/job':>8} {'conn opened':>12}")
+    for run in report["runs"]:
+        print(f"{run['concurrency']:>4} {run['jobs']:>5} {run['failed']:>5} {run['throughput']:>8.2f} "
+              f"{run['completion_to_done']['p50'] * 1000:>12.1f} {run['completion_to_done']['p95'] * 1000:>12.1f} "
+              f"{run['completion_to_loaded']['p50'] * 1000:>14.1f} {run['requests_per_job']:>8.1f} "
+              f"{run['connections']['connections_opened']:>12}")
+
+
+async def main(args):
+    template = workflows.get_template(WORKFLOW_PATH)
+    with tempfile.TemporaryDirectory(prefix="comfy_bench_") as work_dir:
+        image_path = os.path.join(work_dir, "input.png")
+        with open(image_path, "wb") as f:
+            f.write(os.urandom(args.image_size))
+
+        report = {"config": vars(args), "submit_latency": await bench_submit(args, template, work_dir), "runs": []}
+        for concurrency in args.concurrency:
+            report["runs"].append(await bench_jobs(args, template, work_dir, concurrency, image_path))
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ComfyUI client against a local stub server.")
+    parser.add_argument("--jobs", type=int, default=20, help="jobs per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="in-flight job limits to test")
+    parser.add_argument("--submits", type=int, default=50, help="POST /prompt calls for the submit latency test")
+    parser.add_argument("--node-delay", type=float, default=0.02, help="seconds per workflow node on the stub server")
+    parser.add_argument("--progress-steps", type=int, default=10, help="progress events per sampler node")
+    parser.add_argument("--server-workers", type=int, default=1, help="prompts the stub server executes in parallel")
+    parser.add_argument("--request-delay", type=float, default=0.0, help="added latency per HTTP request (seconds)")
+    parser.add_argument("--output-size", type=parse_size, default=parse_size("8MB"), help="size of each generated file")
+    parser.add_argument("--image-size", type=parse_size, default=parse_size("2MB"), help="size of the uploaded input image")
+    parser.add_argument("--preview-size", type=parse_size, default=0, help="bytes per binary preview frame (0: none)")
+    parser.add_argument("--no-download", dest="download", action="store_false", help="skip the /view download step")
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--trace", help="write a Chrome trace JSON per job into this directory")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,393 @@
+# -*- coding: utf-8 -*-
+"""
+In-process fake ComfyUI server for benchmarking the client (asyncio + stdlib only).
+
+Implements GET/POST /prompt (with "number" / "front"), GET/POST /queue (delete), POST /interrupt,
+GET /history/{prompt_id}, GET /view (with Range), POST /upload/image, GET /object_info,
+GET /system_stats and the /ws event stream, with configurable execution delays and output sizes.
+"""
+import os
+import re
+import json
+import time
+import uuid
+import base64
+import struct
+import asyncio
+import hashlib
+from collections import Counter, OrderedDict
+from urllib.parse import urlsplit, parse_qs
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WORKFLOW_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "workflows")
+SCALAR_TYPES = {bool: "BOOLEAN", int: "INT", float: "FLOAT", str: "STRING"}
+STATUS_TEXT = {200: "OK", 206: "Partial Content", 400: "Bad Request", 404: "Not Found", 416: "Range Not Satisfiable"}
+
+
+class StubConfig:
+    def __init__(self, node_delay: float = 0.05, progress_steps: int = 5, output_size: int = 1024 * 1024,
+                 workers: int = 1, request_delay: float = 0.0, preview_size: int = 0, write_save_path: bool = True):
+        self.node_delay = node_delay            # seconds spent "executing" each node
+        self.progress_steps = progress_steps    # progress messages per sampler-like node
+        self.output_size = output_size          # bytes of the generated output file
+        self.workers = workers                  # prompts executed concurrently
+        self.request_delay = request_delay      # added latency for every HTTP request
+        self.preview_size = preview_size        # bytes per binary preview frame (0: none)
+        self.write_save_path = write_save_path  # emulate SaveToCustomPath writing to inputs.save_path
+
+
+def _ws_frame(opcode: int, payload: bytes) -> bytes:
+    length = len(payload)
+    if length < 126:
+        header = struct.pack(">BB", 0x80 | opcode, length)
+    elif length < 65536:
+        header = struct.pack(">BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack(">BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+def object_info_from_workflows(workflow_dir: str = WORKFLOW_DIR) -> dict:
+    """Permissive /object_info covering every node of the shipped workflows (types taken from their values)."""
+    info = {}
+    for entry in sorted(os.scandir(workflow_dir), key=lambda e: e.name):
+        if not entry.name.endswith(".json"):
+            continue
+        with open(entry.path, "r", encoding="utf-8") as f:
+            workflow = json.load(f)
+        for node in workflow.values():
+            node_info = info.setdefault(node["class_type"], {"input": {"required": {}}, "output": []})
+            for name, value in node.get("inputs", {}).items():
+                if isinstance(value, list):
+                    node_info["input"]["required"][name] = ["*"]
+                    source = workflow.get(str(value[0]))
+                    if source:
+                        outputs = info.setdefault(source["class_type"], {"input": {"required": {}}, "output": []})["output"]
+                        outputs.extend(["*"] * (value[1] + 1 - len(outputs)))
+                elif type(value) in SCALAR_TYPES:
+                    node_info["input"]["required"][name] = [SCALAR_TYPES[type(value)], {}]
+    return info
+
+
+class StubComfyServer:
+    def __init__(self, config: StubConfig = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or StubConfig()
+        self.host = host
+        self.port = port
+        self.requests = Counter()
+        self.history = {}
+        self.finished_at = {}
+        self.uploads = {}
+        self._pending = OrderedDict()
+        self._running = {}
+        self._executions = {}
+        self._interrupted = set()
+        # 대기 항목마다 토큰 하나 (실행 순서는 _pending의 number로 결정)
+        self._queue = asyncio.Queue()
+        self._sockets = {}
+        self._connections = {}
+        self._number = 0
+        self._server = None
+        self._workers = []
+        self._output = os.urandom(self.config.output_size)
+        self._object_info = None
+
+    @property
+    def api_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def queue_remaining(self) -> int:
+        return len(self._pending) + len(self._running)
+
+    @property
+    def total_requests(self) -> int:
+        return sum(count for route, count in self.requests.items() if route != "/ws")
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.config.workers)]
+        return self
+
+    async def stop(self):
+        # 프로세스 종료처럼 열린 연결(keep-alive 포함)을 모두 끊음
+        for task in self._workers:
+            task.cancel()
+        for writer in list(self._connections):
+            writer.close()
+        await asyncio.gather(*self._connections.values(), return_exceptions=True)
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    # ----- HTTP -----
+
+    async def _handle(self, reader, writer):
+        self._connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, value = line.decode("latin-1").split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                body = b""
+                if "content-length" in headers:
+                    body = await reader.readexactly(int(headers["content-length"]))
+                elif headers.get("transfer-encoding", "").lower() == "chunked":
+                    body = await self._read_chunked(reader)
+
+                url = urlsplit(target)
+                if url.path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                    self.requests["/ws"] += 1
+                    await self._websocket(reader, writer, headers, parse_qs(url.query))
+                    return
+
+                if self.config.request_delay:
+                    await asyncio.sleep(self.config.request_delay)
+                status, extra_headers, payload = await self._route(method, url.path, parse_qs(url.query), headers, body)
+                head = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}", f"Content-Length: {len(payload)}"]
+                head += [f"{name}: {value}" for name, value in extra_headers.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._connections.pop(writer, None)
+            writer.close()
+
+    async def _read_chunked(self, reader) -> bytes:
+        body = b""
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            if size == 0:
+                await reader.readline()
+                return body
+            body += await reader.readexactly(size)
+            await reader.readline()
+
+    def _json(self, data, status: int = 200):
+        return status, {"Content-Type": "application/json"}, json.dumps(data).encode("utf-8")
+
+    async def _route(self, method, path, query, headers, body):
+        if method == "POST" and path == "/prompt":
+            self.requests["/prompt"] += 1
+            return self._queue_prompt(json.loads(body))
+        if method == "GET" and path == "/prompt":
+            self.requests["/prompt"] += 1
+            return self._json({"exec_info": {"queue_remaining": self.queue_remaining}})
+        if method == "GET" and path == "/queue":
+            self.requests["/queue"] += 1
+            return self._json({
+                "queue_running": [item for item in self._running.values()],
+                "queue_pending": [item for item in self._pending.values()],
+            })
+        if method == "POST" and path == "/queue":
+            self.requests["/queue"] += 1
+            payload = json.loads(body or b"{}")
+            if payload.get("clear"):
+                self._pending.clear()
+            for prompt_id in payload.get("delete", []):
+                self._pending.pop(prompt_id, None)
+            self._broadcast_status()
+            return self._json({})
+        if method == "POST" and path == "/interrupt":
+            self.requests["/interrupt"] += 1
+            payload = json.loads(body or b"{}")
+            for prompt_id, task in list(self._executions.items()):
+                if payload.get("prompt_id") in (None, prompt_id):
+                    self._interrupted.add(prompt_id)
+                    task.cancel()
+            return self._json({})
+        if method == "GET" and path.startswith("/history/"):
+            self.requests["/history"] += 1
+            prompt_id = path[len("/history/"):]
+            return self._json({prompt_id: self.history[prompt_id]} if prompt_id in self.history else {})
+        if method == "GET" and path == "/view":
+            self.requests["/view"] += 1
+            return self._view(headers)
+        if method == "POST" and path == "/upload/image":
+            self.requests["/upload/image"] += 1
+            match = re.search(rb'filename="([^"]+)"', body)
+            name = match.group(1).decode("utf-8") if match else f"{uuid.uuid4().hex}.png"
+            self.uploads[name] = len(body)
+            return self._json({"name": name, "subfolder": "", "type": "input"})
+        if method == "GET" and path == "/object_info":
+            self.requests["/object_info"] += 1
+            if self._object_info is None:
+                self._object_info = object_info_from_workflows()
+            return self._json(self._object_info)
+        if method == "GET" and path == "/system_stats":
+            self.requests["/system_stats"] += 1
+            return self._json({"system": {"comfyui_version": "stub"}, "devices": []})
+        self.requests["other"] += 1
+        return self._json({"error": "not found"}, 404)
+
+    def _view(self, headers):
+        data = self._output
+        range_header = headers.get("range")
+        if range_header:
+            start = int(re.match(r"bytes=(\d+)-", range_header).group(1))
+            if start >= len(data):
+                return 416, {"Content-Range": f"bytes */{len(data)}"}, b""
+            return 206, {
+                "Content-Type": "application/octet-stream",
+                "Content-Range": f"bytes {start}-{len(data) - 1}/{len(data)}",
+            }, data[start:]
+        return 200, {"Content-Type": "application/octet-stream"}, data
+
+    def _queue_prompt(self, payload):
+        workflow = payload.get("prompt") or {}
+        client_id = payload.get("client_id", "")
+        node_errors = {
+            node_id: {
+                "errors": [{"type": "value_not_in_list", "message": "Value not in list",
+                            "details": f"image: '{node['inputs']['image']}' not in list"}],
+                "dependent_outputs": [],
+                "class_type": "LoadImage",
+            }
+            for node_id, node in workflow.items()
+            if node.get("class_type") == "LoadImage" and node.get("inputs", {}).get("image") not in self.uploads
+        }
+        if node_errors:
+            # ComfyUI처럼 input 폴더에 없는 이미지는 검증 단계에서 거부
+            return self._json({"error": {"type": "prompt_outputs_failed_validation",
+                                         "message": "Prompt outputs failed validation"},
+                               "node_errors": node_errors}, 400)
+        prompt_id = str(uuid.uuid4())
+        self._number += 1
+        number = payload.get("number", self._number)
+        if payload.get("front"):
+            number = -number
+        self._pending[prompt_id] = [number, prompt_id, workflow, {"client_id": client_id}, []]
+        self._queue.put_nowait(prompt_id)
+        self._broadcast_status()
+        return self._json({"prompt_id": prompt_id, "number": number, "node_errors": {}})
+
+    # ----- execution -----
+
+    async def _worker(self):
+        while True:
+            await self._queue.get()
+            if not self._pending:
+                # 삭제된 항목의 토큰
+                continue
+            prompt_id = min(self._pending.values(), key=lambda item: item[0])[1]
+            item = self._pending.pop(prompt_id)
+            self._running[prompt_id] = item
+            self._broadcast_status()
+            client_id = item[3]["client_id"]
+            self._executions[prompt_id] = asyncio.ensure_future(self._execute(prompt_id, item[2], client_id))
+            try:
+                await self._executions[prompt_id]
+            except asyncio.CancelledError:
+                if prompt_id not in self._interrupted:
+                    raise
+                self._interrupted.discard(prompt_id)
+                self.history[prompt_id] = {
+                    "prompt": item,
+                    "outputs": {},
+                    "status": {"status_str": "error", "completed": False, "messages": []},
+                }
+                self._send(client_id, "execution_interrupted", {"prompt_id": prompt_id, "node_id": "", "node_type": ""})
+            finally:
+                del self._executions[prompt_id]
+            del self._running[prompt_id]
+            self._broadcast_status()
+
+    async def _execute(self, prompt_id, workflow, client_id):
+        self._send(client_id, "execution_start", {"prompt_id": prompt_id, "timestamp": time.time()})
+        self._send(client_id, "execution_cached", {"nodes": [], "prompt_id": prompt_id})
+        outputs = {}
+        for node_id, node in workflow.items():
+            self._send(client_id, "executing", {"node": node_id, "display_node": node_id, "prompt_id": prompt_id})
+            inputs = node.get("inputs", {})
+            if "seed" in inputs and self.config.progress_steps:
+                steps = self.config.progress_steps
+                for step in range(1, steps + 1):
+                    await asyncio.sleep(self.config.node_delay / steps)
+                    self._send(client_id, "progress", {"value": step, "max": steps, "prompt_id": prompt_id, "node": node_id})
+                    if self.config.preview_size:
+                        self._send_binary(client_id, struct.pack(">II", 1, 1) + os.urandom(self.config.preview_size))
+            else:
+                await asyncio.sleep(self.config.node_delay)
+
+            save_path = inputs.get("save_path")
+            if isinstance(save_path, str) and save_path and self.config.write_save_path:
+                await asyncio.to_thread(self._write_output, save_path)
+            if "filename_prefix" in inputs or save_path:
+                result = {"filename": f"{prompt_id}.glb", "subfolder": "", "type": "output"}
+                outputs[node_id] = {"result": [result]}
+                self._send(client_id, "executed", {"node": node_id, "output": outputs[node_id], "prompt_id": prompt_id})
+
+        self.history[prompt_id] = {
+            "prompt": self._running[prompt_id],
+            "outputs": outputs,
+            "status": {"status_str": "success", "completed": True, "messages": []},
+        }
+        self.finished_at[prompt_id] = time.time()
+        self._send(client_id, "executing", {"node": None, "prompt_id": prompt_id})
+        self._send(client_id, "execution_success", {"prompt_id": prompt_id, "timestamp": time.time()})
+
+    def _write_output(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(self._output)
+
+    # ----- websocket -----
+
+    async def _websocket(self, reader, writer, headers, query):
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest()).decode()
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode("latin-1"))
+        client_id = query.get("clientId", [""])[0]
+        self._sockets.setdefault(client_id, []).append(writer)
+        self._send(client_id, "status", {"status": {"exec_info": {"queue_remaining": self.queue_remaining}}, "sid": client_id})
+        try:
+            while True:
+                first, second = await reader.readexactly(2)
+                opcode = first & 0x0F
+                length = second & 0x7F
+                if length == 126:
+                    length = struct.unpack(">H", await reader.readexactly(2))[0]
+                elif length == 127:
+                    length = struct.unpack(">Q", await reader.readexactly(8))[0]
+                mask = await reader.readexactly(4) if second & 0x80 else b"\x00" * 4
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(length)))
+                if opcode == 0x8:
+                    writer.write(_ws_frame(0x8, payload[:2]))
+                    break
+                if opcode == 0x9:
+                    writer.write(_ws_frame(0xA, payload))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._sockets.get(client_id, []).remove(writer)
+            writer.close()
+
+    def _send(self, client_id, msg_type, data):
+        frame = _ws_frame(0x1, json.dumps({"type": msg_type, "data": data}).encode("utf-8"))
+        for writer in self._sockets.get(client_id, []):
+            writer.write(frame)
+
+    def _send_binary(self, client_id, payload):
+        frame = _ws_frame(0x2, payload)
+        for writer in self._sockets.get(client_id, []):
+            writer.write(frame)
+
+    def _broadcast_status(self):
+        data = {"status": {"exec_info": {"queue_remaining": self.queue_remaining}}}
+        for client_id in list(self._sockets):
+            self._send(client_id, "status", data)
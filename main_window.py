@@ -1,15 +1,12 @@
 import os
-import json
-import httpx
 import mimetypes
 import traceback
 import asyncio
-import shutil
-import time
 import uuid
-import websockets
 from pathlib import Path
-from random import randint
+
+# PySide6 import 시간도 측정되도록 가장 먼저 import
+from modules.startup_profile import profile
 
 from PySide6.QtWidgets import *
 from PySide6.QtGui import *
@@ -20,70 +17,18 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__)))
 
 from modules import dragdrop_label
-from modules import threejs_viewer
 from modules import constants
-from MTHDLib.storage_paths import StoragePaths
-
+from modules import job_manager
+from modules import result_cache
+from modules import node_timing
+from modules import trace_recorder
+from modules import workflows
+from modules import mesh_compress
+from modules.comfy_client import ComfyClient
+from modules.comfy_monitor import ComfyMonitor
+from modules.job_manager import JobState, Lane
 
-class ComfyMonitor(QObject):
-    progress_updated = Signal(int, int, str)
-    status_updated = Signal(str)
-    queue_updated = Signal(int)
-    execution_start = Signal(str)
-    execution_success = Signal(str)
-    node_executing = Signal(str, str) 
-
-    def __init__(self, host, client_id):
-        super().__init__()
-        self.host = host
-        self.client_id = client_id
-        clean_host = host.replace("http://", "").replace("https://", "").rstrip("/")
-        self.ws_url = f"ws://{clean_host}/ws?clientId={client_id}"
-        self.running = True
-
-    async def connect_and_listen(self):
-        while self.running:
-            try:
-                async with websockets.connect(self.ws_url) as ws:
-                    self.status_updated.emit("Connected to ComfyUI Server.")
-                    while self.running:
-                        msg = await ws.recv()
-                        if not isinstance(msg, str): continue
-                        
-                        data = json.loads(msg)
-                        msg_type = data.get('type')
-                        payload = data.get('data', {})
-
-                        if msg_type == 'status':
-                            status = payload.get('status', {})
-                            exec_info = status.get('exec_info', {})
-                            queue_remaining = exec_info.get('queue_remaining', 0)
-                            self.queue_updated.emit(queue_remaining)
-
-                        elif msg_type == 'execution_start':
-                            self.execution_start.emit(payload.get('prompt_id'))
-
-                        elif msg_type == 'executing':
-                            node_id = payload.get('node')
-                            prompt_id = payload.get('prompt_id')
-                            if node_id:
-                                # [수정] 노드가 실행될 때 시그널 방출
-                                self.node_executing.emit(node_id, prompt_id)
-                            else:
-                                # node_id가 None이면 해당 프롬프트 완료됨
-                                self.execution_success.emit(prompt_id)
-
-                        elif msg_type == 'progress':
-                            val = payload.get('value', 0)
-                            max_val = payload.get('max', 1)
-                            self.progress_updated.emit(val, max_val, "Processing...")
-
-            except Exception as e:
-                self.status_updated.emit(f"Connection lost. Retrying... ({e})")
-                await asyncio.sleep(5)
-
-    def stop(self):
-        self.running = False
+profile.mark("imports")
 
 
 def get_unique_filename(directory: str, filename: str) -> str:
@@ -112,132 +57,26 @@ def get_unique_filename(directory: str, filename: str) -> str:
                 return new_filename
             counter += 1
             
-def load_fonts() -> None:
-    font_dir = os.path.join(os.path.dirname(__file__), constants.FONT_DIR)
+def load_fonts(names=None, exclude=()) -> None:
+    """Register font files from FONT_DIR (only `names` if given). Needs a QApplication."""
+    font_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), constants.FONT_DIR)
     if not os.path.exists(font_dir):
         return
     try:
-        installed_fonts = set(QFontDatabase().families())
-
         for entry in os.scandir(font_dir):
             if not (entry.is_file() and entry.name.lower().endswith((".ttf", ".otf"))):
                 continue
-            font_path = entry.path
-
-            font_id = QFontDatabase.addApplicationFont(font_path)
-            if font_id == -1:
+            if (names is not None and entry.name not in names) or entry.name in exclude:
                 continue
-            
-            for family in QFontDatabase.applicationFontFamilies(font_id):
-                if family not in installed_fonts:
-                    pass
+            QFontDatabase.addApplicationFont(entry.path)
     except Exception:
         print("Error loading fonts:", traceback.format_exc())
-load_fonts()
-
-class ComfyClient:
-    def __init__(self, api_url, log_path, client_id):
-        self.api_url = api_url
-        self.log_path = log_path
-        self.client_id = client_id
-    
-    async def queue_prompt(self, client, workflow: dict, timeout: float = 30.0) -> str:
-        payload = {
-            "prompt": workflow,
-            "client_id": self.client_id
-        }
-        res = await client.post(f"{self.api_url}/prompt", json=payload, timeout=timeout)
-        res.raise_for_status()
-        return res.json().get("prompt_id")
-
-    async def get_queue_info(self, client):
-        try:
-            res = await client.get(f"{self.api_url}/queue")
-            return res.json()
-        except:
-            return None
-        
-    async def get_history(self, client, prompt_id: str, timeout: float = 30.0):
-        # ... (기존 코드 동일) ...
-        res = await client.get(f"{self.api_url}/history/{prompt_id}", timeout=timeout)
-        res.raise_for_status()
-        return res.json().get(prompt_id)
-        
-    async def get_image_url(self, outputs: dict) -> str:
-        # ... (기존 코드 동일) ...
-        for node_output in outputs.values():
-            if "images" in node_output:
-                for image in node_output["images"]:
-                    filename = image.get("filename")
-                    subfolder = image.get("subfolder", "")
-                    if filename:
-                        return f"{self.api_url}/view?filename={filename}&subfolder={subfolder}&type=output", filename
-        return None, None
-    
-    async def get_mesh_paths(self, outputs: dict) -> list:
-        mesh_paths = []
-        for node_output in outputs.values():
-            if isinstance(node_output, dict) and 'result' in node_output:
-                result = node_output['result']
-                if isinstance(result, list):
-                    for item in result:
-                        # [수정] 딕셔너리 형태 처리 추가
-                        if isinstance(item, dict) and 'filename' in item:
-                            filename = item['filename']
-                            subfolder = item.get('subfolder', '')
-                            # 전체 경로 조합
-                            full_path = f"{constants.COMFY_OUTPUT_DIR}/{subfolder}/{filename}".replace("//", "/")
-                            if filename.endswith('.glb') or filename.endswith('.obj'):
-                                mesh_paths.append(full_path)
-                        # 문자열 형태 처리
-                        elif isinstance(item, str) and (item.endswith('.obj') or item.endswith('.glb')):
-                            mesh_paths.append(f"{constants.COMFY_OUTPUT_DIR}/{item}")
-                            
-                elif isinstance(result, str) and (result.endswith('.obj') or result.endswith('.glb')):
-                    mesh_paths.append(f"{constants.COMFY_OUTPUT_DIR}/{result}")
-        return mesh_paths
-
-    async def download_image(self, client, url: str, timeout: float = 30.0) -> bytes:
-        res = await client.get(url, timeout=timeout)
-        res.raise_for_status()
-        return res.content
-
-    async def wait_for_completion(self, client, prompt_id: str, log_callback, timeout: float = 30.0):
-        while True:
-            try:
-                queue_res = await client.get(f"{self.api_url}/queue", timeout=timeout)
-                queue_res.raise_for_status()
-                queue_data = queue_res.json()
-
-                active = queue_data.get("queue_running", []) + queue_data.get("queue_pending", [])
-                if not any(item[1] == prompt_id for item in active if isinstance(item, list) and len(item) > 1):
-                    break
-            except Exception as e:
-                log_callback(f"[Connection Error] {str(e)}")
-                # Continue trying instead of failing immediately
-                pass
-
-            if os.path.exists(self.log_path):
-                try:
-                    with open(self.log_path, "rb") as f:
-                        f.seek(-1024, os.SEEK_END)
-                        last_lines = f.read().decode(errors="ignore").splitlines()
-                        if last_lines:
-                            last_line = last_lines[-1].strip()
-                            if last_line:
-                                log_callback(last_line)
-                except Exception as e:
-                    log_callback(f"[Log Read Error] {str(e)}")
-
-            await asyncio.sleep(0.5)
-
 
 class MainWindow(QWidget):
     def __init__(self):
         super().__init__()
         self.client_id = str(uuid.uuid4())
-        self.my_current_prompt_id = None
-        self.current_workflow_data = {}
+        self.job_rows = {}
         
         self.set_vars()
         self.create_widgets()
@@ -262,29 +101,97 @@ class MainWindow(QWidget):
         ''')
         self.resize(1000, 700)
         
-        self.monitor = ComfyMonitor(self.constants.COMFY_API_URL, self.client_id)
+        self.monitors = []
+        for backend in self.client.backends:
+            backend.monitor = ComfyMonitor(backend.api_url, self.client_id)
+            self.monitors.append(backend.monitor)
+        self.tracer = None
+        if self.constants.TRACE_ENABLED:
+            self.tracer = trace_recorder.TraceRecorder(self.constants.TRACE_DIR)
+            for monitor in self.monitors:
+                monitor.trace = self.tracer
+        self.result_cache = None
+        if self.constants.RESULT_CACHE_ENABLED:
+            self.result_cache = result_cache.ResultCache(
+                self.constants.RESULT_CACHE_DIR,
+                self.constants.RESULT_CACHE_MAX_BYTES,
+                include_seeds=self.constants.RESULT_CACHE_INCLUDE_SEEDS,
+            )
+        compress = self.constants.MESH_COMPRESSION
+        if compress and mesh_compress.find_tool(compress) is None:
+            print(f"MESH_COMPRESSION is {compress!r} but no {compress} tool is installed; results are kept uncompressed.")
+            compress = ""
+        self.jobs = job_manager.JobManager(
+            self.client, self.build_workflow,
+            max_in_flight=self.constants.MAX_IN_FLIGHT_JOBS,
+            interactive_slots=self.constants.INTERACTIVE_SLOTS,
+            job_timeout=self.constants.JOB_TIMEOUT,
+            cache=self.result_cache,
+            timings=node_timing.NodeTimingDB(self.constants.NODE_TIMING_DB),
+            tracer=self.tracer,
+            submit_timeout=self.constants.SUBMIT_RETRY_TIMEOUT,
+            max_resubmits=self.constants.MAX_RESUBMITS,
+            validate=self.constants.VALIDATE_WORKFLOWS,
+            compress=compress,
+            lod_grids=self.constants.LOD_GRID_SIZES,
+            lod_min_faces=self.constants.LOD_MIN_FACES,
+            log_callback=self.append_server_log,
+        )
+        self.jobs.add_listener(self.on_job_updated)
         self.connect_monitor_signals()
         
         QTimer.singleShot(0, self.start_monitor)
+        self.health_timer = QTimer(self)
+        self.health_timer.setInterval(int(self.constants.BACKEND_HEALTH_INTERVAL * 1000))
+        self.health_timer.timeout.connect(self.refresh_backends)
+        self.health_timer.start()
+        # 이벤트가 없는 동안에도 남은 시간 표시 갱신
+        self.eta_timer = QTimer(self)
+        self.eta_timer.setInterval(1000)
+        self.eta_timer.timeout.connect(self.refresh_eta)
+        self.eta_timer.start()
+        profile.mark("window built")
 
     def set_vars(self):
         self.constants = constants
         self.log_path = self.constants.COMFY_LOG_PATH
-        self.client = ComfyClient(self.constants.COMFY_API_URL, self.log_path, self.client_id)
+        self.client = ComfyClient(self.constants.COMFY_API_URLS, self.log_path, self.client_id)
         self.mode = "Trellis2"
         self.last_log_line = ""
         self.image_path = ""
+        self.viewer_job = None
+        self.reconcile_pending = set()
+        self.reported_positions = {}
+        self.glb_viewer = None
+        self.pending_model = None
+        self.first_frame_shown = False
         
     def connect_monitor_signals(self):
-        self.monitor.progress_updated.connect(self.on_progress)
-        self.monitor.status_updated.connect(self.append_info_log)
-        self.monitor.execution_start.connect(self.on_execution_start)
-        self.monitor.queue_updated.connect(self.on_queue_update)
-        self.monitor.node_executing.connect(self.on_node_executing)
+        multiple = len(self.client.backends) > 1
+        for backend in self.client.backends:
+            monitor = backend.monitor
+            monitor.progress_updated.connect(self.on_progress)
+            if multiple:
+                monitor.status_updated.connect(lambda msg, b=backend: self.append_info_log(f"[{b.name}] {msg}"))
+            else:
+                monitor.status_updated.connect(self.append_info_log)
+            monitor.execution_start.connect(self.jobs.on_execution_start)
+            monitor.queue_updated.connect(lambda queue_remaining, b=backend: self.on_queue_update(b, queue_remaining))
+            monitor.node_executing.connect(self.jobs.on_node_executing)
+            monitor.prompt_progress.connect(self.jobs.on_progress)
+            monitor.nodes_cached.connect(self.jobs.on_nodes_cached)
+            monitor.execution_success.connect(self.jobs.on_execution_success)
+            monitor.reconnected.connect(lambda b=backend: self.jobs.on_reconnected(b))
+            monitor.preview_updated.connect(self.on_preview)
         
     @asyncSlot()
     async def start_monitor(self):
-        await self.monitor.connect_and_listen()
+        await asyncio.gather(*(monitor.connect_and_listen() for monitor in self.monitors))
+
+    @asyncSlot()
+    async def refresh_backends(self):
+        await self.client.refresh_backends()
+        self.update_queue_label()
 
     def create_widgets(self):
         self.setWindowTitle("ComfyUI Generator")
@@ -305,6 +212,25 @@ class MainWindow(QWidget):
         self.queue_label.setStyleSheet("color: #888; font-size: 11px;")
         
         self.generate_button = QPushButton("Generate")
+        self.batch_button = QPushButton("Batch...")
+        self.batch_button.setToolTip("Queue several images at once. Results are saved next to the save path, named after each image.")
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setToolTip("Cancel the selected jobs. Queued prompts are removed from the server queue, running ones are interrupted.")
+        self.cancel_button.setEnabled(False)
+        
+        self.jobs_table = QTableWidget(0, 4)
+        self.jobs_table.setHorizontalHeaderLabels(["Image", "State", "Node", "Progress"])
+        self.jobs_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.jobs_table.verticalHeader().setVisible(False)
+        self.jobs_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.jobs_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.jobs_table.setFixedHeight(140)
+        
+        self.preview_label = QLabel()
+        self.preview_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.preview_label.setFixedHeight(160)
+        self.preview_label.setStyleSheet("background-color: rgb(35, 35, 35); border-radius: 4px;")
+        self.preview_label.hide()
      
         self.img2mesh_group = QGroupBox("Image to Mesh")
         self.img2mesh_group.hide()
@@ -316,19 +242,27 @@ class MainWindow(QWidget):
         self.path_to_image_btn.setFixedWidth(30)
         
         self.path_to_save_le = QLineEdit(placeholderText="path/to/save/folder")
-        self.path_to_save_le.setText(StoragePaths().get_drive_from_unc(str(Path(StoragePaths().CC_MAIN) / "show")) + "/")
+        self.path_to_save_le.setText(self.show_root() + "/")
         self.path_to_save_btn = QPushButton("...")
         self.path_to_save_btn.setFixedWidth(30)
         self.path_to_save_open_btn = QPushButton()
         self.path_to_save_open_btn.setIcon(QIcon.fromTheme("folder-open"))
         self.path_to_save_open_btn.setFixedWidth(30)
         
+        self.reuse_cache_chk = QCheckBox("Reuse cached results")
+        self.reuse_cache_chk.setChecked(True)
+        self.reuse_cache_chk.setToolTip("Return the cached mesh for an image generated before with the same settings. "
+                                        "Uncheck to generate a new variation (it replaces the cached one).")
+        self.reuse_cache_chk.setVisible(self.constants.RESULT_CACHE_ENABLED)
+
         self.current_model_path = QLineEdit(placeholderText="path/to/current/model")
         self.current_model_path.setReadOnly(True)
         self.current_model_btn = QPushButton("...")
         
-        self.glb_viewer = threejs_viewer.ThreeJSGLBViewer()
-        self.glb_viewer.show()
+        # WebEngine 뷰어는 첫 프레임 이후 create_viewer()에서 생성
+        self.viewer_placeholder = QLabel("Loading viewer...")
+        self.viewer_placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.viewer_placeholder.setStyleSheet("background-color: #000000; color: #888;")
 
     def create_layout(self):
         self.main_layout = QHBoxLayout()
@@ -357,6 +291,7 @@ class MainWindow(QWidget):
         save_layout.addWidget(self.path_to_save_btn)
         save_layout.addWidget(self.path_to_save_open_btn)
         img2mesh_options_layout.addRow("Path to Save", save_layout)
+        img2mesh_options_layout.addRow("", self.reuse_cache_chk)
         
         self.img2mesh_group.setLayout(img2mesh_options_layout)
         self.sub_layout.addRow(self.img2mesh_group)
@@ -364,9 +299,16 @@ class MainWindow(QWidget):
         
         gen_layout = QVBoxLayout()
         gen_layout.addWidget(self.queue_label)
-        gen_layout.addWidget(self.generate_button)
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(self.generate_button, 1)
+        button_layout.addWidget(self.batch_button)
+        button_layout.addWidget(self.cancel_button)
+        gen_layout.addLayout(button_layout)
         self.sub_layout.addRow(gen_layout)
         
+        self.sub_layout.addRow(self.jobs_table)
+        self.sub_layout.addRow(self.preview_label)
+        
         self.sub_layout.addRow(self.log_text)
         
         self.stack = QStackedLayout()
@@ -374,7 +316,7 @@ class MainWindow(QWidget):
         path_to_glb_layout.addWidget(self.current_model_path)
         path_to_glb_layout.addWidget(self.current_model_btn)
         self.sub_layout2.addLayout(path_to_glb_layout)
-        self.stack.addWidget(self.glb_viewer)
+        self.stack.addWidget(self.viewer_placeholder)
         self.sub_layout2.addLayout(self.stack)
         
         self.main_layout.addWidget(self.sub_widget, 0)
@@ -385,6 +327,9 @@ class MainWindow(QWidget):
     def connections(self):
         self.path_to_save_btn.clicked.connect(self.on_browse)
         self.generate_button.clicked.connect(self.on_generate)
+        self.batch_button.clicked.connect(self.on_batch)
+        self.cancel_button.clicked.connect(self.on_cancel)
+        self.jobs_table.itemSelectionChanged.connect(self.update_cancel_button)
         self.mode_cmbx.currentTextChanged.connect(self.on_mode_change)
         self.dragdrop_label.file_dropped.connect(self.on_drop_image)
         self.path_to_image_btn.clicked.connect(self.on_browse)
@@ -402,7 +347,7 @@ class MainWindow(QWidget):
             default_path = self.path_to_save_le.text() or "V:/"
             path, _ = QFileDialog.getSaveFileName(self, "Select Save Path", default_path, "GLB Files (*.glb);;All Files (*)")
             if path:
-                show_path = os.path.join(StoragePaths().get_drive_from_unc(str(Path(StoragePaths().CC_MAIN) / "show")))
+                show_path = self.show_root()
                 if not path.startswith(show_path):
                     QMessageBox.warning(self, "Invalid Path", f"Please select a path within {show_path}")
                     return
@@ -419,7 +364,7 @@ class MainWindow(QWidget):
             file_path, _ = QFileDialog.getOpenFileName(self, "Select Model File", default_path, "GLB Files (*.glb);;All Files (*)")
             if file_path:
                 self.current_model_path.setText(file_path)
-                self.glb_viewer.load_model(file_path)
+                self.show_model(file_path)
             
     def on_drop_image(self, file_path: str):
         if not os.path.exists(file_path):
@@ -452,96 +397,118 @@ class MainWindow(QWidget):
             QMessageBox.warning(self, "Input Error", "Please select a save path.")
             return
         
-        self.generate_button.setEnabled(False)
-        timeout = 300.0
-        
-        try:
-            workflow = self.build_workflow()
-            self.current_workflow_data = workflow
-            
-            async with httpx.AsyncClient(timeout=timeout) as session:
-                prompt_id = await self.client.queue_prompt(session, workflow, timeout)
-                
-                if not prompt_id:
-                    self.append_error_log("Failed to queue prompt.")
-                    return
+        # 단일 생성은 배치보다 먼저 처리
+        self.jobs.submit([(self.image_path, self.path_to_save_le.text())], lane=Lane.INTERACTIVE,
+                         use_cache=self.reuse_cache_chk.isChecked())
 
-                self.my_current_prompt_id = prompt_id
-                self.append_info_log(f"Started generation with prompt_id: {prompt_id}")
-                
-                await self.check_queue_position()
-
-                start_time = time.time()
-                while True:
-                    if time.time() - start_time > timeout:
-                        raise TimeoutError("Generation timed out.")
-                    
-                    history = await self.client.get_history(session, prompt_id)
-                    if history:
-                        break
-                    
-                    await asyncio.sleep(1)
-
-                # 6. 결과 처리
-                result = history
-                outputs = result.get("outputs", {})
-                # mesh_paths = await self.client.get_mesh_paths(outputs)
-                
-                if self.mode == "Trellis2":
-                    save_path = self.path_to_save_le.text()
-                    if not os.path.exists(save_path):
-                        time.sleep(1)  # 잠시 대기 후 재시도
-                    if not os.path.exists(save_path):
-                        self.append_error_log("Save path does not exist.")
-                        self.generate_button.setEnabled(True)
-                        return
-                    self.current_model_path.setText(save_path)
-                    self.glb_viewer.load_model(save_path)
-                    self.append_success_log(f"Mesh file Loaded: {os.path.basename(save_path)}")
-                
-                # if mesh_paths:
-                #     source_path = mesh_paths[0]
-                #     target_path = self.path_to_save_le.text()
-                    
-                #     # 폴더 생성 및 파일 복사
-                #     os.makedirs(os.path.dirname(target_path), exist_ok=True)
-                    
-                #     if os.path.exists(source_path):
-                #         shutil.copy2(source_path, target_path)
-                #         self.append_info_log(f"File saved to: {target_path}")
-                        
-                #         # 뷰어 로드
-                #         self.current_model_path.setText(target_path)
-                #         self.glb_viewer.load_model(target_path)
-                #         self.append_info_log(f"Mesh file Loaded: {os.path.basename(target_path)}")
-                #     else:
-                #         self.append_error_log(f"Generated file not found at: {source_path}")
-                else:
-                    self.append_error_log("No mesh output found in history.")
-
-        except httpx.ReadTimeout:
-            self.append_error_log(f"Request timed out after {timeout}s.")
-        except httpx.ConnectTimeout:
-            self.append_error_log("Connection timed out. Check server.")
-        except Exception as e:
-            self.append_error_log(f"Error: {str(e)}")
-            traceback.print_exc()
-        finally:
-            self.generate_button.setEnabled(True)
-            self.my_current_prompt_id = None
-            
-            self.append_success_log("Generation process finished.")
+    @asyncSlot()
+    async def on_batch(self):
+        default_path = os.path.dirname(self.path_to_image_le.text()) if self.path_to_image_le.text() else os.path.expanduser("~")
+        file_paths, _ = QFileDialog.getOpenFileNames(self, "Select Image Files", default_path, "Image Files (*.png *.jpg *.jpeg *.bmp *.tiff)")
+        if not file_paths:
+            return
 
-    async def wait_for_my_job(self, client, prompt_id):
-        """내 작업이 끝날 때까지 대기 (Polling History)"""
-        while True:
-            try:
-                res = await client.get(f"{self.constants.COMFY_API_URL}/history/{prompt_id}")
-                if res.status_code == 200 and prompt_id in res.json():
-                    return
-            except:
-                pass
-            await asyncio.sleep(1)
+        save_path = self.path_to_save_le.text()
+        save_dir = os.path.dirname(save_path) if save_path.lower().endswith(".glb") else save_path
+        if not save_dir or not os.path.isdir(save_dir):
+            QMessageBox.warning(self, "Input Error", "Please select an existing save folder.")
+            return
+
+        inputs = []
+        used_names = set()
+        for file_path in file_paths:
+            filename = get_unique_filename(save_dir, os.path.splitext(os.path.basename(file_path))[0] + ".glb")
+            # 같은 배치 안에서 이름이 겹치는 경우
+            stem, ext = os.path.splitext(filename)
+            counter = 1
+            while filename in used_names:
+                filename = f"{stem}_{counter}{ext}"
+                counter += 1
+            used_names.add(filename)
+            inputs.append((file_path, os.path.join(save_dir, filename).replace("\\", "/")))
+
+        self.jobs.submit(inputs, use_cache=self.reuse_cache_chk.isChecked())
+        self.append_info_log(f"Queued {len(inputs)} images (max {self.jobs.max_in_flight} in flight).")
+
+    def selected_jobs(self) -> list:
+        rows = {index.row() for index in self.jobs_table.selectionModel().selectedRows()}
+        return [self.jobs.jobs[job_id] for job_id, row in self.job_rows.items() if row in rows]
+
+    def update_cancel_button(self):
+        self.cancel_button.setEnabled(any(not job.finished for job in self.selected_jobs()))
+
+    def on_cancel(self):
+        cancelled = sum(self.jobs.cancel(job) for job in self.selected_jobs())
+        if cancelled:
+            self.append_info_log(f"Cancelling {cancelled} job(s)...")
+
+    def on_job_updated(self, job):
+        self.update_job_row(job)
+        self.update_cancel_button()
+        name = os.path.basename(job.image_path)
+        if job.state == JobState.QUEUED:
+            where = f" on {job.backend.name}" if len(self.client.backends) > 1 else ""
+            self.append_info_log(f"Started generation for {name}{where} with prompt_id: {job.prompt_id}")
+            self.schedule_queue_reconcile(job.backend)
+        elif job.state == JobState.RUNNING:
+            if job.current_node:
+                self.append_processing_log(f"[{name}] Executing: {job.current_node}")
+            else:
+                self.append_processing_log(f"[{name}] Job started processing.")
+        elif job.state == JobState.DONE:
+            self.preview_label.hide()
+            self.current_model_path.setText(job.save_path)
+            if self.tracer:
+                self.viewer_job = job
+                self.tracer.begin(job.job_id, "viewer load")
+            self.show_model(job.save_path, job.lods)
+            source = " (from cache)" if job.cached else ""
+            self.append_success_log(f"Mesh file Loaded{source}: {os.path.basename(job.save_path)}")
+            if job.compression and job.compression[1] < job.compression[0]:
+                before, after = job.compression
+                self.append_info_log(f"[{name}] Compressed {before / 1024 ** 2:.1f} MB -> {after / 1024 ** 2:.1f} MB")
+        elif job.state == JobState.FAILED:
+            self.append_error_log(f"[{name}] {job.error}")
+        elif job.state == JobState.CANCELLED:
+            self.append_info_log(f"[{name}] Cancelled.")
+
+    def on_model_loaded(self, model_path):
+        job, self.viewer_job = self.viewer_job, None
+        if self.tracer and job and job.save_path == model_path:
+            self.tracer.end(job.job_id, "viewer load")
+            self.jobs.write_trace(job)
+
+    def update_job_row(self, job):
+        row = self.job_rows.get(job.job_id)
+        if row is None:
+            row = self.jobs_table.rowCount()
+            self.jobs_table.insertRow(row)
+            self.job_rows[job.job_id] = row
+            item = QTableWidgetItem(os.path.basename(job.image_path))
+            item.setToolTip(f"{job.image_path}\n-> {job.save_path}")
+            self.jobs_table.setItem(row, 0, item)
+        state_item = QTableWidgetItem(job.state)
+        if job.error:
+            state_item.setToolTip(job.error)
+        self.jobs_table.setItem(row, 1, state_item)
+        self.jobs_table.setItem(row, 2, QTableWidgetItem(job.current_node))
+        self.jobs_table.setItem(row, 3, QTableWidgetItem(self.format_job_progress(job)))
+
+    def format_job_progress(self, job) -> str:
+        if job.state == JobState.DONE:
+            return "100%"
+        remaining = job.remaining()
+        if remaining is None:
+            return ""
+        if job.state == JobState.QUEUED:
+            return f"ETA {node_timing.format_duration(remaining)}"
+        return f"{int(job.progress() * 100)}% · ETA {node_timing.format_duration(remaining)}"
+
+    def refresh_eta(self):
+        for job in self.jobs.active_jobs():
+            row = self.job_rows.get(job.job_id)
+            if row is not None:
+                self.jobs_table.setItem(row, 3, QTableWidgetItem(self.format_job_progress(job)))
 
     def append_processing_log(self, message: str):
         if message != self.last_log_line:
@@ -567,6 +534,14 @@ class MainWindow(QWidget):
             self.log_text.append(f"[Info] {message}")
             self.log_text.setTextColor(previous_color)
             
+    def append_server_log(self, message: str):
+        if message != self.last_log_line:
+            self.last_log_line = message
+            previous_color = self.log_text.textColor()
+            self.log_text.setTextColor(QColor(200, 200, 200))
+            self.log_text.append(f"[Server] {message}")
+            self.log_text.setTextColor(previous_color)
+
     def append_success_log(self, message: str):
         if message != self.last_log_line:
             self.last_log_line = message
@@ -575,51 +550,86 @@ class MainWindow(QWidget):
             self.log_text.append(f"[Success] {message}")
             self.log_text.setTextColor(previous_color)
 
-    def build_workflow(self) -> dict:
-        if self.mode == "Trellis2":
-            workflow_name = "trellis2_img2mesh"
-        else:
+    def build_workflow(self, image_name: str, save_path: str, params: dict = None) -> dict:
+        if self.mode not in workflows.MODE_WORKFLOWS:
             raise ValueError(f"Unsupported mode: {self.mode}")
-        path = os.path.join(os.path.dirname(__file__), f"workflows/{workflow_name}.json")
-        with open(path, "r", encoding="utf-8") as f:
-            workflow = json.load(f)
+        return workflows.build_workflow(workflows.MODE_WORKFLOWS[self.mode], params, image=image_name, save_path=save_path)
+    
+    def show_root(self) -> str:
+        paths = self.constants.storage_paths()
+        return paths.get_drive_from_unc(str(Path(paths.CC_MAIN) / "show"))
 
-        if self.mode == "Trellis2":
-            image = self.image_path
-            shutil.copy2(image, self.constants.COMFY_INPUT_DIR)
-            workflow["9"]["inputs"]["image"] = os.path.basename(image)
-            workflow["24"]["inputs"]["save_path"] = self.path_to_save_le.text()
-            workflow["3"]["inputs"]["seed"] = randint(0, 2**31-1)
-            workflow["5"]["inputs"]["seed"] = randint(0, 2**31-1)
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.first_frame_shown:
+            self.first_frame_shown = True
+            profile.mark("first frame")
+            QTimer.singleShot(0, self.create_viewer)
+
+    @asyncSlot()
+    async def create_viewer(self):
+        """Build the WebEngine viewer after the first frame; its files are prepared in a worker thread."""
+        from modules import threejs_viewer
+        self.glb_viewer = threejs_viewer.ThreeJSGLBViewer()
+        self.glb_viewer.model_loaded.connect(self.on_model_loaded)
+        self.glb_viewer.model_failed.connect(self.on_model_failed)
+        self.glb_viewer.preview_shown.connect(self.on_model_preview)
+        self.glb_viewer.loadFinished.connect(self.on_viewer_ready)
+        self.stack.addWidget(self.glb_viewer)
+        if self.stack.currentWidget() is self.viewer_placeholder:
+            self.stack.setCurrentWidget(self.glb_viewer)
+        if self.pending_model:
+            self.glb_viewer.load_model(*self.pending_model)
+            self.pending_model = None
+        profile.mark("viewer created")
+        load_fonts(exclude=self.constants.STARTUP_FONTS)
+        html_path = await asyncio.to_thread(threejs_viewer.prepare_assets)
+        profile.mark("viewer assets")
+        self.glb_viewer.set_page(html_path)
+
+    def on_model_preview(self, model_path, level):
+        job = self.viewer_job
+        if self.tracer and job and job.save_path == model_path:
+            self.tracer.instant(job.job_id, "viewer preview", level=level)
+
+    def on_model_failed(self, model_path, error):
+        self.viewer_job = None
+        self.append_error_log(f"Failed to load {os.path.basename(model_path)}: {error}")
+
+    def on_viewer_ready(self, ok):
+        self.glb_viewer.loadFinished.disconnect(self.on_viewer_ready)
+        profile.mark("viewer ready")
+        self.append_info_log(profile.summary())
+        if profile.enabled():
+            print(profile.report(), file=sys.stderr)
+
+    def show_model(self, model_path: str, lods=()):
+        """Load a model (and its preview LODs) into the viewer, or queue it until the viewer exists."""
+        if self.glb_viewer is None:
+            self.pending_model = (model_path, lods)
         else:
-            raise ValueError(f"Unsupported mode: {self.mode}")
-        return workflow
-    
+            self.glb_viewer.load_model(model_path, lods)
+
+    def closeEvent(self, event):
+        self.health_timer.stop()
+        self.eta_timer.stop()
+        for monitor in self.monitors:
+            monitor.stop()
+        if self.result_cache:
+            self.result_cache.flush()
+        if self.client.log_tailer:
+            self.client.log_tailer.stop()
+        asyncio.ensure_future(self.client.aclose())
+        super().closeEvent(event)
+
     def on_mode_change(self, mode: str):
         self.mode = mode
         if mode == "Trellis2":
             self.img2mesh_group.show()
-            self.stack.setCurrentWidget(self.glb_viewer)
+            self.stack.setCurrentWidget(self.glb_viewer if self.glb_viewer is not None else self.viewer_placeholder)
         else:
             QMessageBox.warning(self, "Mode Error", f"Unsupported mode selected: {mode}")
             
-    def on_execution_start(self, prompt_id):
-        if prompt_id == self.my_current_prompt_id:
-            self.append_processing_log("My job started processing.")
-        else:
-            if self.my_current_prompt_id:
-                asyncio.create_task(self.check_queue_position())
-
-    def on_node_executing(self, node_id, prompt_id):
-        if prompt_id == self.my_current_prompt_id:
-            node_title = "Unknown Node"
-            
-            if self.current_workflow_data and node_id in self.current_workflow_data:
-                node_data = self.current_workflow_data[node_id]
-                node_title = node_data.get("_meta", {}).get("title") or node_data.get("class_type", f"Node {node_id}")
-
-            self.append_processing_log(f"Executing: {node_title} (ID: {node_id})")
-
     def on_progress(self, value, max_val, msg):
         # if self.my_current_prompt_id:
         #     if self.progress_bar.maximum() == 0:
@@ -631,41 +641,62 @@ class MainWindow(QWidget):
         #         self.progress_bar.setFormat(f"Processing... {perc}%")
         pass
 
-    def on_queue_update(self, queue_remaining):
-        """전체 대기열 수 업데이트"""
-        self.queue_label.setText(f"Queue Pending: {queue_remaining}")
-
-    async def check_queue_position(self):
-        """내 작업이 대기열의 몇 번째인지 확인"""
-        if not self.my_current_prompt_id:
+    def on_preview(self, image, prompt_id):
+        if prompt_id and not self.jobs.owns(prompt_id):
             return
+        pixmap = QPixmap.fromImage(image).scaled(
+            self.preview_label.size(),
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+        self.preview_label.setPixmap(pixmap)
+        self.preview_label.show()
 
-        async with httpx.AsyncClient() as client:
-            queue_info = await self.client.get_queue_info(client)
-            if not queue_info: return
+    def on_queue_update(self, backend, queue_remaining):
+        """전체 대기열 수 업데이트"""
+        self.client.pool.update_queue(backend, queue_remaining)
+        self.update_queue_label()
+        self.report_queue_position(backend)
 
-            pending = queue_info.get('queue_pending', [])
-            running = queue_info.get('queue_running', [])
-            
-            for item in running:
-                if item[1] == self.my_current_prompt_id:
-                    return
+    def update_queue_label(self):
+        if len(self.client.backends) > 1:
+            self.queue_label.setText(f"Queue Pending: {self.client.pool.total_queue()} ({self.client.pool.describe()})")
+        else:
+            self.queue_label.setText(f"Queue Pending: {self.client.pool.primary.queue_remaining}")
 
-            position = 0
-            found = False
-            for item in pending:
-                position += 1
-                if item[1] == self.my_current_prompt_id:
-                    found = True
-                    break
-            
-            if found:
-                self.append_info_log(f"My job is queued at position {position}. Waiting for others to finish.")
+    def schedule_queue_reconcile(self, backend):
+        """Resync the backend's queue model once shortly after a burst of submissions."""
+        if backend in self.reconcile_pending:
+            return
+        self.reconcile_pending.add(backend)
+        QTimer.singleShot(1000, lambda: asyncio.ensure_future(self.reconcile_queue(backend)))
+
+    async def reconcile_queue(self, backend):
+        self.reconcile_pending.discard(backend)
+        if await self.client.reconcile_queue(backend) is not None:
+            self.report_queue_position(backend)
+
+    def report_queue_position(self, backend):
+        """내 작업 중 가장 앞선 것이 해당 서버 대기열의 몇 번째인지 표시"""
+        waiting = backend.queue.waiting()
+        position = min(waiting.values()) if waiting else None
+        if position == self.reported_positions.get(backend):
+            return
+        self.reported_positions[backend] = position
+        if position:
+            self.append_info_log(f"My next job is queued at position {position}. Waiting for others to finish.")
 
 
 if __name__ == "__main__":
     import sys
+    # QtWebEngine을 QApplication 생성 이후에 import하기 위해 필요
+    QCoreApplication.setAttribute(Qt.ApplicationAttribute.AA_ShareOpenGLContexts)
+    # 커스텀 스킴 등록은 QApplication 생성 전에만 가능
+    from modules.model_scheme import register_scheme
+    register_scheme()
     app = QApplication(sys.argv)
+    load_fonts(constants.STARTUP_FONTS)
+    profile.mark("app created")
     font = QFont("Lato Black")
     font.setHintingPreference(QFont.HintingPreference.PreferNoHinting)
     app.setFont(font)
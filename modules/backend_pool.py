@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import time
+from urllib.parse import urlparse
+
+from modules.queue_model import QueueModel
+
+
+class Backend:
+    def __init__(self, api_url: str):
+        self.api_url = api_url.rstrip("/")
+        self.monitor = None
+        self.queue_remaining = 0
+        self.queue = QueueModel()
+        self.reserved = 0
+        self.healthy = True
+        self.failures = 0
+        self.last_error = ""
+        self.last_ok = None
+
+    @property
+    def name(self) -> str:
+        return urlparse(self.api_url).netloc or self.api_url
+
+    @property
+    def connected(self) -> bool:
+        return bool(self.monitor and self.monitor.connected)
+
+    @property
+    def load(self) -> int:
+        # reserved: prompts this client is about to submit that the server has not reported yet
+        return self.queue_remaining + self.reserved
+
+    def __repr__(self):
+        return f"Backend({self.api_url!r}, load={self.load}, healthy={self.healthy})"
+
+
+class BackendPool:
+    """
+    A set of ComfyUI servers. New prompts go to the healthy backend with the shortest queue;
+    a backend that fails max_failures requests or health checks in a row is drained until it answers again
+    (unless every backend is down, in which case they are all tried).
+    """
+    def __init__(self, api_urls, max_failures: int = 2):
+        if isinstance(api_urls, str):
+            api_urls = [api_urls]
+        if not api_urls:
+            raise ValueError("At least one ComfyUI backend URL is required.")
+        self.backends = [Backend(url) for url in api_urls]
+        self.max_failures = max_failures
+        self._by_prompt = {}
+        self._numbers = {}
+        self._next = 0
+
+    @property
+    def primary(self) -> Backend:
+        return self.backends[0]
+
+    def get(self, api_url: str):
+        api_url = api_url.rstrip("/")
+        for backend in self.backends:
+            if backend.api_url == api_url:
+                return backend
+        return None
+
+    def select(self, exclude=()) -> Backend:
+        candidates = [b for b in self.backends if b.healthy and b not in exclude]
+        if not candidates:
+            # 모두 장애 상태면 다시 시도해 봐야 복구 여부를 알 수 있음
+            candidates = [b for b in self.backends if b not in exclude]
+        if not candidates:
+            raise RuntimeError("No healthy ComfyUI backend available.")
+        # 부하가 같으면 순서대로 돌아가며 배정
+        self._next = (self._next + 1) % len(self.backends)
+        order = {b: (i - self._next) % len(self.backends) for i, b in enumerate(self.backends)}
+        return min(candidates, key=lambda b: (not b.connected, b.load, order[b]))
+
+    def reserve(self, backend: Backend):
+        backend.reserved += 1
+
+    def release(self, backend: Backend):
+        backend.reserved = max(backend.reserved - 1, 0)
+
+    def assign(self, prompt_id: str, backend: Backend, number=None):
+        self._by_prompt[prompt_id] = backend
+        if number is not None:
+            self._numbers[prompt_id] = number
+
+    def forget(self, prompt_id: str):
+        self._by_prompt.pop(prompt_id, None)
+        self._numbers.pop(prompt_id, None)
+
+    def number_of(self, prompt_id: str):
+        """Queue number the server gave prompt_id (lower runs first), or None."""
+        return self._numbers.get(prompt_id)
+
+    def backend_for(self, prompt_id: str) -> Backend:
+        return self._by_prompt.get(prompt_id, self.primary)
+
+    def update_queue(self, backend: Backend, queue_remaining: int):
+        backend.queue_remaining = queue_remaining
+        backend.queue.on_status(queue_remaining)
+
+    def mark_ok(self, backend: Backend):
+        backend.failures = 0
+        backend.healthy = True
+        backend.last_ok = time.time()
+
+    def mark_failed(self, backend: Backend, error):
+        backend.failures += 1
+        backend.last_error = str(error)
+        if backend.failures >= self.max_failures:
+            backend.healthy = False
+
+    def total_queue(self) -> int:
+        return sum(b.queue_remaining for b in self.backends if b.healthy)
+
+    def describe(self) -> str:
+        parts = []
+        for backend in self.backends:
+            state = str(backend.queue_remaining) if backend.healthy else "down"
+            parts.append(f"{backend.name}: {state}")
+        return ", ".join(parts)
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Headless batch runner for farm scripts and cron jobs. Does not import Qt.
+
+    python -m modules.batch_cli manifest.json --concurrency 4
+    cat jobs.jsonl | python -m modules.batch_cli -
+
+The manifest is a JSON list of jobs, an object {"defaults": {...}, "jobs": [...]}, or JSON lines.
+Each job is {"image": "in.png", "output": "out.glb", "params": {"seed": 1, "7.texture_size": 4096}};
+params override workflow inputs: a name bound in workflows.WORKFLOW_BINDINGS ("seed"), "input" on every
+node that has it, or "Title.input" / "ClassType.input" / "node_id.input" for specific nodes. They are
+merged over the defaults' params.
+
+Writes one JSON object per line to stdout: "status" events from the server connections, a "job"
+event on each state change (and at most every --progress-interval seconds while running), and a
+final "summary". Exits with status 1 if any job failed or was cancelled. Ctrl+C cancels the jobs
+still queued or running on the server before exiting.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import constants
+from modules import workflows
+from modules import mesh_compress
+from modules.comfy_client import ComfyClient
+from modules.monitor_core import MonitorCore
+from modules.job_manager import JobManager, JobState
+from modules.object_info import WorkflowValidationError
+
+
+def load_manifest(path: str) -> list:
+    """Return [(image_path, save_path, params), ...] from a JSON / JSON-lines manifest ('-' for stdin)."""
+    if path == "-":
+        text = sys.stdin.read()
+        base_dir = os.getcwd()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        base_dir = os.path.dirname(os.path.abspath(path))
+
+    stripped = text.lstrip()
+    if stripped.startswith("[") or (stripped.startswith("{") and '"jobs"' in stripped):
+        data = json.loads(text)
+    else:
+        data = [json.loads(line) for line in text.splitlines() if line.strip()]
+    if isinstance(data, dict):
+        defaults, entries = data.get("defaults", {}), data.get("jobs", [])
+    else:
+        defaults, entries = {}, data
+
+    inputs = []
+    for index, entry in enumerate(entries):
+        merged = {**defaults, **entry, "params": {**defaults.get("params", {}), **entry.get("params", {})}}
+        if "image" not in merged or "output" not in merged:
+            raise ValueError(f"Manifest job {index} needs 'image' and 'output'.")
+        image = os.path.join(base_dir, os.path.expanduser(merged["image"]))
+        output = merged["output"]
+        if not os.path.isabs(output):
+            output = os.path.join(base_dir, output)
+        inputs.append((image, output, merged["params"]))
+    return inputs
+
+
+def emit(event: str, **fields):
+    print(json.dumps({"event": event, "time": time.time(), **fields}, default=str), flush=True)
+
+
+async def run(args) -> int:
+    inputs = load_manifest(args.manifest)
+    missing = [image for image, _, _ in inputs if not os.path.isfile(image)]
+    if missing:
+        for image in missing:
+            emit("error", message=f"Input image not found: {image}")
+        return 2
+
+    def build_workflow(image_name: str, save_path: str, params: dict = None) -> dict:
+        return workflows.build_workflow(args.workflow, params, image=image_name, save_path=save_path)
+
+    # 잘못된 파라미터는 서버에 올리기 전에 모두 보고
+    invalid = 0
+    for index, (image, output, params) in enumerate(inputs):
+        try:
+            workflows.get_template(args.workflow).validate(params)
+        except workflows.ParameterError as e:
+            invalid += 1
+            emit("error", index=index, message=str(e))
+    if invalid:
+        return 2
+
+    if args.compress and mesh_compress.find_tool(args.compress) is None:
+        emit("error", message=f"No {args.compress} tool found on PATH for --compress")
+        return 2
+
+    client_id = str(uuid.uuid4())
+    client = ComfyClient(args.server or constants.COMFY_API_URLS, None, client_id)
+    if args.validate:
+        # 서버 스키마와 맞지 않는 작업이 있으면 아무것도 제출하지 않음
+        for index, (image, output, params) in enumerate(inputs):
+            try:
+                await client.validate_workflow(build_workflow("", output, params))
+            except WorkflowValidationError as e:
+                invalid += 1
+                for error in e.errors:
+                    emit("error", index=index, message=error)
+        if invalid:
+            await client.aclose()
+            return 2
+    monitors = []
+    for backend in client.backends:
+        backend.monitor = MonitorCore(backend.api_url, client_id)
+        monitors.append(backend.monitor)
+
+    cache = None
+    if args.cache and constants.RESULT_CACHE_ENABLED:
+        from modules.result_cache import ResultCache
+        cache = ResultCache(constants.RESULT_CACHE_DIR, constants.RESULT_CACHE_MAX_BYTES,
+                            include_seeds=constants.RESULT_CACHE_INCLUDE_SEEDS)
+    timings = None
+    if args.eta:
+        from modules.node_timing import NodeTimingDB
+        timings = NodeTimingDB(constants.NODE_TIMING_DB)
+    tracer = None
+    if args.trace:
+        from modules.trace_recorder import TraceRecorder
+        tracer = TraceRecorder(args.trace, max_traces=max(len(inputs), 1))
+        for monitor in monitors:
+            monitor.trace = tracer
+
+    jobs = JobManager(
+        client, build_workflow, max_in_flight=args.concurrency, job_timeout=args.timeout,
+        cache=cache, timings=timings, tracer=tracer,
+        submit_timeout=constants.SUBMIT_RETRY_TIMEOUT, max_resubmits=constants.MAX_RESUBMITS,
+        validate=args.validate, compress=args.compress,
+        lod_grids=constants.LOD_GRID_SIZES if args.lods else (), lod_min_faces=constants.LOD_MIN_FACES,
+    )
+    for backend in client.backends:
+        monitor = backend.monitor
+        monitor.status_updated.connect(lambda message, b=backend: emit("status", backend=b.api_url, message=message))
+        monitor.queue_updated.connect(lambda queue_remaining, b=backend: client.pool.update_queue(b, queue_remaining))
+        monitor.execution_start.connect(jobs.on_execution_start)
+        monitor.node_executing.connect(jobs.on_node_executing)
+        monitor.prompt_progress.connect(jobs.on_progress)
+        monitor.nodes_cached.connect(jobs.on_nodes_cached)
+        monitor.execution_success.connect(jobs.on_execution_success)
+        monitor.reconnected.connect(lambda b=backend: jobs.on_reconnected(b))
+
+    index_of = {}
+    last_emit = {}
+
+    def on_job(job):
+        previous = last_emit.get(job.job_id)
+        now = time.monotonic()
+        # 같은 상태의 진행률 갱신은 progress_interval마다 한 번만 출력
+        if previous and previous[0] == job.state and now - previous[1] < args.progress_interval:
+            return
+        last_emit[job.job_id] = (job.state, now)
+        # submit()이 입력 순서대로 첫 알림을 보냄
+        index = index_of.setdefault(job.job_id, len(index_of))
+        emit("job", index=index, **job.to_dict())
+
+    jobs.add_listener(on_job)
+    listeners = [asyncio.create_task(monitor.connect_and_listen()) for monitor in monitors]
+    start = time.monotonic()
+    submitted = []
+    try:
+        submitted = jobs.submit(inputs)
+        await jobs.wait(submitted)
+    except asyncio.CancelledError:
+        # Ctrl+C: 서버에 남은 프롬프트를 지우고 종료
+        jobs.cancel_all()
+        await jobs.wait(submitted)
+    finally:
+        for monitor in monitors:
+            monitor.stop()
+        await asyncio.gather(*listeners, return_exceptions=True)
+        await client.aclose()
+        if cache:
+            cache.flush()
+
+    done = [job for job in submitted if job.state == JobState.DONE]
+    cancelled = sum(1 for job in submitted if job.state == JobState.CANCELLED)
+    emit("summary", jobs=len(submitted), done=len(done), failed=len(submitted) - len(done) - cancelled, cancelled=cancelled,
+         cached=sum(1 for job in done if job.cached), elapsed=time.monotonic() - start)
+    return 0 if len(done) == len(submitted) else 1
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a batch of ComfyUI generations without the GUI.")
+    parser.add_argument("manifest", help="JSON / JSON-lines manifest of jobs ('-' reads stdin)")
+    parser.add_argument("--server", action="append", help="ComfyUI server URL (repeatable; default: COMFY_API_URLS)")
+    parser.add_argument("--workflow", default=workflows.MODE_WORKFLOWS["Trellis2"], help="workflow name or .json path")
+    parser.add_argument("--concurrency", type=int, default=constants.MAX_IN_FLIGHT_JOBS, help="jobs in flight at once")
+    parser.add_argument("--timeout", type=float, default=constants.JOB_TIMEOUT, help="seconds to wait for each job")
+    parser.add_argument("--progress-interval", type=float, default=1.0, help="min seconds between progress lines per job")
+    parser.add_argument("--no-cache", dest="cache", action="store_false", help="do not use the local result cache")
+    parser.add_argument("--no-eta", dest="eta", action="store_false", help="do not record or predict node timings")
+    parser.add_argument("--no-validate", dest="validate", action="store_false",
+                        help="do not check workflows against the server's /object_info before submitting")
+    parser.add_argument("--compress", choices=sorted(mesh_compress.COMMANDS), default=constants.MESH_COMPRESSION or None,
+                        help="recompress result GLBs in place (default: MESH_COMPRESSION)")
+    parser.add_argument("--no-lods", dest="lods", action="store_false", help="do not build preview LOD levels of the results")
+    parser.add_argument("--trace", help="write a Chrome trace JSON per job into this directory")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    try:
+        return asyncio.run(run(parse_args(argv)))
+    except KeyboardInterrupt:
+        # run()이 취소 처리와 summary 출력을 마친 뒤
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import httpx
+import asyncio
+import mimetypes
+import importlib.util
+from pathlib import Path
+from urllib.parse import urlencode
+
+from modules import constants
+from modules import upload_index
+from modules import backend_pool
+from modules import downloader
+from modules import log_tailer
+from modules import object_info
+
+
+class ComfyClient:
+    def __init__(self, api_urls, log_path, client_id,
+                 max_connections: int = constants.COMFY_HTTP_MAX_CONNECTIONS,
+                 max_keepalive: int = constants.COMFY_HTTP_MAX_KEEPALIVE,
+                 keepalive_expiry: float = constants.COMFY_HTTP_KEEPALIVE_EXPIRY,
+                 timeout: float = constants.COMFY_HTTP_TIMEOUT,
+                 http2: bool = constants.COMFY_HTTP2,
+                 upload_index_path=constants.UPLOAD_INDEX_PATH,
+                 object_info_dir=constants.OBJECT_INFO_DIR):
+        self.pool = backend_pool.BackendPool(api_urls)
+        self.api_url = self.pool.primary.api_url
+        self.log_path = log_path
+        self.log_tailer = log_tailer.LogTailer(log_path) if log_path else None
+        self.client_id = client_id
+        self.upload_index = upload_index.UploadIndex(upload_index_path)
+        self.object_info_cache = object_info.ObjectInfoCache(object_info_dir, constants.OBJECT_INFO_MAX_AGE)
+        self._object_info = {}
+        self.stats = {"requests": 0, "connections_opened": 0}
+        # HTTP/2 is only negotiated when the optional h2 package is installed
+        # and the server offers it (ALPN); otherwise httpx falls back to HTTP/1.1.
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 10.0)),
+            http2=http2 and importlib.util.find_spec("h2") is not None,
+            event_hooks={"request": [self._on_request]},
+        )
+
+    async def _on_request(self, request):
+        self.stats["requests"] += 1
+        request.extensions["trace"] = self._on_trace
+
+    async def _on_trace(self, event_name, info):
+        if event_name == "connection.connect_tcp.complete":
+            self.stats["connections_opened"] += 1
+
+    def connection_stats(self) -> dict:
+        requests = self.stats["requests"]
+        opened = self.stats["connections_opened"]
+        return {"requests": requests, "connections_opened": opened, "connections_reused": max(requests - opened, 0)}
+
+    async def aclose(self):
+        await self.http.aclose()
+
+    @property
+    def backends(self) -> list:
+        return self.pool.backends
+
+    async def _request(self, backend, method: str, path: str, **kwargs):
+        """Send a request to backend and keep its health state up to date."""
+        try:
+            res = await self.http.request(method, f"{backend.api_url}{path}", **kwargs)
+        except httpx.TransportError as e:
+            self.pool.mark_failed(backend, e)
+            raise
+        if res.status_code >= 500:
+            self.pool.mark_failed(backend, f"HTTP {res.status_code}")
+        else:
+            self.pool.mark_ok(backend)
+        return res
+    
+    async def queue_prompt(self, workflow: dict, timeout: float = 30.0, backend=None, number: float = None) -> str:
+        """
+        Queue workflow and return its prompt_id. number places it in the server's queue
+        (lower runs first); by default it goes to the back.
+        """
+        backend = backend or self.pool.primary
+        payload = {
+            "prompt": workflow,
+            "client_id": self.client_id
+        }
+        if number is not None:
+            payload["number"] = number
+        res = await self._request(backend, "POST", "/prompt", json=payload, timeout=timeout)
+        res.raise_for_status()
+        data = res.json()
+        prompt_id = data.get("prompt_id")
+        if prompt_id:
+            self.pool.assign(prompt_id, backend, data.get("number"))
+            # 다음 status 메시지가 올 때까지 낙관적으로 반영
+            backend.queue_remaining += 1
+        return prompt_id
+
+    async def upload_image(self, image_path: str, timeout: float = 120.0, backend=None, digest: str = None) -> str:
+        """
+        Upload image_path to /upload/image named by its content hash and return
+        the value to use for LoadImage. Images already uploaded to this server are not sent again.
+        """
+        backend = backend or self.pool.primary
+        if digest is None:
+            digest = await asyncio.to_thread(upload_index.file_sha256, image_path)
+        entry = self.upload_index.get(backend.api_url, digest)
+        if not entry:
+            ext = os.path.splitext(image_path)[1].lower() or ".png"
+            filename = f"{digest[:32]}{ext}"
+            mimetype = mimetypes.guess_type(image_path)[0] or "application/octet-stream"
+            # 파일 읽기가 이벤트 루프를 막지 않도록 워커 스레드에서 읽음
+            data = await asyncio.to_thread(Path(image_path).read_bytes)
+            res = await self._request(
+                backend, "POST", "/upload/image",
+                files={"image": (filename, data, mimetype)},
+                data={"type": "input", "overwrite": "true"},
+                timeout=timeout,
+            )
+            res.raise_for_status()
+            info = res.json()
+            self.upload_index.put(backend.api_url, digest, info.get("name", filename), info.get("subfolder", ""))
+            entry = self.upload_index.get(backend.api_url, digest)
+
+        if entry["subfolder"]:
+            return f"{entry['subfolder']}/{entry['name']}"
+        return entry["name"]
+
+    def forget_upload(self, backend, digest: str):
+        """Drop the record of an upload the server no longer has, so the next upload_image sends it again."""
+        self.upload_index.forget(backend.api_url, digest)
+
+    async def _fetch_object_info(self, backend, refresh: bool, timeout: float):
+        version = None
+        try:
+            res = await self._request(backend, "GET", "/system_stats", timeout=timeout)
+            res.raise_for_status()
+            version = res.json().get("system", {}).get("comfyui_version")
+        except httpx.HTTPStatusError:
+            pass
+        entry = None if refresh else await asyncio.to_thread(self.object_info_cache.get, backend.api_url, version)
+        if entry is None:
+            res = await self._request(backend, "GET", "/object_info", timeout=timeout)
+            res.raise_for_status()
+            entry = await asyncio.to_thread(self.object_info_cache.put, backend.api_url, version, res.json())
+        return entry
+
+    async def get_object_info(self, backend=None, refresh: bool = False, timeout: float = 60.0):
+        """
+        Node schema of backend ({"version", "fetched_at", "object_info"}), or None if it cannot be fetched.
+        Loaded once per backend: from the disk cache while the server's ComfyUI version matches, else from /object_info.
+        """
+        backend = backend or self.pool.primary
+        task = self._object_info.get(backend.api_url)
+        if task is None or (refresh and task.done()):
+            # 동시에 제출되는 작업들이 한 번의 요청을 공유
+            task = asyncio.ensure_future(self._fetch_object_info(backend, refresh, timeout))
+            self._object_info[backend.api_url] = task
+        try:
+            return await asyncio.shield(task)
+        except (httpx.HTTPError, ValueError, OSError):
+            if self._object_info.get(backend.api_url) is task:
+                del self._object_info[backend.api_url]
+            return None
+
+    async def validate_workflow(self, workflow: dict, backend=None):
+        """
+        Raise WorkflowValidationError if backend would reject workflow. Nothing is checked when the
+        schema is unavailable. On errors a schema older than OBJECT_INFO_REFRESH_INTERVAL is fetched
+        again first, in case nodes or models were installed since.
+        """
+        entry = await self.get_object_info(backend)
+        if entry is None:
+            return
+        errors = object_info.validate_workflow(workflow, entry["object_info"])
+        if errors and time.time() - entry["fetched_at"] > constants.OBJECT_INFO_REFRESH_INTERVAL:
+            entry = await self.get_object_info(backend, refresh=True)
+            if entry is None:
+                return
+            errors = object_info.validate_workflow(workflow, entry["object_info"])
+        if errors:
+            raise object_info.WorkflowValidationError(errors)
+
+    async def cancel_prompt(self, prompt_id: str, backend=None, timeout: float = 30.0) -> str:
+        """
+        Stop prompt_id on its server: delete it from the queue if it is pending, interrupt it if it is running.
+        Returns "deleted", "interrupted", or "" if the server no longer has it.
+        """
+        backend = backend or self.pool.backend_for(prompt_id)
+        res = await self._request(backend, "GET", "/queue", timeout=timeout)
+        res.raise_for_status()
+        queue_info = res.json()
+        if any(item[1] == prompt_id for item in queue_info.get("queue_running", [])):
+            # prompt_id를 지정하면 그 사이 다른 프롬프트로 넘어간 경우 서버가 무시
+            res = await self._request(backend, "POST", "/interrupt", json={"prompt_id": prompt_id}, timeout=timeout)
+            res.raise_for_status()
+            return "interrupted"
+        if any(item[1] == prompt_id for item in queue_info.get("queue_pending", [])):
+            res = await self._request(backend, "POST", "/queue", json={"delete": [prompt_id]}, timeout=timeout)
+            res.raise_for_status()
+            backend.queue.remove(prompt_id)
+            # 삭제로 줄어든 큐 길이는 완료로 집계되므로 다음 갱신 때 /queue로 바로잡음
+            backend.queue.dirty = True
+            return "deleted"
+        return ""
+
+    async def get_queue_info(self, backend=None):
+        backend = backend or self.pool.primary
+        try:
+            res = await self._request(backend, "GET", "/queue")
+            return res.json()
+        except:
+            return None
+
+    async def refresh_backends(self, timeout: float = 5.0, reconcile_interval: float = constants.QUEUE_RECONCILE_INTERVAL):
+        """
+        Health-check every backend via the lightweight GET /prompt (queue length only).
+        The full /queue listing is fetched only for backends where we have prompts waiting
+        and the client-side queue model is due for reconciliation.
+        """
+        async def check(backend):
+            try:
+                res = await self._request(backend, "GET", "/prompt", timeout=timeout)
+                res.raise_for_status()
+                exec_info = res.json().get("exec_info", {})
+            except Exception:
+                return
+            self.pool.update_queue(backend, exec_info.get("queue_remaining", 0))
+            if backend.queue.needs_reconcile(reconcile_interval):
+                await self.reconcile_queue(backend, timeout)
+        await asyncio.gather(*(check(backend) for backend in self.pool.backends))
+
+    async def reconcile_queue(self, backend=None, timeout: float = 30.0):
+        """
+        Resync the backend's queue model (our prompts' positions) from GET /queue.
+        Returns the set of prompt ids running or pending on the server, or None if it could not be reached.
+        """
+        backend = backend or self.pool.primary
+        try:
+            res = await self._request(backend, "GET", "/queue", timeout=timeout)
+            res.raise_for_status()
+            queue_info = res.json()
+        except Exception:
+            return None
+        running = queue_info.get("queue_running", [])
+        pending = queue_info.get("queue_pending", [])
+        self.pool.update_queue(backend, len(running) + len(pending))
+        backend.queue.reconcile(running, pending)
+        return {item[1] for item in running} | {item[1] for item in pending}
+
+    async def get_history(self, prompt_id: str, timeout: float = 30.0):
+        # ... (기존 코드 동일) ...
+        backend = self.pool.backend_for(prompt_id)
+        res = await self._request(backend, "GET", f"/history/{prompt_id}", timeout=timeout)
+        res.raise_for_status()
+        return res.json().get(prompt_id)
+        
+    async def wait_for_history(self, prompt_id: str, done: asyncio.Future, is_connected,
+                               timeout: float = 300.0, poll_interval: float = 1.0, check_interval: float = 30.0):
+        """
+        Wait until prompt_id finishes and return its history entry.
+        Completion is driven by `done` (resolved by ComfyMonitor). /history is only
+        polled every poll_interval while the websocket is down, and every
+        check_interval as a safety net for events missed around submission.
+        An unreachable server (e.g. restarting) is waited out until the timeout.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise TimeoutError("Generation timed out.")
+
+            if done.done():
+                # 완료 이벤트가 /history 기록보다 먼저 도착한 경우 짧게 재시도
+                await asyncio.sleep(min(poll_interval, remaining))
+            else:
+                wait = check_interval if is_connected() else poll_interval
+                try:
+                    await asyncio.wait_for(asyncio.shield(done), min(wait, remaining))
+                except asyncio.TimeoutError:
+                    pass
+            if done.done():
+                done.result()
+
+            try:
+                history = await self.get_history(prompt_id)
+            except httpx.TransportError:
+                continue
+            if history:
+                return history
+
+    async def get_image_url(self, outputs: dict, backend=None) -> str:
+        # ... (기존 코드 동일) ...
+        api_url = (backend or self.pool.primary).api_url
+        for node_output in outputs.values():
+            if "images" in node_output:
+                for image in node_output["images"]:
+                    filename = image.get("filename")
+                    subfolder = image.get("subfolder", "")
+                    if filename:
+                        return f"{api_url}/view?filename={filename}&subfolder={subfolder}&type=output", filename
+        return None, None
+    
+    async def get_mesh_paths(self, outputs: dict) -> list:
+        mesh_paths = []
+        for node_output in outputs.values():
+            if isinstance(node_output, dict) and 'result' in node_output:
+                result = node_output['result']
+                if isinstance(result, list):
+                    for item in result:
+                        # [수정] 딕셔너리 형태 처리 추가
+                        if isinstance(item, dict) and 'filename' in item:
+                            filename = item['filename']
+                            subfolder = item.get('subfolder', '')
+                            # 전체 경로 조합
+                            full_path = f"{constants.COMFY_OUTPUT_DIR}/{subfolder}/{filename}".replace("//", "/")
+                            if filename.endswith('.glb') or filename.endswith('.obj'):
+                                mesh_paths.append(full_path)
+                        # 문자열 형태 처리
+                        elif isinstance(item, str) and (item.endswith('.obj') or item.endswith('.glb')):
+                            mesh_paths.append(f"{constants.COMFY_OUTPUT_DIR}/{item}")
+                            
+                elif isinstance(result, str) and (result.endswith('.obj') or result.endswith('.glb')):
+                    mesh_paths.append(f"{constants.COMFY_OUTPUT_DIR}/{result}")
+        return mesh_paths
+
+    def get_view_url(self, filename: str, subfolder: str = "", folder_type: str = "output", backend=None) -> str:
+        api_url = (backend or self.pool.primary).api_url
+        query = urlencode({"filename": filename, "subfolder": subfolder, "type": folder_type})
+        return f"{api_url}/view?{query}"
+
+    def get_output_files(self, outputs: dict) -> list:
+        """All {filename, subfolder, type} entries referenced by a history entry's outputs."""
+        files = []
+        for node_output in outputs.values():
+            if not isinstance(node_output, dict):
+                continue
+            for items in node_output.values():
+                if not isinstance(items, list):
+                    continue
+                for item in items:
+                    if isinstance(item, dict) and item.get("filename"):
+                        files.append({
+                            "filename": item["filename"],
+                            "subfolder": item.get("subfolder", ""),
+                            "type": item.get("type", "output"),
+                        })
+        return files
+
+    async def download_image(self, url: str, timeout: float = 30.0) -> bytes:
+        # 작은 미리보기 이미지 전용. 메시 등 큰 결과물은 download_file 사용
+        res = await self.http.get(url, timeout=timeout)
+        res.raise_for_status()
+        return res.content
+
+    async def download_file(self, url: str, dest_path: str, **kwargs) -> str:
+        """Stream a /view output to dest_path with resume and verification (see downloader.download_file)."""
+        return await downloader.download_file(self.http, url, dest_path, **kwargs)
+
+    async def forward_log(self, log_callback):
+        """Pass every new comfyui.log line to log_callback until cancelled."""
+        try:
+            async for line in self.log_tailer.subscribe():
+                line = line.strip()
+                if line:
+                    log_callback(line)
+        except Exception as e:
+            log_callback(f"[Log Read Error] {str(e)}")
+
+    async def wait_for_completion(self, prompt_id: str, log_callback, timeout: float = 30.0):
+        backend = self.pool.backend_for(prompt_id)
+        log_task = asyncio.create_task(self.forward_log(log_callback)) if self.log_tailer else None
+        try:
+            while True:
+                try:
+                    queue_res = await self._request(backend, "GET", "/queue", timeout=timeout)
+                    queue_res.raise_for_status()
+                    queue_data = queue_res.json()
+
+                    active = queue_data.get("queue_running", []) + queue_data.get("queue_pending", [])
+                    if not any(item[1] == prompt_id for item in active if isinstance(item, list) and len(item) > 1):
+                        break
+                except Exception as e:
+                    log_callback(f"[Connection Error] {str(e)}")
+                    # Continue trying instead of failing immediately
+                    pass
+
+                await asyncio.sleep(0.5)
+        finally:
+            if log_task:
+                log_task.cancel()
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtGui import QImage
+
+from modules.monitor_core import MonitorCore
+
+
+class ComfyMonitor(QObject, MonitorCore):
+    """Qt front end of MonitorCore: the same session, with its events delivered as Qt signals."""
+    progress_updated = Signal(int, int, str)
+    prompt_progress = Signal(str, str, int, int)
+    status_updated = Signal(str)
+    queue_updated = Signal(int)
+    execution_start = Signal(str)
+    execution_success = Signal(str)
+    reconnected = Signal()
+    node_executing = Signal(str, str)
+    nodes_cached = Signal(str, list)
+    preview_updated = Signal(QImage, str)
+
+    def __init__(self, host, client_id, **kwargs):
+        kwargs.setdefault("decode_preview", decode_preview)
+        # PySide6 forwards keyword arguments to the next class in the MRO (MonitorCore)
+        super().__init__(host=host, client_id=client_id, **kwargs)
+
+
+def decode_preview(data: bytes, image_format: str = ""):
+    """Decode preview image bytes into a QImage. Runs in a worker thread (QImage, unlike QPixmap, is thread-safe)."""
+    image = QImage()
+    loaded = image.loadFromData(data, image_format) if image_format else image.loadFromData(data)
+    return image if loaded else None
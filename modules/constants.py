@@ -1,16 +1,106 @@
 import os
 import datetime
+import functools
 from pathlib import Path
-from MTHDLib.storage_paths import StoragePaths
+
+
+@functools.lru_cache(maxsize=None)
+def storage_paths():
+    """Shared StoragePaths instance, created on first use."""
+    from MTHDLib.storage_paths import StoragePaths
+    return StoragePaths()
+
 
 # COMFY_ROOT = os.path.join(StoragePaths().MTHD_CORE, "StandAlone", "ComfyUI", "ComfyUI")
-COMFY_ROOT = Path(StoragePaths().MTHD_CORE) / "AI"
-COMFY_INPUT_DIR = COMFY_ROOT / "input"
-COMFY_OUTPUT_DIR = COMFY_ROOT / "output"
-COMFY_LOG_PATH = COMFY_ROOT / "comfyui.log"
+# COMFY_ROOT / COMFY_INPUT_DIR / COMFY_OUTPUT_DIR / COMFY_LOG_PATH are resolved on first access (see __getattr__)
+_STORAGE_CONSTANTS = {
+    "COMFY_ROOT": lambda: Path(storage_paths().MTHD_CORE) / "AI",
+    "COMFY_INPUT_DIR": lambda: __getattr__("COMFY_ROOT") / "input",
+    "COMFY_OUTPUT_DIR": lambda: __getattr__("COMFY_ROOT") / "output",
+    "COMFY_LOG_PATH": lambda: __getattr__("COMFY_ROOT") / "comfyui.log",
+}
+
+
+def __getattr__(name):
+    if name not in _STORAGE_CONSTANTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = _STORAGE_CONSTANTS[name]()
+    globals()[name] = value
+    return value
+
+
 COMFY_API_URL = "http://192.168.15.242:8187"
+# All ComfyUI GPU servers; new prompts go to the one with the shortest queue
+COMFY_API_URLS = [COMFY_API_URL]
+BACKEND_HEALTH_INTERVAL = 15.0
+# Websocket session: keepalive pings, reconnect backoff (seconds, exponential with jitter), frame size limit
+WS_PING_INTERVAL = 20.0
+WS_PING_TIMEOUT = 20.0
+WS_RECONNECT_MIN = 0.5
+WS_RECONNECT_MAX = 30.0
+WS_MAX_MESSAGE_SIZE = 32 * 1024 ** 2
+# Full /queue listings are fetched at most this often to correct the client-side queue model
+QUEUE_RECONCILE_INTERVAL = 60.0
+
+# Shared HTTP connection pool (ComfyClient)
+COMFY_HTTP_MAX_CONNECTIONS = 10
+COMFY_HTTP_MAX_KEEPALIVE = 5
+COMFY_HTTP_KEEPALIVE_EXPIRY = 60.0
+COMFY_HTTP_TIMEOUT = 30.0
+COMFY_HTTP2 = True
+
+# Live preview frames from the websocket
+PREVIEW_MAX_FPS = 5.0
+# Progress signals are coalesced to at most this many updates per second
+PROGRESS_MAX_RATE = 20.0
+
+# Job manager
+MAX_IN_FLIGHT_JOBS = 2
+# Extra slots only interactive (Generate) jobs may use, so they never wait behind a full batch
+INTERACTIVE_SLOTS = 1
+JOB_TIMEOUT = 1800.0
+# While every backend is unreachable (e.g. a server restart), submissions are retried for this long
+SUBMIT_RETRY_TIMEOUT = 120.0
+# Prompts the server lost (restart while queued/running) are submitted again this many times
+MAX_RESUBMITS = 2
+
+# Local client-side cache (upload index, etc.)
+CLIENT_CACHE_DIR = Path.home() / ".comfyui_generator"
+UPLOAD_INDEX_PATH = CLIENT_CACHE_DIR / "uploads.json"
+
+# Server node schemas (/object_info) used to validate workflows before they are queued.
+# Refetched when the server's ComfyUI version changes or the copy is older than OBJECT_INFO_MAX_AGE;
+# a workflow that fails validation is rechecked against a fresh copy if ours is older than OBJECT_INFO_REFRESH_INTERVAL
+VALIDATE_WORKFLOWS = True
+OBJECT_INFO_DIR = CLIENT_CACHE_DIR / "object_info"
+OBJECT_INFO_MAX_AGE = 24 * 3600.0
+OBJECT_INFO_REFRESH_INTERVAL = 60.0
+
+# Generated results keyed by workflow + input image hash
+RESULT_CACHE_ENABLED = True
+RESULT_CACHE_DIR = CLIENT_CACHE_DIR / "results"
+RESULT_CACHE_MAX_BYTES = 20 * 1024 ** 3
+# False: runs that differ only in seed reuse the same cached result
+RESULT_CACHE_INCLUDE_SEEDS = False
+
+# Recompress result GLBs in place: "" (off), "meshopt" (gltfpack / gltf-transform) or "draco" (gltf-transform / gltf-pipeline)
+MESH_COMPRESSION = ""
+
+# Preview levels of large results (vertex clustering grid sizes, coarsest first) shown while the full
+# mesh loads; cached in a .lod folder next to each result. () turns them off
+LOD_GRID_SIZES = (32, 128)
+LOD_MIN_FACES = 50000
+
+# Measured per-node durations used for progress / ETA prediction
+NODE_TIMING_DB = CLIENT_CACHE_DIR / "node_timings.sqlite3"
+
+# Instrumentation: write a Chrome trace-event JSON per job (chrome://tracing, ui.perfetto.dev)
+TRACE_ENABLED = False
+TRACE_DIR = CLIENT_CACHE_DIR / "traces"
 
-FONT_DIR = "/source/font"
+FONT_DIR = "source/font"
+# Font files the first frame needs; the rest of FONT_DIR is registered after the window is shown
+STARTUP_FONTS = ["Lato-Black.ttf"]
 
 COMFY_TXT2IMG_SAMPLERS = [
     "euler", "euler_cfg_pp", "euler_ancestral", "euler_ancestral_cfg_pp", "heun", "heunpp2","dpm_2", "dpm_2_ancestral",
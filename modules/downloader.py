@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import asyncio
+
+import httpx
+
+from modules.upload_index import file_sha256
+
+
+class DownloadError(Exception):
+    pass
+
+
+class _IncompleteTransfer(Exception):
+    pass
+
+
+def _total_size(res, offset: int):
+    """Full size of the resource from Content-Range (206) or Content-Length (200)."""
+    content_range = res.headers.get("content-range")
+    if content_range:
+        match = re.match(r"bytes\s+\d+-\d+/(\d+)", content_range)
+        if match:
+            return int(match.group(1))
+    content_length = res.headers.get("content-length")
+    if content_length is not None:
+        return offset + int(content_length)
+    return None
+
+
+async def download_file(http: httpx.AsyncClient, url: str, dest_path: str,
+                        expected_size: int = None, expected_sha256: str = None,
+                        chunk_size: int = 256 * 1024, retries: int = 5, backoff: float = 1.0,
+                        timeout=None, progress_callback=None) -> str:
+    """
+    Stream url into dest_path without holding the body in memory.
+    Data goes to <dest_path>.part; interrupted transfers resume with an HTTP Range request.
+    After the size (and optional sha256) check passes, the file is renamed into place atomically.
+    """
+    dest_dir = os.path.dirname(os.path.abspath(dest_path))
+    os.makedirs(dest_dir, exist_ok=True)
+    part_path = f"{dest_path}.part"
+    total = expected_size
+    attempt = 0
+
+    while True:
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            async with http.stream("GET", url, headers=headers, timeout=timeout) as res:
+                if res.status_code == 416:
+                    # 이미 전부 받았거나 .part 파일이 원본보다 큰 경우
+                    if total is not None and offset == total:
+                        break
+                    os.remove(part_path)
+                    continue
+                res.raise_for_status()
+                if offset and res.status_code != 206:
+                    # 서버가 Range를 무시하면 처음부터 다시 받음
+                    offset = 0
+                total = _total_size(res, offset) or total
+                # 파일 열기/쓰기는 워커 스레드에서 (네트워크 경로 쓰기가 이벤트 루프와 GUI를 막지 않도록)
+                f = await asyncio.to_thread(open, part_path, "ab" if offset else "wb")
+                try:
+                    async for chunk in res.aiter_bytes(chunk_size):
+                        await asyncio.to_thread(f.write, chunk)
+                        offset += len(chunk)
+                        if progress_callback:
+                            progress_callback(offset, total)
+                finally:
+                    await asyncio.to_thread(f.close)
+            if total is not None and offset < total:
+                raise _IncompleteTransfer(f"Transfer ended at {offset} of {total} bytes.")
+            break
+        except (httpx.TransportError, _IncompleteTransfer) as e:
+            attempt += 1
+            if attempt > retries:
+                raise DownloadError(f"Download failed after {retries} retries: {e}") from e
+            await asyncio.sleep(backoff * 2 ** (attempt - 1))
+
+    size = os.path.getsize(part_path)
+    if (expected_size is not None and size != expected_size) or (total is not None and size != total):
+        os.remove(part_path)
+        raise DownloadError(f"Size mismatch for {url}: got {size} bytes, expected {expected_size or total}.")
+    if expected_sha256:
+        digest = await asyncio.to_thread(file_sha256, part_path)
+        if digest != expected_sha256.lower():
+            os.remove(part_path)
+            raise DownloadError(f"Hash mismatch for {url}.")
+
+    os.replace(part_path, dest_path)
+    return dest_path
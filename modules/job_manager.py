@@ -0,0 +1,689 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import uuid
+import heapq
+import random
+import shutil
+import asyncio
+import itertools
+import traceback
+from collections import OrderedDict
+from contextlib import nullcontext, asynccontextmanager
+
+import httpx
+
+from modules import mesh_compress
+from modules.upload_index import file_sha256
+from modules.result_cache import copy_seeds
+from modules.node_timing import EtaTracker
+from modules.monitor_core import ExecutionError
+
+
+class JobState:
+    PENDING = "Pending"          # waiting for a free in-flight slot on this client
+    SUBMITTING = "Submitting"    # uploading the image / posting to /prompt
+    QUEUED = "Queued"            # accepted by the server, waiting in its queue
+    RUNNING = "Running"
+    DONE = "Done"
+    FAILED = "Failed"
+    CANCELLED = "Cancelled"
+
+    FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class Lane:
+    INTERACTIVE = "interactive"  # single jobs started by a user who is waiting for the result
+    BATCH = "batch"              # bulk runs
+
+    # 앞쪽 레인이 먼저 슬롯을 받음
+    ORDER = (INTERACTIVE, BATCH)
+
+
+class PromptLostError(RuntimeError):
+    """The server no longer knows a prompt it accepted (restarted while it was queued or running)."""
+
+
+class SlotPool:
+    """
+    In-flight slots for jobs, handed out by lane (Lane.ORDER) and first come first served within a lane.
+    Interactive jobs may also use `reserved` extra slots that batch jobs never take, so a job started
+    from the UI does not wait for a full batch to drain.
+    """
+    def __init__(self, size: int, reserved: int = 0):
+        self.size = size
+        self.reserved = reserved
+        self.in_use = 0
+        self._waiters = []
+        self._seq = itertools.count()
+
+    def _limit(self, lane: str) -> int:
+        return self.size + (self.reserved if lane == Lane.INTERACTIVE else 0)
+
+    def _wake(self):
+        while self._waiters:
+            _, _, lane, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            # 맨 앞 대기자가 못 들어가면 뒤의 (낮은 우선순위) 대기자도 못 들어감
+            if self.in_use >= self._limit(lane):
+                break
+            heapq.heappop(self._waiters)
+            self.in_use += 1
+            future.set_result(None)
+
+    async def acquire(self, lane: str):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (Lane.ORDER.index(lane), next(self._seq), lane, future))
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        self.in_use -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self, lane: str):
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class Job:
+    def __init__(self, image_path: str, save_path: str, params: dict = None, lane: str = Lane.BATCH,
+                 use_cache: bool = True):
+        self.job_id = str(uuid.uuid4())
+        self.image_path = image_path
+        self.save_path = save_path
+        self.params = params or {}
+        self.lane = lane
+        # False: always generate (new seed) and replace the cached result
+        self.use_cache = use_cache
+        self.state = JobState.PENDING
+        self.prompt_id = None
+        self.backend = None
+        self.workflow = {}
+        self.current_node = ""
+        self.history = None
+        self.cached = False
+        # (bytes before, bytes after) when the result GLB was recompressed
+        self.compression = None
+        # Preview LOD files of the result, coarsest first (mesh_lod)
+        self.lods = []
+        self.attempts = 0
+        # The input image was uploaded again after the server lost the indexed copy
+        self.reuploaded = False
+        self.error = ""
+        self.eta = None
+        self.created_at = time.time()
+        self.submitted_at = None
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self) -> bool:
+        return self.state in JobState.FINISHED
+
+    @property
+    def queue_position(self):
+        """Prompts ahead of this job on its server, from the backend's client-side queue model."""
+        if self.backend is None or not self.prompt_id:
+            return None
+        return self.backend.queue.position(self.prompt_id)
+
+    def progress(self) -> float:
+        """Predicted fraction of this job's server work that is done (0..1)."""
+        if self.state == JobState.DONE:
+            return 1.0
+        if self.eta is None or self.state != JobState.RUNNING:
+            return 0.0
+        return self.eta.fraction()
+
+    def remaining(self):
+        """Predicted seconds until this job finishes, including prompts queued ahead of it. None if unknown."""
+        if self.eta is None or self.finished:
+            return None
+        if self.state == JobState.RUNNING:
+            return self.eta.remaining()
+        # 앞선 프롬프트들도 같은 워크플로와 비슷한 시간이 걸린다고 가정
+        total = self.eta.total()
+        return total * ((self.queue_position or 0) + 1)
+
+    def node_title(self, node_id: str) -> str:
+        node_data = self.workflow.get(node_id)
+        if not node_data:
+            return f"Node {node_id}"
+        return node_data.get("_meta", {}).get("title") or node_data.get("class_type", f"Node {node_id}")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "image_path": self.image_path,
+            "save_path": self.save_path,
+            "params": self.params,
+            "lane": self.lane,
+            "state": self.state,
+            "prompt_id": self.prompt_id,
+            "backend": self.backend.api_url if self.backend else None,
+            "current_node": self.current_node,
+            "cached": self.cached,
+            "compression": self.compression,
+            "lods": self.lods,
+            "queue_position": self.queue_position,
+            "progress": self.progress(),
+            "remaining": self.remaining(),
+            "attempts": self.attempts,
+            "error": self.error,
+            "created_at": self.created_at,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Runs many generation jobs against one ComfyClient with a bounded number in flight.
+    Each job goes to the least-loaded backend of the client's pool. Per-prompt progress comes from
+    ComfyMonitor events (on_execution_start / on_node_executing), completion from the backend's
+    ComfyMonitor.watch_prompt. Listeners are called with the Job on every state change.
+    With a ResultCache, jobs whose workflow and input image match an earlier run are served from disk.
+    With a NodeTimingDB, each job gets an EtaTracker fed by the monitor's executing / progress /
+    cached events, and the measured node durations are recorded for later predictions.
+    With a TraceRecorder, each job's client phases are traced and written out when it finishes.
+    With validate, each workflow is checked against the backend's /object_info before it is queued.
+    With lod_grids, preview LOD levels of each result GLB are built next to it (before compression).
+    With compress ("draco" or "meshopt"), result GLBs are recompressed in place before they are cached.
+    Jobs run in lanes: interactive jobs get free slots before batch jobs, may use interactive_slots
+    extra slots, and are queued on the server ahead of this client's own waiting batch prompts.
+    cancel() deletes a job's prompt from the server queue or interrupts it if it is running.
+    After a monitor reconnects, resync() checks the backend's in-flight prompts against /queue and
+    /history; prompts lost in a server restart are submitted again (up to max_resubmits times).
+    """
+    def __init__(self, client, build_workflow, max_in_flight: int = 2, job_timeout: float = 1800.0,
+                 cache=None, timings=None, tracer=None, submit_timeout: float = 120.0, max_resubmits: int = 2,
+                 validate: bool = True, interactive_slots: int = 1, compress: str = "", lod_grids=(),
+                 lod_min_faces: int = 50000, log_callback=None):
+        self.client = client
+        self.build_workflow = build_workflow
+        self.cache = cache
+        self.timings = timings
+        self.tracer = tracer
+        self.submit_timeout = submit_timeout
+        self.max_resubmits = max_resubmits
+        self.validate = validate
+        self.interactive_slots = interactive_slots
+        self.compress = compress
+        self.lod_grids = tuple(lod_grids or ())
+        self.lod_min_faces = lod_min_faces
+        # Receives new server log lines (client.log_tailer) while a job is queued or running
+        self.log_callback = log_callback
+        self._log_task = None
+        self.max_in_flight = max_in_flight
+        self.job_timeout = job_timeout
+        self.jobs = {}
+        self._by_prompt = {}
+        # prompt_id -> job_id of recently cancelled prompts
+        self._cancelled = OrderedDict()
+        self._listeners = []
+        self._tasks = {}
+        self._slots = None
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def _notify(self, job: Job):
+        for callback in self._listeners:
+            try:
+                callback(job)
+            except Exception:
+                traceback.print_exc()
+
+    def _set_state(self, job: Job, state: str, error: str = ""):
+        job.state = state
+        if error:
+            job.error = error
+        if state == JobState.RUNNING and job.started_at is None:
+            job.started_at = time.time()
+        if state in JobState.FINISHED:
+            job.finished_at = time.time()
+            self._release_prompt(job)
+        if state == JobState.QUEUED or state in JobState.FINISHED:
+            self._follow_log()
+        self._notify(job)
+
+    def _follow_log(self):
+        """Forward the server log to log_callback only while one of our prompts is on a server."""
+        if self.log_callback is None or self.client.log_tailer is None:
+            return
+        on_server = any(job.state in (JobState.QUEUED, JobState.RUNNING) for job in self.jobs.values())
+        if on_server and (self._log_task is None or self._log_task.done()):
+            self._log_task = asyncio.ensure_future(self.client.forward_log(self.log_callback))
+        elif not on_server and self._log_task is not None:
+            # 마지막 구독이 끝나면 LogTailer도 파일 감시를 멈춤
+            self._log_task.cancel()
+            self._log_task = None
+
+    def _release_prompt(self, job: Job):
+        """Drop the lookups kept for job's prompt once it has finished."""
+        if not job.prompt_id:
+            return
+        self.client.pool.forget(job.prompt_id)
+        self._by_prompt.pop(job.prompt_id, None)
+        if job.state == JobState.CANCELLED:
+            # 큐에서 지우는 사이 실행이 시작될 수 있으므로 execution_start까지 잠시 기억
+            self._cancelled[job.prompt_id] = job.job_id
+            while len(self._cancelled) > 256:
+                self._cancelled.popitem(last=False)
+
+    def submit(self, inputs, lane: str = Lane.BATCH, use_cache: bool = True) -> list:
+        """
+        Queue (image_path, save_path) or (image_path, save_path, params) tuples in lane; params are
+        passed to build_workflow(image_name, save_path, params). With use_cache=False the result cache
+        is not looked up (the new result still replaces the cached one). Returns the created jobs; they run in the background.
+        """
+        if self._slots is None:
+            self._slots = SlotPool(self.max_in_flight, self.interactive_slots)
+        jobs = []
+        for image_path, save_path, *params in inputs:
+            job = Job(image_path, save_path, *params, lane=lane, use_cache=use_cache)
+            self.jobs[job.job_id] = job
+            jobs.append(job)
+            self._notify(job)
+            self._tasks[job.job_id] = asyncio.create_task(self._run_job(job))
+        return jobs
+
+    async def wait(self, jobs=None):
+        """Wait until the given jobs (default: all) have finished."""
+        ids = [job.job_id for job in jobs] if jobs is not None else list(self._tasks)
+        tasks = [self._tasks[job_id] for job_id in ids if job_id in self._tasks]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def cancel(self, job: Job) -> bool:
+        """Cancel job wherever it is (waiting for a slot, uploading, queued or running). False if it already finished."""
+        task = self._tasks.get(job.job_id)
+        if task is None or task.done() or job.finished:
+            return False
+        task.cancel()
+        return True
+
+    def cancel_all(self, lane: str = None) -> int:
+        """Cancel every unfinished job (in lane, if given). Returns how many were cancelled."""
+        return sum(self.cancel(job) for job in self.active_jobs() if lane is None or job.lane == lane)
+
+    def get_job(self, prompt_id: str):
+        job_id = self._by_prompt.get(prompt_id)
+        return self.jobs.get(job_id) if job_id else None
+
+    def owns(self, prompt_id: str) -> bool:
+        return prompt_id in self._by_prompt
+
+    def active_jobs(self) -> list:
+        return [job for job in self.jobs.values() if not job.finished]
+
+    def _span(self, job: Job, name: str, **args):
+        return self.tracer.span(job.job_id, name, **args) if self.tracer else nullcontext()
+
+    def write_trace(self, job: Job):
+        if not self.tracer:
+            return None
+        try:
+            return self.tracer.write(job.job_id)
+        except OSError:
+            traceback.print_exc()
+            return None
+
+    def on_execution_start(self, prompt_id):
+        cancelled = self._cancelled.pop(prompt_id, None)
+        if cancelled:
+            # 큐에서 삭제하기 직전에 실행이 시작된 경우
+            asyncio.ensure_future(self._cancel_on_server(self.jobs[cancelled]))
+            return
+        job = self.get_job(prompt_id)
+        if job and not job.finished:
+            job.backend.queue.on_started(prompt_id)
+            self._set_state(job, JobState.RUNNING)
+
+    def on_node_executing(self, node_id, prompt_id):
+        job = self.get_job(prompt_id)
+        if job and not job.finished:
+            job.current_node = job.node_title(node_id)
+            if job.eta:
+                job.eta.node_started(node_id)
+            self._set_state(job, JobState.RUNNING)
+
+    def on_progress(self, prompt_id, node_id, value, max_val):
+        job = self.get_job(prompt_id)
+        if job and job.eta and not job.finished:
+            job.eta.progress(node_id, value, max_val)
+            self._notify(job)
+
+    def on_nodes_cached(self, prompt_id, node_ids):
+        job = self.get_job(prompt_id)
+        if job and job.eta:
+            job.eta.cached(node_ids)
+
+    def on_execution_success(self, prompt_id):
+        job = self.get_job(prompt_id)
+        if job and job.eta:
+            job.eta.finished()
+
+    def on_reconnected(self, backend):
+        asyncio.ensure_future(self.resync(backend))
+
+    async def resync(self, backend):
+        """Settle in-flight prompts on backend whose completion events may have been missed while disconnected."""
+        jobs = [
+            job for job in self.active_jobs()
+            if job.backend is backend and job.prompt_id and job.state in (JobState.QUEUED, JobState.RUNNING)
+        ]
+        monitor = backend.monitor
+        if not jobs or monitor is None:
+            return
+        on_server = await self.client.reconcile_queue(backend)
+        if on_server is None:
+            return
+        for job in jobs:
+            if job.prompt_id in on_server or job.finished:
+                continue
+            try:
+                history = await self.client.get_history(job.prompt_id)
+            except httpx.HTTPError:
+                continue
+            if history:
+                status = history.get("status", {})
+                error = None
+                if status.get("status_str") == "error":
+                    # 놓친 execution_error는 history의 상태 메시지에서 복원
+                    details = next((data for name, data in status.get("messages", []) if name == "execution_error"), {})
+                    node_type = details.get("node_type") or ""
+                    message = details.get("exception_message") or "Execution failed on server."
+                    error = ExecutionError(f"{node_type}: {message}" if node_type else message, node_type, details.get("node_id") or "")
+                monitor.resolve_prompt(job.prompt_id, error)
+            else:
+                monitor.resolve_prompt(job.prompt_id, PromptLostError(f"Prompt {job.prompt_id} was lost by the server."))
+
+    async def _build_lods(self, job: Job):
+        if not self.lod_grids or not job.save_path.lower().endswith(".glb"):
+            return
+        # NumPy는 LOD를 쓸 때만 필요
+        from modules import mesh_lod
+        try:
+            with self._span(job, "lod"):
+                job.lods = await asyncio.to_thread(mesh_lod.build_lods, job.save_path, self.lod_grids, self.lod_min_faces)
+        except mesh_lod.LodError:
+            # 압축된 결과 등은 LOD 없이 표시
+            job.lods = []
+        except OSError:
+            traceback.print_exc()
+
+    async def _from_cache(self, job: Job, cache_key: str) -> bool:
+        cached_path = await asyncio.to_thread(self.cache.get, cache_key)
+        if not cached_path:
+            return False
+        try:
+            await asyncio.to_thread(self._copy_cached, job, cache_key, cached_path)
+        except OSError:
+            # 다른 스레드의 제거나 수동 삭제로 사라진 항목: 지우고 새로 생성
+            traceback.print_exc()
+            await asyncio.to_thread(self.cache.remove, cache_key)
+            return False
+        job.cached = True
+        return True
+
+    def _copy_cached(self, job: Job, cache_key: str, cached_path: str):
+        """Copy a cached result, and its LOD files, to job.save_path. Blocking."""
+        os.makedirs(os.path.dirname(os.path.abspath(job.save_path)), exist_ok=True)
+        shutil.copyfile(cached_path, job.save_path)
+        extras = self.cache.extras(cache_key)
+        if extras:
+            from modules.mesh_lod import LOD_DIR
+            # 결과 뒤에 복사해 LOD가 결과보다 새 파일로 남게 함 (압축된 결과는 LOD를 다시 만들 수 없음)
+            directory, name = os.path.split(os.path.abspath(job.save_path))
+            lod_dir = os.path.join(directory, LOD_DIR)
+            os.makedirs(lod_dir, exist_ok=True)
+            stem = os.path.splitext(name)[0]
+            for extra_name, extra_path in extras.items():
+                shutil.copyfile(extra_path, os.path.join(lod_dir, f"{stem}.{extra_name}"))
+
+    async def _submit(self, job: Job, digest: str = None):
+        """_submit_once, retried with exponential backoff for up to submit_timeout while every backend is unreachable."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.submit_timeout
+        delay = 1.0
+        while True:
+            try:
+                await self._submit_once(job, digest)
+                return
+            except httpx.TransportError:
+                if loop.time() + delay > deadline:
+                    raise
+            await asyncio.sleep(delay / 2 + random.uniform(0, delay / 2))
+            delay = min(delay * 2, 30.0)
+
+    @staticmethod
+    def _lost_upload(job: Job, error: Exception) -> bool:
+        """Whether error was raised by the workflow's LoadImage node (e.g. the server's input folder was cleared)."""
+        if isinstance(error, ExecutionError):
+            return error.node_type == "LoadImage"
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 400:
+            try:
+                node_errors = error.response.json().get("node_errors") or {}
+            except ValueError:
+                return False
+            return any(
+                (node_error.get("class_type") or job.workflow.get(node_id, {}).get("class_type")) == "LoadImage"
+                for node_id, node_error in node_errors.items()
+            )
+        return False
+
+    async def _submit_once(self, job: Job, digest: str = None):
+        """Upload and queue job on the least-loaded backend, moving on to the next one if it is unreachable."""
+        pool = self.client.pool
+        if digest is None:
+            digest = await asyncio.to_thread(file_sha256, job.image_path)
+        tried = []
+        while True:
+            backend = pool.select(exclude=tried)
+            pool.reserve(backend)
+            try:
+                with self._span(job, "upload", backend=backend.name):
+                    image_name = await self.client.upload_image(job.image_path, backend=backend, digest=digest)
+                workflow = self.build_workflow(image_name, job.save_path, job.params)
+                job.workflow = copy_seeds(workflow, job.workflow) if job.workflow else workflow
+                if self.validate:
+                    # 서버 큐에 들어가기 전에 /object_info 기준으로 검증
+                    with self._span(job, "validate", backend=backend.name):
+                        await self.client.validate_workflow(job.workflow, backend)
+                with self._span(job, "submit", backend=backend.name):
+                    job.prompt_id = await self.client.queue_prompt(
+                        job.workflow, backend=backend, number=self._queue_number(job, backend)
+                    )
+                job.backend = backend
+                return
+            except httpx.TransportError:
+                tried.append(backend)
+                if len(tried) >= len(pool.backends):
+                    raise
+            except httpx.HTTPStatusError as e:
+                if job.reuploaded or not self._lost_upload(job, e):
+                    raise
+                # 색인에 있던 업로드를 서버가 잃어버린 경우 한 번만 다시 업로드
+                self.client.forget_upload(backend, digest)
+                job.reuploaded = True
+            finally:
+                pool.release(backend)
+
+    def _waiting_batch_prompts(self, backend) -> list:
+        return [
+            other.prompt_id for other in self.active_jobs()
+            if other.lane == Lane.BATCH and other.backend is backend and other.state == JobState.QUEUED
+            and self.client.pool.number_of(other.prompt_id) is not None
+        ]
+
+    def _queue_number(self, job: Job, backend):
+        """Server queue number that puts an interactive job just ahead of our waiting batch prompts (None: back of the queue)."""
+        if job.lane != Lane.INTERACTIVE:
+            return None
+        numbers = [self.client.pool.number_of(prompt_id) for prompt_id in self._waiting_batch_prompts(backend)]
+        # 다른 클라이언트가 먼저 넣은 프롬프트보다는 앞서지 않음
+        return min(numbers) - 0.5 if numbers else None
+
+    async def _cancel_on_server(self, job: Job):
+        try:
+            result = await self.client.cancel_prompt(job.prompt_id, job.backend)
+        except httpx.HTTPError:
+            return
+        if result and self.tracer:
+            self.tracer.instant(job.job_id, f"cancel: {result}", prompt_id=job.prompt_id)
+
+    async def _wait(self, job: Job):
+        """Register the freshly queued prompt and wait for its history entry."""
+        if not job.prompt_id:
+            raise RuntimeError("Failed to queue prompt.")
+        job.submitted_at = time.time()
+        self._by_prompt[job.prompt_id] = job.job_id
+        if self.tracer:
+            self.tracer.link_prompt(job.job_id, job.prompt_id, job.workflow)
+        if self.timings:
+            job.eta = EtaTracker(job.workflow, self.timings)
+        monitor = job.backend.monitor
+        # 모니터가 없으면 완료 이벤트 없이 /history 폴링으로 대기
+        done = monitor.watch_prompt(job.prompt_id) if monitor else asyncio.get_running_loop().create_future()
+        queue = job.backend.queue
+        number = self.client.pool.number_of(job.prompt_id)
+        behind = [
+            prompt_id for prompt_id in self._waiting_batch_prompts(job.backend)
+            if number is not None and self.client.pool.number_of(prompt_id) > number
+        ]
+        if behind:
+            # 뒤로 밀린 배치 프롬프트 중 가장 앞선 자리를 차지
+            queue.add(job.prompt_id, ahead=min(queue.position(prompt_id) or 0 for prompt_id in behind))
+            for prompt_id in behind:
+                queue.add(prompt_id, ahead=(queue.position(prompt_id) or 0) + 1)
+        else:
+            # queue_prompt가 이미 낙관적으로 +1 했으므로 자신은 제외
+            queue.add(job.prompt_id, ahead=job.backend.queue_remaining - 1)
+        self._set_state(job, JobState.QUEUED)
+
+        try:
+            with self._span(job, "wait"):
+                job.history = await self.client.wait_for_history(
+                    job.prompt_id, done, lambda: job.backend.connected, self.job_timeout
+                )
+        finally:
+            job.backend.queue.remove(job.prompt_id)
+            if monitor:
+                monitor.unwatch_prompt(job.prompt_id)
+
+    async def _run_job(self, job: Job):
+        if self.tracer:
+            self.tracer.start(job.job_id, os.path.basename(job.image_path))
+            self.tracer.begin(job.job_id, "slot wait")
+        try:
+            await self._slots.acquire(job.lane)
+        except asyncio.CancelledError:
+            # 슬롯을 기다리는 중에 취소됨
+            self._set_state(job, JobState.CANCELLED)
+            return
+        try:
+            if self.tracer:
+                self.tracer.end(job.job_id, "slot wait")
+            try:
+                self._set_state(job, JobState.SUBMITTING)
+                with self._span(job, "hash"):
+                    digest = await asyncio.to_thread(file_sha256, job.image_path)
+                # 시드는 여기서 한 번만 정해 캐시 키와 제출하는 워크플로가 같은 값을 씀
+                job.workflow = self.build_workflow("", job.save_path, job.params)
+                cache_key = None
+                if self.cache:
+                    cache_key = self.cache.make_key(job.workflow, digest)
+                if cache_key and job.use_cache:
+                    with self._span(job, "cache lookup"):
+                        hit = await self._from_cache(job, cache_key)
+                    if hit:
+                        await self._build_lods(job)
+                        self._set_state(job, JobState.DONE)
+                        return
+
+                while True:
+                    await self._submit(job, digest)
+                    job.attempts += 1
+                    try:
+                        await self._wait(job)
+                        break
+                    except PromptLostError:
+                        # 서버 재시작으로 사라진 프롬프트는 다시 제출
+                        if job.attempts > self.max_resubmits:
+                            raise
+                        if self.tracer:
+                            self.tracer.instant(job.job_id, "resubmit", prompt_id=job.prompt_id)
+                    except ExecutionError as e:
+                        if job.reuploaded or not self._lost_upload(job, e):
+                            raise
+                        # LoadImage가 입력 이미지를 찾지 못함: 업로드 기록을 지우고 다시 제출
+                        self.client.forget_upload(job.backend, digest)
+                        job.reuploaded = True
+                        if self.tracer:
+                            self.tracer.instant(job.job_id, "reupload", prompt_id=job.prompt_id)
+                    self._by_prompt.pop(job.prompt_id, None)
+                    self.client.pool.forget(job.prompt_id)
+                    job.prompt_id = None
+                    job.current_node = ""
+                    self._set_state(job, JobState.SUBMITTING)
+
+                # SaveToCustomPath가 네트워크 경로에 기록하므로 잠시 대기 후 재확인
+                with self._span(job, "output check"):
+                    if not os.path.exists(job.save_path):
+                        await asyncio.sleep(1)
+                if not os.path.exists(job.save_path):
+                    raise FileNotFoundError(f"Save path does not exist: {job.save_path}")
+                await self._build_lods(job)
+                if self.compress and job.save_path.lower().endswith(".glb"):
+                    try:
+                        with self._span(job, "compress"):
+                            job.compression = await asyncio.to_thread(mesh_compress.compress_glb, job.save_path, self.compress)
+                        # 압축으로 결과가 다시 쓰였으므로 LOD가 오래된 것으로 보이지 않게 갱신
+                        for lod in job.lods:
+                            os.utime(lod)
+                    except (mesh_compress.CompressionError, OSError):
+                        # 압축 실패 시 원본 결과를 그대로 사용
+                        traceback.print_exc()
+                if cache_key:
+                    # LOD는 결과와 함께 캐시해 히트 때 복원
+                    stem = os.path.splitext(os.path.basename(job.save_path))[0]
+                    extras = {os.path.basename(lod)[len(stem) + 1:]: lod for lod in job.lods}
+                    try:
+                        with self._span(job, "cache store"):
+                            await asyncio.to_thread(self.cache.put, cache_key, job.save_path, os.path.basename(job.image_path), extras)
+                    except OSError:
+                        # 캐시 저장 실패는 작업 결과에 영향 없음
+                        traceback.print_exc()
+                self._set_state(job, JobState.DONE)
+
+            except asyncio.CancelledError:
+                if job.prompt_id and job.backend:
+                    await self._cancel_on_server(job)
+                self._set_state(job, JobState.CANCELLED)
+            except httpx.ReadTimeout:
+                self._set_state(job, JobState.FAILED, "Request timed out.")
+            except httpx.ConnectTimeout:
+                self._set_state(job, JobState.FAILED, "Connection timed out. Check server.")
+            except Exception as e:
+                traceback.print_exc()
+                self._set_state(job, JobState.FAILED, str(e) or type(e).__name__)
+            finally:
+                if self.tracer:
+                    self.tracer.instant(job.job_id, job.state, error=job.error)
+                    self.write_trace(job)
+        finally:
+            self._slots.release()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+import os
+import asyncio
+
+try:
+    # inotify / FSEvents / ReadDirectoryChangesW backed change notifications
+    import watchfiles
+except ImportError:
+    watchfiles = None
+
+
+class LogTailer:
+    """
+    Follow a growing log file (e.g. comfyui.log) from a remembered byte offset.
+    Truncation and rotation are detected from the file size and identity. Changes are picked up via
+    watchfiles when it is installed, with adaptive polling (min_interval..max_interval) as the fallback
+    and as a backstop for network shares that do not deliver change events.
+    Every complete new line is fanned out to all subscribe() iterators.
+    """
+    def __init__(self, path, min_interval: float = 0.25, max_interval: float = 2.0,
+                 from_end: bool = True, encoding: str = "utf-8", use_watcher: bool = True):
+        self.path = str(path)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.from_end = from_end
+        self.encoding = encoding
+        self.use_watcher = use_watcher and watchfiles is not None
+        self.offset = None
+        self._identity = None
+        self._partial = b""
+        self._subscribers = set()
+        self._task = None
+        self._stop_event = None
+        self._watcher = None
+
+    def _read_new(self) -> list:
+        """Read everything appended since the last call. Blocking; run in a worker thread."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return []
+        identity = (stat.st_dev, stat.st_ino)
+
+        if self.offset is None:
+            self.offset = stat.st_size if self.from_end else 0
+            self._identity = identity
+            return []
+        if identity != self._identity or stat.st_size < self.offset:
+            # 로테이션(새 파일) 또는 잘림: 처음부터 다시 읽음
+            self._identity = identity
+            self.offset = 0
+            self._partial = b""
+        if stat.st_size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(stat.st_size - self.offset)
+        self.offset += len(data)
+
+        data = self._partial + data
+        lines = data.split(b"\n")
+        self._partial = lines.pop()
+        return [line.decode(self.encoding, errors="ignore").rstrip("\r") for line in lines]
+
+    def _start_watcher(self):
+        """One non-recursive watch on the log's directory for the tailer's lifetime, filtered to the log file."""
+        watch_dir = os.path.dirname(os.path.abspath(self.path)) or "."
+        target = os.path.abspath(self.path)
+        return watchfiles.awatch(
+            watch_dir,
+            recursive=False,
+            watch_filter=lambda _change, path: os.path.abspath(path) == target,
+            stop_event=self._stop_event,
+            debounce=int(self.min_interval * 1000),
+            # 이벤트가 오지 않는 네트워크 공유를 위해 max_interval마다 한 번은 확인
+            rust_timeout=int(self.max_interval * 1000),
+            yield_on_timeout=True,
+        )
+
+    async def _wait_for_change(self, interval: float):
+        if self._watcher is not None:
+            try:
+                await self._watcher.__anext__()
+                return
+            except StopAsyncIteration:
+                return
+            except Exception:
+                # 감시 실패(네트워크 드라이브 등) 시 폴링으로 전환
+                self._watcher = None
+                self.use_watcher = False
+        await asyncio.sleep(interval)
+
+    async def _run(self):
+        interval = self.min_interval
+        if self.use_watcher:
+            try:
+                self._watcher = self._start_watcher()
+            except Exception:
+                self._watcher = None
+                self.use_watcher = False
+        try:
+            while self._subscribers:
+                try:
+                    lines = await asyncio.to_thread(self._read_new)
+                except OSError:
+                    lines = []
+                for line in lines:
+                    for queue in list(self._subscribers):
+                        queue.put_nowait(line)
+                if lines:
+                    interval = self.min_interval
+                else:
+                    interval = min(interval * 1.5, self.max_interval)
+                await self._wait_for_change(interval)
+        finally:
+            watcher, self._watcher = self._watcher, None
+            if watcher is not None:
+                await watcher.aclose()
+
+    async def subscribe(self):
+        """Async iterator over new log lines. Tailing runs only while at least one subscriber exists."""
+        queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        if self._task is None or self._task.done():
+            self._stop_event = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._subscribers.discard(queue)
+            if not self._subscribers:
+                self.stop()
+
+    def stop(self):
+        if self._stop_event:
+            self._stop_event.set()
+        if self._task and not self._task.done():
+            self._task.cancel()
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Recompress result GLBs with Draco or meshopt (EXT_meshopt_compression) using the glTF command-line
+tools when they are installed. The viewer page ships the matching decoders.
+
+    gltfpack:        https://github.com/zeux/meshoptimizer (meshopt)
+    gltf-transform:  npm install -g @gltf-transform/cli (meshopt, draco)
+    gltf-pipeline:   npm install -g gltf-pipeline (draco)
+
+    python -m modules.mesh_compress out/chair.glb --method meshopt
+"""
+import os
+import sys
+import json
+import shutil
+import struct
+import argparse
+import subprocess
+
+# method -> [(tool, args)]; the first tool found on PATH is used
+COMMANDS = {
+    "meshopt": [
+        ("gltfpack", ["-i", "{src}", "-o", "{dst}", "-cc", "-kn", "-km"]),
+        ("gltf-transform", ["meshopt", "{src}", "{dst}"]),
+    ],
+    "draco": [
+        ("gltf-transform", ["draco", "{src}", "{dst}"]),
+        ("gltf-pipeline", ["-i", "{src}", "-o", "{dst}", "-d"]),
+    ],
+}
+COMPRESSION_EXTENSIONS = {
+    "KHR_draco_mesh_compression": "draco",
+    "EXT_meshopt_compression": "meshopt",
+    "KHR_meshopt_compression": "meshopt",
+}
+
+
+class CompressionError(RuntimeError):
+    """The compression tool is missing or failed."""
+
+
+def find_tool(method: str):
+    """(executable, args) of the first installed tool for method, or None."""
+    if method not in COMMANDS:
+        raise ValueError(f"Unknown mesh compression {method!r}; expected one of {', '.join(COMMANDS)}")
+    for tool, args in COMMANDS[method]:
+        path = shutil.which(tool)
+        if path:
+            return path, args
+    return None
+
+
+def compression_of(path: str) -> str:
+    """'draco' / 'meshopt' if the GLB already uses that compression, else ''."""
+    with open(path, "rb") as f:
+        header = f.read(20)
+        if len(header) < 20 or header[:4] != b"glTF":
+            return ""
+        chunk_length, chunk_type = struct.unpack_from("<II", header, 12)
+        if chunk_type != 0x4E4F534A:  # "JSON"
+            return ""
+        try:
+            document = json.loads(f.read(chunk_length))
+        except ValueError:
+            return ""
+    for extension in document.get("extensionsUsed", []):
+        if extension in COMPRESSION_EXTENSIONS:
+            return COMPRESSION_EXTENSIONS[extension]
+    return ""
+
+
+def compress_glb(path: str, method: str, timeout: float = 600.0) -> tuple:
+    """
+    Recompress the GLB at path in place. Blocking; run it in a worker thread.
+    Returns (size_before, size_after). Already compressed files, and results that would not be
+    smaller, are left unchanged.
+    """
+    size = os.path.getsize(path)
+    if compression_of(path):
+        return size, size
+    found = find_tool(method)
+    if found is None:
+        raise CompressionError(f"No {method} tool found on PATH ({', '.join(tool for tool, _ in COMMANDS[method])})")
+    executable, args = found
+
+    # 같은 디렉터리에 쓰고 교체 (네트워크 경로에서도 원자적)
+    tmp_path = f"{os.path.splitext(path)[0]}.{method}.tmp.glb"
+    command = [executable] + [arg.format(src=path, dst=tmp_path) for arg in args]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0 or not os.path.exists(tmp_path):
+            message = (result.stderr or result.stdout).strip().splitlines()
+            raise CompressionError(f"{os.path.basename(executable)} failed: {message[-1] if message else result.returncode}")
+        compressed = os.path.getsize(tmp_path)
+        if compressed >= size:
+            return size, size
+        os.replace(tmp_path, path)
+        return size, compressed
+    except subprocess.TimeoutExpired:
+        raise CompressionError(f"{os.path.basename(executable)} timed out after {timeout:.0f} s")
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recompress GLB files with Draco or meshopt.")
+    parser.add_argument("paths", nargs="+", help="GLB files to recompress in place")
+    parser.add_argument("--method", choices=sorted(COMMANDS), default="meshopt")
+    args = parser.parse_args(argv)
+    status = 0
+    for path in args.paths:
+        try:
+            before, after = compress_glb(path, args.method)
+        except (CompressionError, OSError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        print(f"{path}: {before / 1024 ** 2:.1f} MB -> {after / 1024 ** 2:.1f} MB")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
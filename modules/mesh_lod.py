@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Coarse preview levels of large GLBs, made by vertex clustering in NumPy and cached next to the file
+(<dir>/.lod/<name>.lod<grid>.glb). The viewer shows the coarsest level right away and swaps in the
+finer ones, then the full model, as each finishes loading.
+
+    python -m modules.mesh_lod out/chair.glb
+"""
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+
+import numpy as np
+
+LOD_DIR = ".lod"
+GLB_MAGIC = b"glTF"
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+
+_COMPONENT_TYPES = {5120: "i1", 5121: "u1", 5122: "<i2", 5123: "<u2", 5125: "<u4", 5126: "<f4"}
+_TYPE_SIZES = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4}
+
+
+class LodError(ValueError):
+    """A GLB the simplifier cannot read (compressed or sparse buffers, no triangles, ...)."""
+
+
+def read_glb(path: str) -> tuple:
+    """(document, binary chunk) of a GLB file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < 20 or data[:4] != GLB_MAGIC:
+        raise LodError(f"{os.path.basename(path)} is not a GLB file")
+    offset, document, binary = 12, None, b""
+    while offset + 8 <= len(data):
+        length, chunk_type = struct.unpack_from("<II", data, offset)
+        chunk = memoryview(data)[offset + 8:offset + 8 + length]
+        if chunk_type == CHUNK_JSON:
+            document = json.loads(bytes(chunk))
+        elif chunk_type == CHUNK_BIN:
+            binary = chunk
+        offset += 8 + length
+    if document is None:
+        raise LodError(f"{os.path.basename(path)} has no JSON chunk")
+    return document, binary
+
+
+def _accessor(document: dict, binary, index: int) -> np.ndarray:
+    accessor = document["accessors"][index]
+    if "sparse" in accessor or "bufferView" not in accessor:
+        raise LodError("sparse accessors are not supported")
+    view = document["bufferViews"][accessor["bufferView"]]
+    if view.get("extensions") or view.get("buffer", 0) != 0 or "uri" in document["buffers"][view.get("buffer", 0)]:
+        # Draco / meshopt 압축 또는 외부 버퍼
+        raise LodError("compressed or external buffers are not supported")
+    dtype = np.dtype(_COMPONENT_TYPES[accessor["componentType"]])
+    size = _TYPE_SIZES[accessor["type"]]
+    stride = view.get("byteStride") or dtype.itemsize * size
+    offset = view.get("byteOffset", 0) + accessor.get("byteOffset", 0)
+    values = np.ndarray((accessor["count"], size), dtype=dtype, buffer=binary, offset=offset,
+                        strides=(stride, dtype.itemsize))
+    if accessor.get("normalized") and dtype.kind in "iu":
+        # KHR_mesh_quantization의 정규화된 정수 좌표
+        return np.maximum(values / np.iinfo(dtype).max, -1.0)
+    return values
+
+
+def _local_matrix(node: dict) -> np.ndarray:
+    if "matrix" in node:
+        return np.array(node["matrix"], dtype=np.float64).reshape(4, 4).T
+    x, y, z, w = node.get("rotation", (0.0, 0.0, 0.0, 1.0))
+    rotation = np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ])
+    matrix = np.eye(4)
+    matrix[:3, :3] = rotation * np.array(node.get("scale", (1.0, 1.0, 1.0)))
+    matrix[:3, 3] = node.get("translation", (0.0, 0.0, 0.0))
+    return matrix
+
+
+def mesh_triangles(document: dict, binary) -> tuple:
+    """All triangle primitives of the default scene in world space: (positions (N, 3), triangles (M, 3))."""
+    positions, triangles, count = [], [], 0
+
+    def add_mesh(mesh_index, matrix):
+        nonlocal count
+        for primitive in document["meshes"][mesh_index].get("primitives", []):
+            if primitive.get("mode", 4) != 4 or "POSITION" not in primitive.get("attributes", {}):
+                continue
+            if primitive.get("extensions"):
+                raise LodError("compressed primitives are not supported")
+            points = _accessor(document, binary, primitive["attributes"]["POSITION"]).astype(np.float64)
+            if "indices" in primitive:
+                indices = _accessor(document, binary, primitive["indices"]).reshape(-1).astype(np.int64)
+            else:
+                indices = np.arange(len(points), dtype=np.int64)
+            points = points @ matrix[:3, :3].T + matrix[:3, 3]
+            positions.append(points)
+            triangles.append(indices[:len(indices) // 3 * 3].reshape(-1, 3) + count)
+            count += len(points)
+
+    def visit(node_index, parent):
+        node = document["nodes"][node_index]
+        matrix = parent @ _local_matrix(node)
+        if "mesh" in node:
+            add_mesh(node["mesh"], matrix)
+        for child in node.get("children", []):
+            visit(child, matrix)
+
+    scenes = document.get("scenes")
+    if scenes:
+        for node_index in scenes[document.get("scene", 0)].get("nodes", []):
+            visit(node_index, np.eye(4))
+    else:
+        for mesh_index in range(len(document.get("meshes", []))):
+            add_mesh(mesh_index, np.eye(4))
+    if not triangles:
+        raise LodError("no triangle meshes")
+    return np.concatenate(positions), np.concatenate(triangles)
+
+
+def simplify(positions: np.ndarray, triangles: np.ndarray, grid: int) -> tuple:
+    """
+    Vertex clustering on a grid x grid x grid lattice over the mesh bounds: vertices in a cell merge
+    into their mean, collapsed and duplicate triangles are dropped. Returns (positions, triangles).
+    """
+    low = positions.min(axis=0)
+    extent = float((positions.max(axis=0) - low).max()) or 1.0
+    cells = np.minimum(((positions - low) * (grid / extent)).astype(np.int64), grid - 1)
+    keys = (cells[:, 0] * grid + cells[:, 1]) * grid + cells[:, 2]
+    _, cluster = np.unique(keys, return_inverse=True)
+    cluster = cluster.reshape(-1)
+
+    clustered = cluster[triangles]
+    keep = (
+        (clustered[:, 0] != clustered[:, 1])
+        & (clustered[:, 1] != clustered[:, 2])
+        & (clustered[:, 0] != clustered[:, 2])
+    )
+    clustered = clustered[keep]
+    # 같은 세 셀을 잇는 삼각형은 하나만 (처음 나온 방향 유지)
+    _, first = np.unique(np.sort(clustered, axis=1), axis=0, return_index=True)
+    clustered = clustered[np.sort(first)]
+
+    # 남은 삼각형이 쓰는 클러스터만 평균 위치로 출력
+    used, remapped = np.unique(clustered, return_inverse=True)
+    counts = np.bincount(cluster)[used]
+    merged = np.stack(
+        [np.bincount(cluster, weights=positions[:, axis])[used] for axis in range(3)], axis=1
+    ) / counts[:, None]
+    return merged, remapped.reshape(-1, 3)
+
+
+def write_glb(path: str, positions: np.ndarray, triangles: np.ndarray):
+    """Write an untextured single-mesh GLB (POSITION + indices)."""
+    points = np.ascontiguousarray(positions, dtype="<f4")
+    index_type = ("<u2", 5123) if len(points) < 65535 else ("<u4", 5125)
+    indices = np.ascontiguousarray(triangles.reshape(-1), dtype=index_type[0])
+    position_bytes = points.tobytes()
+    index_bytes = indices.tobytes()
+    index_bytes += b"\0" * (-len(index_bytes) % 4)
+    binary = position_bytes + index_bytes
+    document = {
+        "asset": {"version": "2.0", "generator": "mesh_lod"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0}],
+        "meshes": [{"primitives": [{"attributes": {"POSITION": 0}, "indices": 1}]}],
+        "buffers": [{"byteLength": len(binary)}],
+        "bufferViews": [
+            {"buffer": 0, "byteOffset": 0, "byteLength": len(position_bytes), "target": 34962},
+            {"buffer": 0, "byteOffset": len(position_bytes), "byteLength": len(index_bytes), "target": 34963},
+        ],
+        "accessors": [
+            {"bufferView": 0, "componentType": 5126, "count": len(points), "type": "VEC3",
+             "min": points.min(axis=0).tolist(), "max": points.max(axis=0).tolist()},
+            {"bufferView": 1, "componentType": index_type[1], "count": len(indices), "type": "SCALAR"},
+        ],
+    }
+    json_bytes = json.dumps(document, separators=(",", ":")).encode("utf-8")
+    json_bytes += b" " * (-len(json_bytes) % 4)
+    total = 12 + 8 + len(json_bytes) + 8 + len(binary)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(struct.pack("<4sII", GLB_MAGIC, 2, total))
+        f.write(struct.pack("<II", len(json_bytes), CHUNK_JSON))
+        f.write(json_bytes)
+        f.write(struct.pack("<II", len(binary), CHUNK_BIN))
+        f.write(binary)
+    os.replace(tmp_path, path)
+
+
+def lod_paths(path: str, grid_sizes) -> list:
+    """Cache paths of the LOD levels of path, coarsest first."""
+    directory, name = os.path.split(os.path.abspath(path))
+    stem = os.path.splitext(name)[0]
+    return [os.path.join(directory, LOD_DIR, f"{stem}.lod{grid}.glb") for grid in sorted(grid_sizes)]
+
+
+def build_lods(path: str, grid_sizes=(32, 128), min_faces: int = 50000) -> list:
+    """
+    LOD files for the GLB at path, coarsest first; cached ones newer than path are reused. Blocking.
+    Meshes with fewer than min_faces triangles get none, and levels that would not at least halve
+    the triangle count are skipped. Raises LodError for GLBs that cannot be read (e.g. compressed).
+    """
+    targets = lod_paths(path, grid_sizes)
+    mtime = os.stat(path).st_mtime
+    existing = [target for target in targets if os.path.exists(target) and os.stat(target).st_mtime >= mtime]
+    if existing:
+        # 이전에 만든 레벨 (절반 이하로 줄지 않는 레벨은 처음부터 없음)
+        return existing
+
+    positions, triangles = mesh_triangles(*read_glb(path))
+    if len(triangles) < min_faces:
+        return []
+    os.makedirs(os.path.dirname(targets[0]), exist_ok=True)
+    levels = []
+    for grid, target in zip(sorted(grid_sizes), targets):
+        lod_positions, lod_triangles = simplify(positions, triangles, grid)
+        if len(lod_triangles) * 2 > len(triangles):
+            break
+        write_glb(target, lod_positions, lod_triangles)
+        levels.append(target)
+    return levels
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build preview LOD levels for GLB files.")
+    parser.add_argument("paths", nargs="+", help="GLB files")
+    parser.add_argument("--grid", type=int, action="append", help="clustering grid size (repeatable; default: 32, 128)")
+    args = parser.parse_args(argv)
+    status = 0
+    for path in args.paths:
+        start = time.perf_counter()
+        try:
+            levels = build_lods(path, args.grid or (32, 128), min_faces=0)
+        except (LodError, OSError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            status = 1
+            continue
+        sizes = ", ".join(f"{os.path.basename(level)} {os.path.getsize(level) / 1024:.0f} KB" for level in levels)
+        print(f"{path}: {sizes or 'no levels'} ({time.perf_counter() - start:.2f} s)")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+comfy-model: URL scheme that serves models and their textures to the viewer page from Python,
+so results do not have to be reachable as file:/// URLs (UNC / network paths) or written to disk.
+
+    register_scheme()                       # once, before QApplication is created
+    handler = handler_for(view.page().profile())
+    url = handler.publish_file("//server/share/out/chair.glb")
+    url = handler.publish_bytes(data, "chair.glb")
+"""
+import os
+import uuid
+import hashlib
+
+from PySide6.QtCore import QBuffer, QByteArray, QFile, QIODevice, QUrl
+from PySide6.QtWebEngineCore import QWebEngineUrlRequestJob, QWebEngineUrlScheme, QWebEngineUrlSchemeHandler
+
+SCHEME = b"comfy-model"
+
+MIME_TYPES = {
+    ".glb": "model/gltf-binary",
+    ".gltf": "model/gltf+json",
+    ".bin": "application/octet-stream",
+    ".obj": "text/plain",
+    ".mtl": "text/plain",
+    ".fbx": "application/octet-stream",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".ktx2": "image/ktx2",
+}
+
+
+def register_scheme():
+    """Register comfy-model: with QtWebEngine. Has to run before QApplication is created."""
+    scheme = QWebEngineUrlScheme(SCHEME)
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Path)
+    # 로컬 페이지(file:// 뷰어)에서만 XHR/fetch로 접근 가능
+    scheme.setFlags(
+        QWebEngineUrlScheme.Flag.LocalScheme
+        | QWebEngineUrlScheme.Flag.SecureScheme
+        | QWebEngineUrlScheme.Flag.CorsEnabled
+        | QWebEngineUrlScheme.Flag.FetchApiAllowed
+    )
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+def _is_contained(name: str) -> bool:
+    """Whether name stays inside the directory it is joined to: no absolute, drive ("C:foo") or ".." paths."""
+    if os.path.isabs(name) or os.path.splitdrive(name)[0] or name.startswith(("/", "\\")):
+        return False
+    relative = os.path.normpath(name)
+    return not (os.path.isabs(relative) or relative == os.pardir or relative.startswith(os.pardir + os.sep))
+
+
+class ModelSchemeHandler(QWebEngineUrlSchemeHandler):
+    """
+    Serves comfy-model:/<key>/<name>. A key is published either for a file, whose directory is then
+    served under it (so a .gltf finds its .bin and textures by relative URL), or for bytes in memory.
+    Files are opened as QFile and read by QtWebEngine in chunks as the page consumes them; both kinds
+    of reply carry their exact size as the content length.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # key -> directory path, or {name: QByteArray}
+        self._sources = {}
+
+    @staticmethod
+    def _url(key: str, name: str) -> QUrl:
+        url = QUrl()
+        url.setScheme(SCHEME.decode())
+        url.setPath(f"/{key}/{name}")
+        return url
+
+    @staticmethod
+    def key_of(url) -> str:
+        return QUrl(url).path().lstrip("/").split("/", 1)[0]
+
+    def publish_file(self, path: str) -> QUrl:
+        """URL for a file on disk. The key follows the path and mtime, so a rewritten file gets a new URL."""
+        path = os.path.abspath(path)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = 0
+        key = hashlib.sha1(f"{path}|{mtime}".encode("utf-8")).hexdigest()[:16]
+        self._sources[key] = os.path.dirname(path)
+        return self._url(key, os.path.basename(path))
+
+    def publish_bytes(self, data: bytes, name: str) -> QUrl:
+        """URL for a model held in memory (e.g. downloaded from /view). Call release() when it is no longer shown."""
+        key = uuid.uuid4().hex[:16]
+        self._sources[key] = {name: QByteArray(data)}
+        return self._url(key, name)
+
+    def release(self, url):
+        self._sources.pop(self.key_of(url), None)
+
+    def requestStarted(self, job: QWebEngineUrlRequestJob):
+        if bytes(job.requestMethod()) != b"GET":
+            job.fail(QWebEngineUrlRequestJob.Error.RequestDenied)
+            return
+        path = job.requestUrl().path(QUrl.ComponentFormattingOption.FullyDecoded).lstrip("/")
+        key, _, name = path.partition("/")
+        source = self._sources.get(key)
+        if source is None or not name:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+
+        if isinstance(source, dict):
+            data = source.get(name)
+            if data is None:
+                job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+                return
+            device = QBuffer(job)
+            device.setData(data)
+        else:
+            if not _is_contained(name):
+                # 게시된 디렉터리 밖으로 나가는 경로는 거부
+                job.fail(QWebEngineUrlRequestJob.Error.RequestDenied)
+                return
+            relative = os.path.normpath(name)
+            # 디바이스는 job이 소유하고, job이 끝나면 함께 닫힘
+            device = QFile(os.path.join(source, relative), job)
+        if not device.open(QIODevice.OpenModeFlag.ReadOnly):
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        mime_type = MIME_TYPES.get(os.path.splitext(name)[1].lower(), "application/octet-stream")
+        job.reply(mime_type.encode("ascii"), device)
+
+
+def handler_for(profile) -> ModelSchemeHandler:
+    """The profile's comfy-model: handler, installed on first use."""
+    handler = profile.urlSchemeHandler(SCHEME)
+    if handler is None:
+        handler = ModelSchemeHandler(profile)
+        profile.installUrlSchemeHandler(SCHEME, handler)
+    return handler
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+import json
+import random
+import asyncio
+import websockets
+from collections import OrderedDict
+
+from modules import constants
+from modules import preview_stream
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# High-frequency events that are dropped unless they belong to a prompt this client owns.
+# Completion events (executing with node=None, execution_error, ...) are never filtered so a
+# prompt that finishes before its id is registered is still recorded.
+PROMPT_SCOPED_EVENTS = {"progress", "executed", "execution_cached"}
+
+
+def peek_message_type(raw: str):
+    """Message type read from the start of a ComfyUI JSON message without parsing it."""
+    if raw.startswith('{"type": "'):
+        end = raw.find('"', 10)
+        if end != -1:
+            return raw[10:end]
+    return None
+
+
+class ExecutionError(RuntimeError):
+    """A prompt failed on the server (execution_error); node_type is the class of the failing node."""
+    def __init__(self, message: str, node_type: str = "", node_id: str = ""):
+        super().__init__(message)
+        self.node_type = node_type
+        self.node_id = node_id
+
+
+class Event:
+    """Minimal stand-in for a Qt Signal: connect() callbacks, emit() calls them in order."""
+    def __init__(self):
+        self._slots = []
+
+    def connect(self, slot):
+        self._slots.append(slot)
+
+    def disconnect(self, slot):
+        self._slots.remove(slot)
+
+    def emit(self, *args):
+        for slot in list(self._slots):
+            slot(*args)
+
+
+SIGNALS = (
+    "progress_updated", "prompt_progress", "status_updated", "queue_updated", "execution_start",
+    "execution_success", "reconnected", "node_executing", "nodes_cached", "preview_updated",
+)
+
+
+class MonitorCore:
+    """
+    ComfyUI websocket session without Qt: reconnecting listener, message dispatch, per-prompt
+    completion futures and progress coalescing. Outputs are exposed as Event objects with the
+    same connect()/emit() API as the Qt signals of comfy_monitor.ComfyMonitor, which subclasses
+    this and declares real Signals instead. Preview frames are decoded with decode_preview(data, format)
+    when given and dropped otherwise.
+    """
+    def __init__(self, host, client_id, progress_rate: float = constants.PROGRESS_MAX_RATE, filter_foreign: bool = True,
+                 ping_interval: float = constants.WS_PING_INTERVAL, ping_timeout: float = constants.WS_PING_TIMEOUT,
+                 reconnect_min: float = constants.WS_RECONNECT_MIN, reconnect_max: float = constants.WS_RECONNECT_MAX,
+                 max_message_size: int = constants.WS_MAX_MESSAGE_SIZE, decode_preview=None):
+        for name in SIGNALS:
+            # Qt 서브클래스는 클래스 속성으로 Signal을 선언함
+            if not hasattr(type(self), name):
+                setattr(self, name, Event())
+        self.host = host
+        self.client_id = client_id
+        clean_host = host.replace("http://", "").replace("https://", "").rstrip("/")
+        self.ws_url = f"ws://{clean_host}/ws?clientId={client_id}"
+        self.running = True
+        self.connected = False
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        self.max_message_size = max_message_size
+        self.sessions = 0
+        self._task = None
+        self.filter_foreign = filter_foreign
+        # Optional TraceRecorder that receives every parsed event of owned prompts
+        self.trace = None
+        self._waiters = {}
+        self._finished = OrderedDict()
+        self._owned = set()
+        self.current_prompt_id = None
+        self.current_node_id = None
+        self.previews = None
+        if decode_preview is not None:
+            self.previews = preview_stream.PreviewThrottle(
+                decode_preview, self._on_preview_decoded, constants.PREVIEW_MAX_FPS
+            )
+        self._progress_interval = 1.0 / progress_rate if progress_rate > 0 else 0.0
+        self._progress_latest = {}
+        self._progress_handle = None
+        self._last_progress_flush = 0.0
+        self.handlers = {
+            "status": self._on_status,
+            "execution_start": self._on_execution_start,
+            "executing": self._on_executing,
+            "execution_error": self._on_execution_error,
+            "execution_interrupted": self._on_execution_interrupted,
+            "progress": self._on_progress,
+            "execution_cached": self._on_execution_cached,
+        }
+
+    def register_handler(self, msg_type: str, handler):
+        """Add or replace the handler called with the `data` payload of msg_type messages."""
+        self.handlers[msg_type] = handler
+
+    def _on_preview_decoded(self, frame, image):
+        self.preview_updated.emit(image, frame.prompt_id or "")
+
+    def owns(self, prompt_id: str) -> bool:
+        return prompt_id in self._owned
+
+    def watch_prompt(self, prompt_id: str) -> asyncio.Future:
+        """Return a future resolved when the server reports prompt_id as finished."""
+        self._owned.add(prompt_id)
+        future = self._waiters.get(prompt_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[prompt_id] = future
+            # 제출 직후 이미 완료 이벤트가 도착한 경우
+            if prompt_id in self._finished:
+                self.resolve_prompt(prompt_id, self._finished.pop(prompt_id))
+        return future
+
+    def unwatch_prompt(self, prompt_id: str):
+        self._owned.discard(prompt_id)
+        self._progress_latest.pop(prompt_id, None)
+        future = self._waiters.pop(prompt_id, None)
+        if future and not future.done():
+            future.cancel()
+
+    def resolve_prompt(self, prompt_id, error=None):
+        """Finish prompt_id's waiter; error is a message or an exception instance. Also used by resyncs."""
+        if not prompt_id:
+            return
+        self._progress_latest.pop(prompt_id, None)
+        future = self._waiters.pop(prompt_id, None)
+        if future is None:
+            self._finished[prompt_id] = error
+            while len(self._finished) > 256:
+                self._finished.popitem(last=False)
+            return
+        if future.done():
+            return
+        if isinstance(error, BaseException):
+            future.set_exception(error)
+        elif error:
+            future.set_exception(RuntimeError(error))
+        else:
+            future.set_result(prompt_id)
+
+    def dispatch(self, raw: str):
+        """Route one text message to its handler, dropping unhandled and foreign events before parsing."""
+        msg_type = peek_message_type(raw)
+        if msg_type is not None:
+            if msg_type not in self.handlers and self.trace is None:
+                return
+            if self.filter_foreign and msg_type in PROMPT_SCOPED_EVENTS:
+                if not any(prompt_id in raw for prompt_id in self._owned):
+                    return
+
+        data = json_loads(raw)
+        msg_type = data.get('type')
+        payload = data.get('data') or {}
+        if self.trace is not None:
+            self.trace.record_message(msg_type, payload)
+        handler = self.handlers.get(msg_type)
+        if handler is None:
+            return
+        if self.filter_foreign and msg_type in PROMPT_SCOPED_EVENTS:
+            prompt_id = payload.get('prompt_id')
+            if prompt_id and prompt_id not in self._owned:
+                return
+        handler(payload)
+
+    def _on_status(self, payload):
+        status = payload.get('status', {})
+        exec_info = status.get('exec_info', {})
+        queue_remaining = exec_info.get('queue_remaining', 0)
+        self.queue_updated.emit(queue_remaining)
+
+    def _on_execution_start(self, payload):
+        self.current_prompt_id = payload.get('prompt_id')
+        self.execution_start.emit(payload.get('prompt_id'))
+
+    def _on_executing(self, payload):
+        node_id = payload.get('node')
+        prompt_id = payload.get('prompt_id')
+        self.current_node_id = node_id
+        if node_id:
+            if self.filter_foreign and prompt_id and prompt_id not in self._owned:
+                return
+            # [수정] 노드가 실행될 때 시그널 방출
+            self.node_executing.emit(node_id, prompt_id)
+        else:
+            # node_id가 None이면 해당 프롬프트 완료됨
+            self.resolve_prompt(prompt_id)
+            self.execution_success.emit(prompt_id)
+
+    def _on_execution_cached(self, payload):
+        # 서버 캐시로 건너뛴 노드 목록
+        self.nodes_cached.emit(payload.get('prompt_id') or "", list(payload.get('nodes') or []))
+
+    def _on_execution_error(self, payload):
+        prompt_id = payload.get('prompt_id')
+        error = payload.get('exception_message') or "Execution failed on server."
+        node_type = payload.get('node_type') or ""
+        self.resolve_prompt(prompt_id, ExecutionError(f"{node_type or 'Node'}: {error}", node_type, payload.get('node_id') or ""))
+
+    def _on_execution_interrupted(self, payload):
+        self.resolve_prompt(payload.get('prompt_id'), "Execution interrupted.")
+
+    def _on_progress(self, payload):
+        # 최신 값만 저장하고 progress_rate 주기로 한 번에 방출
+        prompt_id = payload.get('prompt_id') or self.current_prompt_id or ""
+        self._progress_latest[prompt_id] = (payload.get('node') or "", payload.get('value', 0), payload.get('max', 1))
+        if self._progress_handle is not None:
+            return
+        loop = asyncio.get_running_loop()
+        delay = max(self._last_progress_flush + self._progress_interval - loop.time(), 0.0)
+        self._progress_handle = loop.call_later(delay, self._flush_progress)
+
+    def _flush_progress(self):
+        self._progress_handle = None
+        self._last_progress_flush = asyncio.get_running_loop().time()
+        latest, self._progress_latest = self._progress_latest, {}
+        for prompt_id, (node_id, value, max_val) in latest.items():
+            self.prompt_progress.emit(prompt_id, node_id, value, max_val)
+            self.progress_updated.emit(value, max_val, "Processing...")
+
+    async def connect_and_listen(self):
+        """
+        Keep a websocket session open until stop(). Reconnects with exponential backoff and jitter,
+        and emits `reconnected` after every session but the first so callers can resync state
+        for events missed while the socket was down.
+        """
+        self._task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        delay = self.reconnect_min
+        try:
+            while self.running:
+                connected_at = None
+                try:
+                    async with websockets.connect(
+                        self.ws_url, ping_interval=self.ping_interval, ping_timeout=self.ping_timeout,
+                        max_size=self.max_message_size,
+                    ) as ws:
+                        self.connected = True
+                        connected_at = loop.time()
+                        self.sessions += 1
+                        self.status_updated.emit("Connected to ComfyUI Server.")
+                        if self.sessions > 1:
+                            self.reconnected.emit()
+                        async for msg in ws:
+                            if not isinstance(msg, str):
+                                if self.previews is None:
+                                    continue
+                                frame = preview_stream.parse_binary_message(msg, self.current_prompt_id, self.current_node_id)
+                                if frame:
+                                    self.previews.submit(frame)
+                                continue
+                            self.dispatch(msg)
+                    error = "closed by server"
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                finally:
+                    self.connected = False
+                    self.current_prompt_id = None
+                    self.current_node_id = None
+
+                if not self.running:
+                    break
+                # 오래 유지된 세션 이후에는 짧은 지연부터 다시 시작
+                if connected_at is not None and loop.time() - connected_at > self.reconnect_max:
+                    delay = self.reconnect_min
+                wait = delay / 2 + random.uniform(0, delay / 2)
+                self.status_updated.emit(f"Connection lost. Retrying in {wait:.1f}s... ({error})")
+                await asyncio.sleep(wait)
+                delay = min(delay * 2, self.reconnect_max)
+        except asyncio.CancelledError:
+            # stop()에 의한 취소는 정상 종료
+            if self.running:
+                raise
+        finally:
+            self.connected = False
+            self._task = None
+
+    def stop(self):
+        """Stop the session; a pending receive or reconnect wait is cancelled immediately."""
+        self.running = False
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        if self.previews is not None:
+            self.previews.cancel()
+        if self._progress_handle is not None:
+            self._progress_handle.cancel()
+            self._progress_handle = None
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import sqlite3
+import statistics
+
+# Inputs that do not change how long a node takes
+IGNORED_PARAMS = {"seed", "noise_seed", "save_path", "filename_prefix", "image"}
+
+
+def node_params(node: dict) -> str:
+    """Canonical string of a node's scalar inputs (links and run-specific values left out)."""
+    params = {
+        name: value for name, value in node.get("inputs", {}).items()
+        if name not in IGNORED_PARAMS and not isinstance(value, (list, dict))
+    }
+    return json.dumps(params, sort_keys=True, separators=(",", ":"))
+
+
+def format_duration(seconds) -> str:
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(max(seconds, 0)))
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+class NodeTimingDB:
+    """SQLite record of how long each node class took for a given parameter set."""
+    def __init__(self, path, history: int = 20):
+        self.path = str(path)
+        self.history = history
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS node_timings ("
+            "class_type TEXT NOT NULL, params TEXT NOT NULL, duration REAL NOT NULL, recorded_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_node_timings ON node_timings (class_type, params)")
+        self._conn.commit()
+        self._cache = {}
+
+    def record(self, class_type: str, params: str, duration: float):
+        self._conn.execute(
+            "INSERT INTO node_timings (class_type, params, duration, recorded_at) VALUES (?, ?, ?, ?)",
+            (class_type, params, duration, time.time()),
+        )
+        self._conn.commit()
+        self._cache.pop((class_type, params), None)
+        self._cache.pop((class_type, None), None)
+
+    def estimate(self, class_type: str, params: str = None):
+        """Median of recent durations for this exact parameter set, else for the node class, else None."""
+        keys = [(class_type, params), (class_type, None)] if params is not None else [(class_type, None)]
+        for key in keys:
+            if key not in self._cache:
+                if key[1] is None:
+                    rows = self._conn.execute(
+                        "SELECT duration FROM node_timings WHERE class_type = ? ORDER BY recorded_at DESC LIMIT ?",
+                        (class_type, self.history),
+                    ).fetchall()
+                else:
+                    rows = self._conn.execute(
+                        "SELECT duration FROM node_timings WHERE class_type = ? AND params = ? "
+                        "ORDER BY recorded_at DESC LIMIT ?",
+                        (class_type, key[1], self.history),
+                    ).fetchall()
+                self._cache[key] = statistics.median(row[0] for row in rows) if rows else None
+            if self._cache[key] is not None:
+                return self._cache[key]
+        return None
+
+    def close(self):
+        self._conn.close()
+
+
+class EtaTracker:
+    """
+    Remaining-time estimate for one running prompt, driven by executing / progress / cached events.
+    Finished node durations are written back to the NodeTimingDB.
+    """
+    def __init__(self, workflow: dict, db: NodeTimingDB, default_node_time: float = 1.0):
+        self.workflow = workflow
+        self.db = db
+        self.default_node_time = default_node_time
+        self.estimates = {}
+        for node_id, node in workflow.items():
+            estimate = db.estimate(node.get("class_type", ""), node_params(node)) if db else None
+            self.estimates[node_id] = estimate if estimate is not None else default_node_time
+        self.done = set()
+        self.current = None
+        self.current_started = None
+        self.current_fraction = 0.0
+
+    def total(self) -> float:
+        return sum(self.estimates.values())
+
+    def node_started(self, node_id: str, now: float = None):
+        now = time.time() if now is None else now
+        self._finish_current(now)
+        self.current = node_id
+        self.current_started = now
+        self.current_fraction = 0.0
+
+    def progress(self, node_id: str, value: int, max_val: int):
+        # 합쳐진 진행률 이벤트는 다음 노드 시작 이후에 도착할 수 있음
+        if node_id != self.current:
+            return
+        if max_val:
+            self.current_fraction = min(value / max_val, 1.0)
+
+    def cached(self, node_ids):
+        for node_id in node_ids:
+            self.estimates.pop(node_id, None)
+
+    def finished(self, now: float = None):
+        self._finish_current(time.time() if now is None else now)
+
+    def _finish_current(self, now: float):
+        if self.current is None:
+            return
+        node = self.workflow.get(self.current)
+        duration = now - self.current_started
+        if node and self.db:
+            self.db.record(node.get("class_type", ""), node_params(node), duration)
+        self.done.add(self.current)
+        self.current = None
+
+    def remaining(self, now: float = None) -> float:
+        now = time.time() if now is None else now
+        remaining = sum(t for node_id, t in self.estimates.items() if node_id not in self.done and node_id != self.current)
+        if self.current is not None:
+            estimate = self.estimates.get(self.current, self.default_node_time)
+            elapsed = now - self.current_started
+            if self.current_fraction > 0:
+                # 진행률 이벤트가 있으면 실제 속도 기준으로 외삽
+                remaining += elapsed * (1 - self.current_fraction) / self.current_fraction
+            else:
+                remaining += max(estimate - elapsed, 0.0)
+        return remaining
+
+    def fraction(self, now: float = None) -> float:
+        total = self.total()
+        if total <= 0:
+            return 0.0
+        return min(max(1.0 - self.remaining(now) / total, 0.0), 1.0)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import hashlib
+import threading
+
+# Widget inputs with these option flags list files the client is about to upload, so their values are not checked
+UPLOAD_OPTIONS = ("image_upload", "upload", "video_upload", "audio_upload")
+# Widget types whose literal values the server converts before checking their range
+_COERCIONS = {"INT": int, "FLOAT": float, "STRING": str, "BOOLEAN": bool}
+
+
+class WorkflowValidationError(ValueError):
+    """A workflow the server would reject. errors lists every problem found."""
+    def __init__(self, errors: list):
+        self.errors = list(errors)
+        more = f" (+{len(self.errors) - 3} more)" if len(self.errors) > 3 else ""
+        super().__init__("Invalid workflow: " + "; ".join(self.errors[:3]) + more)
+
+
+class ObjectInfoCache:
+    """
+    /object_info of each server on disk, one JSON file per server. An entry is stale once the
+    server reports a different ComfyUI version (/system_stats) or it is older than max_age.
+    """
+    def __init__(self, cache_dir, max_age: float = 24 * 3600):
+        self.cache_dir = str(cache_dir)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def _path(self, api_url: str) -> str:
+        name = hashlib.sha1(api_url.rstrip("/").encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    def get(self, api_url: str, version):
+        """Cached {"version", "fetched_at", "object_info"} for api_url, or None if missing or stale."""
+        try:
+            with self._lock, open(self._path(api_url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("version") != version or time.time() - entry.get("fetched_at", 0) > self.max_age:
+            return None
+        return entry
+
+    def put(self, api_url: str, version, object_info: dict) -> dict:
+        entry = {"api_url": api_url, "version": version, "fetched_at": time.time(), "object_info": object_info}
+        path = self._path(api_url)
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        return entry
+
+
+def _input_specs(info: dict) -> tuple:
+    inputs = info.get("input", {})
+    return inputs.get("required", {}), {**inputs.get("optional", {}), **inputs.get("hidden", {})}
+
+
+def _types_match(received: str, expected: str) -> bool:
+    if received == "*" or expected == "*":
+        return True
+    return bool(set(received.split(",")) & set(expected.split(",")))
+
+
+def _check_value(label: str, spec, value) -> str:
+    """Error message for a widget value that does not fit spec ([type, options] from /object_info), or ""."""
+    input_type = spec[0] if spec else None
+    options = spec[1] if len(spec) > 1 and isinstance(spec[1], dict) else {}
+    choices = None
+    if isinstance(input_type, list):
+        choices = input_type
+    elif input_type == "COMBO":
+        choices = options.get("options")
+
+    if choices is not None:
+        if any(options.get(flag) for flag in UPLOAD_OPTIONS):
+            return ""
+        if value not in choices:
+            shown = ", ".join(map(str, choices[:10])) + (", ..." if len(choices) > 10 else "")
+            return f"{label}: {value!r} is not one of [{shown}]"
+        return ""
+
+    coerce = _COERCIONS.get(input_type)
+    if coerce is None:
+        # 링크 전용 타입이나 사용자 정의 위젯 타입: 서버도 리터럴 값을 검사하지 않음
+        return ""
+    try:
+        # 서버처럼 int() / float() / str() / bool()로 변환되는지만 확인 (7.5 -> INT 7)
+        value = coerce(value)
+    except (TypeError, ValueError, OverflowError):
+        return f"{label}: {value!r} cannot be converted to {input_type}"
+    if input_type in ("INT", "FLOAT"):
+        if "min" in options and value < options["min"]:
+            return f"{label}: {value} is below the minimum {options['min']}"
+        if "max" in options and value > options["max"]:
+            return f"{label}: {value} is above the maximum {options['max']}"
+    return ""
+
+
+def validate_workflow(workflow: dict, object_info: dict) -> list:
+    """
+    Check an API-format workflow against a server's /object_info the way the server would:
+    node classes exist, required inputs are set, INT / FLOAT / STRING / BOOLEAN values convert
+    and lie within min / max, choices are in their list, and links point at an existing node
+    output of a compatible type. Literals of other widget types are left to the node. Returns error strings.
+    """
+    errors = []
+    for node_id, node in workflow.items():
+        class_type = node.get("class_type")
+        title = node.get("_meta", {}).get("title") or class_type
+        info = object_info.get(class_type)
+        if info is None:
+            errors.append(f"Node {node_id} ({title}): node type {class_type!r} is not installed on the server")
+            continue
+        required, optional = _input_specs(info)
+        inputs = node.get("inputs", {})
+        for name in required:
+            if name not in inputs:
+                errors.append(f"Node {node_id} ({title}): required input {name!r} is missing")
+
+        for name, value in inputs.items():
+            spec = required.get(name, optional.get(name))
+            if spec is None:
+                # 서버도 정의되지 않은 입력은 무시
+                continue
+            label = f"Node {node_id} ({title}) input {name!r}"
+            if isinstance(value, list):
+                if len(value) != 2 or str(value[0]) not in workflow:
+                    errors.append(f"{label}: links to missing node {value[0] if value else '?'!r}")
+                    continue
+                source = workflow[str(value[0])]
+                if source.get("class_type") not in object_info:
+                    continue
+                outputs = object_info[source.get("class_type")].get("output", [])
+                if not isinstance(value[1], int) or not 0 <= value[1] < len(outputs):
+                    errors.append(f"{label}: node {value[0]} has no output {value[1]!r}")
+                    continue
+                expected = spec[0] if isinstance(spec[0], str) else "COMBO"
+                received = outputs[value[1]] if isinstance(outputs[value[1]], str) else "COMBO"
+                if not _types_match(received, expected):
+                    errors.append(f"{label}: expects {expected}, linked to a {received} output of node {value[0]}")
+            else:
+                error = _check_value(label, spec, value)
+                if error:
+                    errors.append(error)
+    return errors
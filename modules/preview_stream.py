@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import json
+import struct
+import asyncio
+import traceback
+
+
+class BinaryEventType:
+    """Event ids in the first 4 bytes (big-endian) of ComfyUI binary websocket messages."""
+    PREVIEW_IMAGE = 1
+    UNENCODED_PREVIEW_IMAGE = 2
+    TEXT = 3
+    PREVIEW_IMAGE_WITH_METADATA = 4
+
+
+IMAGE_FORMATS = {1: "JPEG", 2: "PNG"}
+
+
+class PreviewFrame:
+    def __init__(self, prompt_id: str, node_id: str, image_format: str, data: bytes):
+        self.prompt_id = prompt_id
+        self.node_id = node_id
+        self.image_format = image_format
+        self.data = data
+
+
+def parse_binary_message(message: bytes, current_prompt_id: str = None, current_node_id: str = None):
+    """
+    Split a binary websocket message into a PreviewFrame. Returns None for other event types.
+    Only slices the buffer; the image itself is decoded later, off the event loop.
+    """
+    if len(message) < 8:
+        return None
+    view = memoryview(message)
+    event_type = struct.unpack(">I", view[:4])[0]
+
+    if event_type == BinaryEventType.PREVIEW_IMAGE:
+        image_type = struct.unpack(">I", view[4:8])[0]
+        return PreviewFrame(current_prompt_id, current_node_id, IMAGE_FORMATS.get(image_type, ""), bytes(view[8:]))
+
+    if event_type == BinaryEventType.PREVIEW_IMAGE_WITH_METADATA:
+        metadata_length = struct.unpack(">I", view[4:8])[0]
+        try:
+            metadata = json.loads(bytes(view[8:8 + metadata_length]))
+        except ValueError:
+            return None
+        image_format = metadata.get("image_type", "").split("/")[-1].upper()
+        return PreviewFrame(
+            metadata.get("prompt_id") or current_prompt_id,
+            metadata.get("node_id") or current_node_id,
+            image_format,
+            bytes(view[8 + metadata_length:]),
+        )
+
+    return None
+
+
+class PreviewThrottle:
+    """
+    Decode preview frames in a worker thread at no more than max_fps.
+    Frames that arrive while a decode is pending replace each other, so only the latest one is shown.
+    """
+    def __init__(self, decode, on_frame, max_fps: float = 5.0):
+        self.decode = decode
+        self.on_frame = on_frame
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.dropped = 0
+        self._pending = None
+        self._task = None
+        self._last = 0.0
+
+    def submit(self, frame: PreviewFrame):
+        if self._pending is not None:
+            self.dropped += 1
+        self._pending = frame
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self):
+        loop = asyncio.get_running_loop()
+        while self._pending is not None:
+            wait = self._last + self.min_interval - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            frame, self._pending = self._pending, None
+            self._last = loop.time()
+            try:
+                image = await asyncio.to_thread(self.decode, frame.data, frame.image_format)
+            except Exception:
+                traceback.print_exc()
+                continue
+            if image is not None:
+                self.on_frame(frame, image)
+
+    def cancel(self):
+        self._pending = None
+        if self._task and not self._task.done():
+            self._task.cancel()
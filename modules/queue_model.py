@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import time
+
+
+class QueueModel:
+    """
+    Client-side view of one server's prompt queue, kept current from websocket status events.
+
+    ComfyUI runs prompts in submission order, so prompts queued after ours never move us back.
+    Every drop in the server's queue_remaining is counted as completions, and the position of
+    each of our prompts is its `ahead` count at the last sync minus the completions seen since
+    (O(1) per lookup and per event). reconcile() resyncs against a /queue snapshot to correct
+    drift from deletions or missed events.
+    """
+    def __init__(self):
+        self.queue_remaining = 0
+        self.completed = 0
+        self.last_reconciled = None
+        self.dirty = False
+        self._entries = {}
+
+    def on_status(self, queue_remaining: int):
+        if queue_remaining < self.queue_remaining:
+            self.completed += self.queue_remaining - queue_remaining
+        self.queue_remaining = queue_remaining
+
+    def add(self, prompt_id: str, ahead: int = None):
+        """Track a newly queued prompt. ahead defaults to the last reported queue length."""
+        if ahead is None:
+            ahead = self.queue_remaining
+        self._entries[prompt_id] = (max(ahead, 0), self.completed)
+        self.dirty = True
+
+    def on_started(self, prompt_id: str):
+        if prompt_id in self._entries:
+            self._entries[prompt_id] = (0, self.completed)
+
+    def remove(self, prompt_id: str):
+        self._entries.pop(prompt_id, None)
+
+    def position(self, prompt_id: str):
+        """Prompts (running or pending) ahead of prompt_id, or None if it is not tracked."""
+        entry = self._entries.get(prompt_id)
+        if entry is None:
+            return None
+        ahead, mark = entry
+        return max(ahead - (self.completed - mark), 0)
+
+    def waiting(self) -> dict:
+        """prompt_id -> position for our prompts that still have others ahead of them."""
+        positions = {prompt_id: self.position(prompt_id) for prompt_id in self._entries}
+        return {prompt_id: position for prompt_id, position in positions.items() if position}
+
+    def needs_reconcile(self, interval: float) -> bool:
+        if not self.waiting():
+            return False
+        return self.dirty or self.last_reconciled is None or time.time() - self.last_reconciled >= interval
+
+    def reconcile(self, queue_running: list, queue_pending: list):
+        """Resync positions from a /queue snapshot. Prompts missing from the snapshot are left as they are."""
+        running = {item[1] for item in queue_running}
+        # queue_pending은 힙 순서이므로 번호 순으로 정렬
+        pending = sorted(queue_pending, key=lambda item: item[0])
+        for prompt_id in running:
+            if prompt_id in self._entries:
+                self._entries[prompt_id] = (0, self.completed)
+        for index, item in enumerate(pending):
+            if item[1] in self._entries:
+                self._entries[item[1]] = (len(queue_running) + index, self.completed)
+        self.last_reconciled = time.time()
+        self.dirty = False
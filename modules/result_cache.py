@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+# Inputs that only decide where a result is written, not what it contains
+OUTPUT_LOCATION_INPUTS = {"save_path", "filename_prefix"}
+SEED_INPUTS = {"seed", "noise_seed"}
+
+
+def canonicalize_workflow(workflow: dict, include_seeds: bool = False) -> dict:
+    """Copy of workflow with everything that does not affect the generated result stripped out."""
+    canonical = {}
+    for node_id, node in workflow.items():
+        inputs = {}
+        for name, value in node.get("inputs", {}).items():
+            if name in OUTPUT_LOCATION_INPUTS:
+                continue
+            if not include_seeds and name in SEED_INPUTS:
+                continue
+            if node.get("class_type") == "LoadImage" and name == "image":
+                # 입력 이미지는 파일명 대신 내용 해시로 키에 포함
+                continue
+            inputs[name] = value
+        canonical[node_id] = {"class_type": node.get("class_type"), "inputs": inputs}
+    return canonical
+
+
+def copy_seeds(workflow: dict, source: dict) -> dict:
+    """workflow with the seed inputs of the same nodes in source, so a rebuilt workflow keeps the seeds its cache key was made from."""
+    for node_id, node in source.items():
+        seeds = {name: value for name, value in node.get("inputs", {}).items() if name in SEED_INPUTS}
+        if seeds and node_id in workflow:
+            # 빌드된 워크플로의 노드는 템플릿과 공유될 수 있으므로 복사해서 수정
+            workflow[node_id] = {**workflow[node_id], "inputs": {**workflow[node_id].get("inputs", {}), **seeds}}
+    return workflow
+
+
+class ResultCache:
+    """
+    Disk cache of generated meshes keyed by the canonical workflow plus the input image hash.
+    Entries are evicted least-recently-used first once the total size exceeds max_bytes.
+    Hits only update the index in memory; it is written by put() / remove() / clear() and flush().
+    """
+    def __init__(self, root, max_bytes: int, include_seeds: bool = False):
+        self.root = str(root)
+        self.max_bytes = max_bytes
+        self.include_seeds = include_seeds
+        self._index_path = os.path.join(self.root, "index.json")
+        self._lock = threading.Lock()
+        self._entries = self._load()
+        self._dirty = False
+
+    def _load(self) -> dict:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, self._index_path)
+        self._dirty = False
+
+    def flush(self):
+        """Write last_used / hits changes from get() to the index."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _object_path(self, key: str, ext: str) -> str:
+        return os.path.join(self.root, "objects", key[:2], f"{key}{ext}")
+
+    def make_key(self, workflow: dict, image_digest: str) -> str:
+        canonical = canonicalize_workflow(workflow, self.include_seeds)
+        payload = json.dumps({"workflow": canonical, "image": image_digest}, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """Path of the cached result for key, or None. Marks the entry as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry:
+                return None
+            if not os.path.exists(entry["path"]):
+                del self._entries[key]
+                self._dirty = True
+                return None
+            entry["last_used"] = time.time()
+            entry["hits"] = entry.get("hits", 0) + 1
+            self._dirty = True
+            return entry["path"]
+
+    def extras(self, key: str) -> dict:
+        """{name: path} of the files stored alongside the result for key (e.g. LOD levels)."""
+        with self._lock:
+            entry = self._entries.get(key) or {}
+            return {name: path for name, path in entry.get("extras", {}).items() if os.path.exists(path)}
+
+    def put(self, key: str, source_path: str, source_name: str = "", extras: dict = None) -> str:
+        """
+        Copy source_path into the cache under key and evict old entries if over budget.
+        extras ({name: path}) are copied alongside and returned by extras(key).
+        """
+        ext = os.path.splitext(source_path)[1].lower()
+        path = self._object_path(key, ext)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        stored = {}
+        for name, extra_path in (extras or {}).items():
+            stored[name] = self._object_path(key, f".{name}")
+            self._copy(extra_path, stored[name])
+        self._copy(source_path, path)
+        now = time.time()
+        with self._lock:
+            self._entries[key] = {
+                "path": path,
+                "size": os.path.getsize(path) + sum(os.path.getsize(extra) for extra in stored.values()),
+                "source": source_name or os.path.basename(source_path),
+                "created": now,
+                "last_used": now,
+                "hits": 0,
+                "extras": stored,
+            }
+            self._evict()
+            self._save()
+        return path
+
+    @staticmethod
+    def _copy(source_path: str, path: str):
+        tmp_path = f"{path}.tmp"
+        shutil.copyfile(source_path, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _remove_files(entry: dict):
+        for path in [entry["path"], *entry.get("extras", {}).values()]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._entries.values())
+        for key, entry in sorted(self._entries.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            self._remove_files(entry)
+            total -= entry["size"]
+            del self._entries[key]
+
+    def remove(self, key: str):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry:
+                self._remove_files(entry)
+                self._save()
+
+    def clear(self):
+        with self._lock:
+            for entry in self._entries.values():
+                self._remove_files(entry)
+            self._entries = {}
+            self._save()
+
+    def entries(self) -> list:
+        """Cache entries, most recently used first."""
+        with self._lock:
+            items = [dict(entry, key=key) for key, entry in self._entries.items()]
+        return sorted(items, key=lambda entry: entry["last_used"], reverse=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = sum(entry["size"] for entry in self._entries.values())
+            hits = sum(entry.get("hits", 0) for entry in self._entries.values())
+            return {"entries": len(self._entries), "bytes": total, "max_bytes": self.max_bytes, "hits": hits}
+
+
+if __name__ == "__main__":
+    # python -m modules.result_cache [--clear]
+    from modules import constants
+
+    cache = ResultCache(constants.RESULT_CACHE_DIR, constants.RESULT_CACHE_MAX_BYTES, constants.RESULT_CACHE_INCLUDE_SEEDS)
+    if "--clear" in sys.argv[1:]:
+        cache.clear()
+        print("Result cache cleared.")
+        sys.exit(0)
+    stats = cache.stats()
+    print(f"{stats['entries']} entries, {stats['bytes'] / 2**20:.1f} / {stats['max_bytes'] / 2**20:.0f} MB, {stats['hits']} hits")
+    for entry in cache.entries():
+        last_used = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["last_used"]))
+        print(f"{entry['key'][:16]}  {entry['size'] / 2**20:8.1f} MB  {entry.get('hits', 0):4d} hits  {last_used}  {entry['source']}")
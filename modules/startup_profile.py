@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+
+# Set to 1 to print the full startup table to stderr
+STARTUP_PROFILE_ENV = "COMFY_STARTUP_PROFILE"
+
+
+class StartupProfile:
+    """
+    Named timestamps from interpreter start (this module's import) to the viewer being ready.
+    mark() is cheap enough to leave in; summary() is one log line, report() the full table.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.marks = []
+
+    def mark(self, name: str):
+        self.marks.append((name, time.perf_counter()))
+
+    def elapsed(self, name: str):
+        """Seconds from start to the first mark called name, or None."""
+        for mark_name, timestamp in self.marks:
+            if mark_name == name:
+                return timestamp - self.started
+        return None
+
+    def summary(self) -> str:
+        parts = [f"{name} {(timestamp - self.started) * 1000:.0f} ms" for name, timestamp in self.marks]
+        return "Startup: " + ", ".join(parts)
+
+    def report(self) -> str:
+        lines = [f"{'phase':<28}{'at (ms)':>10}{'took (ms)':>11}"]
+        previous = self.started
+        for name, timestamp in self.marks:
+            lines.append(f"{name:<28}{(timestamp - self.started) * 1000:>10.1f}{(timestamp - previous) * 1000:>11.1f}")
+            previous = timestamp
+        return "\n".join(lines)
+
+    def enabled(self) -> bool:
+        return os.environ.get(STARTUP_PROFILE_ENV, "") not in ("", "0")
+
+
+profile = StartupProfile()
@@ -2,8 +2,13 @@
 
 from PySide6.QtWidgets import QSizePolicy
 from PySide6.QtWebEngineWidgets import QWebEngineView
+from PySide6.QtWebChannel import QWebChannel
 from PySide6.QtGui import QColor
+from PySide6.QtCore import QObject, Signal, Slot, QUrl
 import os
+import json
+
+from modules import model_scheme
 
 THREEJS_HTML = '''
 <!DOCTYPE html>
@@ -25,10 +30,13 @@ THREEJS_HTML = '''
     </style>
     <script src="three.min.js"></script>
     <script src="GLTFLoader.js"></script>
+    <script src="DRACOLoader.js"></script>
+    <script src="meshopt_decoder.js"></script>
     <script src="OBJLoader.js"></script>
     <script src="FBXLoader.js"></script>
     <script src="fflate.min.js"></script>
     <script src="OrbitControls.js"></script>
+    <script src="qrc:///qtwebchannel/qwebchannel.js"></script>
 </head>
 <style>
   #mode-menu {
@@ -147,6 +155,8 @@ THREEJS_HTML = '''
       setGridVisible(false);
     }
     gridBtn.style.filter = gridEnabled ? '' : 'brightness(0.4)';
+    requestRender();
+    reportState();
   });
 
   let gridHelper = null;
@@ -251,25 +261,17 @@ THREEJS_HTML = '''
     return sprite;
   }
 
-  const urlParams = new URLSearchParams(window.location.search);
-  const glbPath = urlParams.get('glb');
-  const objPath = urlParams.get('obj');
-  const fbxPath = urlParams.get('fbx');
-
   // Hide 'Original' mode button for non-GLB formats
-  function updateModeMenuForFormat() {
+  function updateModeMenuForFormat(format) {
     const originalBtn = document.querySelector('.mode-btn[onclick*="original"]');
     if (originalBtn) {
-      if (glbPath) {
-        originalBtn.style.display = '';
-      } else {
-        originalBtn.style.display = 'none';
-      }
+      originalBtn.style.display = format === 'glb' ? '' : 'none';
     }
   }
-  updateModeMenuForFormat();
 
   let currentModel = null;
+  let currentFormat = null;
+  let currentMode = 'original';
   let originalMaterials = new Map();
 
   const scene = new THREE.Scene();
@@ -331,151 +333,256 @@ THREEJS_HTML = '''
   const meshNormalMaterial = new THREE.MeshNormalMaterial({
     side: THREE.DoubleSide
   });
+  const wireframeMaterial = new THREE.MeshBasicMaterial({
+    wireframe: true,
+    color: 0x2cdcff,
+    side: THREE.DoubleSide,
+    depthTest: false,
+    depthWrite: false
+  });
+  const sharedMaterials = new Set([meshMaterial, meshNormalMaterial, wireframeMaterial]);
+
+  // ===== Models (ThreeJSGLBViewer가 QWebChannel "bridge"로 요청) =====
+  // 페이지는 한 번만 로드하고 모델만 교체. 최근 모델은 GPU에 남겨 두어 다시 표시할 때 파싱하지 않음
+  const MODEL_CACHE_SIZE = 3;
+  const modelCache = new Map();
+  const loaders = {};
+  let bridge = null;
+  let loadToken = 0;
+  // 표시 중인 미리보기 LOD (캐시하지 않고 교체될 때 해제)
+  let previewEntry = null;
+
+  function getLoader(format) {
+    if (!loaders[format]) {
+      if (format === 'obj') loaders[format] = new THREE.OBJLoader();
+      else if (format === 'fbx') loaders[format] = new THREE.FBXLoader();
+      else {
+        // Draco / meshopt로 압축된 결과 (mesh_compress) 디코더
+        const loader = new THREE.GLTFLoader();
+        if (THREE.DRACOLoader) {
+          const dracoLoader = new THREE.DRACOLoader();
+          dracoLoader.setDecoderPath('draco/');
+          loader.setDRACOLoader(dracoLoader);
+        }
+        if (typeof MeshoptDecoder !== 'undefined') loader.setMeshoptDecoder(MeshoptDecoder);
+        loaders[format] = loader;
+      }
+    }
+    return loaders[format];
+  }
 
-  if (glbPath) {
-    const loader = new THREE.GLTFLoader();
-    loader.load(glbPath, function(gltf) {
-      if (currentModel) scene.remove(currentModel);
-      if (gridHelper) { scene.remove(gridHelper); gridHelper = null; }
-      if (gridLabelGroup) { scene.remove(gridLabelGroup); gridLabelGroup = null; }
-      currentModel = gltf.scene;
-      scene.add(currentModel);
-      originalMaterials.clear();
-      currentModel.traverse(function(child) {
-        if (child.isMesh) originalMaterials.set(child.uuid, child.material);
-      });
-      setLightsForMode('original');
-      camera.position.set(0, 0, 2.5);
-      createGrid(currentModel);
-      setGridVisible(true);
-      gridEnabled = true;
-      gridIcon.style.filter = 'brightness(1)';
-      animate();
-    }, undefined, function(error) {
-      alert('GLB load error: ' + error);
+  function disposeMaterial(material) {
+    if (!material || sharedMaterials.has(material)) return;
+    Object.keys(material).forEach(function(key) {
+      const value = material[key];
+      if (value && value.isTexture) value.dispose();
     });
-  } else if (objPath) {
-    const loader = new THREE.OBJLoader();
-    loader.load(objPath, function(obj) {
-      if (currentModel) scene.remove(currentModel);
-      if (gridHelper) { scene.remove(gridHelper); gridHelper = null; }
-      if (gridLabelGroup) { scene.remove(gridLabelGroup); gridLabelGroup = null; }
-      currentModel = obj;
-      scene.add(currentModel);
-      originalMaterials.clear();
-      currentModel.traverse(function(child) {
-        if (child.isMesh) originalMaterials.set(child.uuid, child.material);
-      });
-      setLightsForMode('mesh');
-      camera.position.set(0, 0, 2.5);
-      createGrid(currentModel);
-      setGridVisible(true);
-      gridEnabled = true;
-      gridIcon.style.filter = 'brightness(1)';
-      animate();
-    }, undefined, function(error) {
-      alert('OBJ load error: ' + error);
+    material.dispose();
+  }
+
+  function disposeModel(entry) {
+    entry.object.traverse(function(child) {
+      if (child.isMesh && child.geometry) child.geometry.dispose();
     });
-  } else if (fbxPath) {
-    const loader = new THREE.FBXLoader();
-    loader.load(fbxPath, function(obj) {
-      if (currentModel) scene.remove(currentModel);
-      if (gridHelper) { scene.remove(gridHelper); gridHelper = null; }
-      if (gridLabelGroup) { scene.remove(gridLabelGroup); gridLabelGroup = null; }
-      currentModel = obj;
-      scene.add(currentModel);
-      currentModel.traverse(function(child) {
-        if (child.isMesh) {
-          child.material = new THREE.MeshLambertMaterial({ color: 0xcccccc });
-          originalMaterials.set(child.uuid, child.material);
+    entry.materials.forEach(function(material) {
+      (Array.isArray(material) ? material : [material]).forEach(disposeMaterial);
+    });
+  }
+
+  function cacheModel(url, entry) {
+    modelCache.set(url, entry);
+    for (const [key, old] of modelCache) {
+      if (modelCache.size <= MODEL_CACHE_SIZE) break;
+      if (old.object === currentModel) continue;
+      modelCache.delete(key);
+      disposeModel(old);
+    }
+  }
+
+  function prepareModel(object, format) {
+    const materials = new Map();
+    object.traverse(function(child) {
+      if (child.isMesh) {
+        if (format === 'fbx') child.material = new THREE.MeshLambertMaterial({ color: 0xcccccc });
+        materials.set(child.uuid, child.material);
+      }
+    });
+    return { object: object, format: format, materials: materials };
+  }
+
+  function removeGrid() {
+    if (gridHelper) { scene.remove(gridHelper); gridHelper = null; }
+    if (gridLabelGroup) { scene.remove(gridLabelGroup); gridLabelGroup = null; }
+  }
+
+  function showModel(entry, keepView) {
+    if (currentModel) scene.remove(currentModel);
+    if (previewEntry && previewEntry !== entry) disposeModel(previewEntry);
+    previewEntry = null;
+    currentModel = entry.object;
+    currentFormat = entry.format;
+    originalMaterials = entry.materials;
+    // 캐시된 모델은 이전 뷰 모드의 재질을 가지고 있을 수 있음
+    currentModel.traverse(function(child) {
+      if (child.isMesh && originalMaterials.has(child.uuid)) child.material = originalMaterials.get(child.uuid);
+    });
+    scene.add(currentModel);
+    updateModeMenuForFormat(entry.format);
+    if (keepView) {
+      // 같은 모델의 더 세밀한 단계로 교체: 카메라, 그리드, 뷰 모드 유지
+      setViewMode(currentMode);
+      return;
+    }
+    removeGrid();
+    currentMode = entry.format === 'glb' ? 'original' : 'mesh';
+    setLightsForMode(currentMode);
+    camera.position.set(0, 0, 2.5);
+    controls.target.set(0, 0, 0);
+    controls.update();
+    createGrid(currentModel);
+    setGridVisible(true);
+    gridEnabled = true;
+    gridIcon.style.filter = 'brightness(1)';
+    requestRender();
+  }
+
+  function modelInfo(entry) {
+    let vertices = 0;
+    let triangles = 0;
+    entry.object.traverse(function(child) {
+      if (child.isMesh && child.geometry) {
+        const position = child.geometry.attributes.position;
+        const count = position ? position.count : 0;
+        vertices += count;
+        triangles += (child.geometry.index ? child.geometry.index.count : count) / 3;
+      }
+    });
+    const size = new THREE.Box3().setFromObject(entry.object).getSize(new THREE.Vector3());
+    return { format: entry.format, vertices: vertices, triangles: Math.round(triangles), size: size.toArray() };
+  }
+
+  function loadModel(url, format, token, lodUrls) {
+    loadToken = token;
+    const cached = modelCache.get(url);
+    if (cached) {
+      modelCache.delete(url);
+      modelCache.set(url, cached);
+      showModel(cached);
+      if (bridge) bridge.modelLoaded(token, JSON.stringify(modelInfo(cached)));
+      reportState();
+      return;
+    }
+    // 미리보기 LOD는 전체 모델과 동시에 받아, 도착하는 대로 더 세밀한 단계로 교체
+    let shownLevel = -1;
+    let fullShown = false;
+    (lodUrls || []).forEach(function(lodUrl, level) {
+      getLoader('glb').load(lodUrl, function(gltf) {
+        const entry = prepareModel(gltf.scene, 'glb');
+        if (token !== loadToken || fullShown || level <= shownLevel) {
+          disposeModel(entry);
+          return;
         }
+        showModel(entry, shownLevel >= 0);
+        previewEntry = entry;
+        shownLevel = level;
+        if (bridge) bridge.previewShown(token, level);
+      }, undefined, function() {
+        // 미리보기 실패는 무시하고 전체 모델을 기다림
       });
-      originalMaterials.clear();
-      currentModel.traverse(function(child) {
-        if (child.isMesh) originalMaterials.set(child.uuid, child.material);
-      });
-      setLightsForMode('mesh');
-      camera.position.set(0, 0, 2.5);
-      createGrid(currentModel);
-      setGridVisible(true);
-      gridEnabled = true;
-      gridIcon.style.filter = 'brightness(1)';
-      animate();
+    });
+
+    getLoader(format).load(url, function(result) {
+      const entry = prepareModel(format === 'glb' ? result.scene : result, format);
+      cacheModel(url, entry);
+      // 로딩 중 다른 모델이 요청되었으면 캐시에만 보관
+      if (token !== loadToken) return;
+      fullShown = true;
+      showModel(entry, shownLevel >= 0);
+      if (bridge) bridge.modelLoaded(token, JSON.stringify(modelInfo(entry)));
+      reportState();
     }, undefined, function(error) {
-      alert('FBX load error: ' + error);
+      if (bridge) bridge.modelFailed(token, String(error));
     });
-  } else {
-    if (!gridHelper) createGrid(null);
-    setGridVisible(true);
   }
 
+  function clearModel(dispose) {
+    loadToken += 1;
+    if (currentModel) scene.remove(currentModel);
+    if (previewEntry) disposeModel(previewEntry);
+    previewEntry = null;
+    currentModel = null;
+    currentFormat = null;
+    if (dispose) {
+      modelCache.forEach(disposeModel);
+      modelCache.clear();
+    }
+    removeGrid();
+    if (gridEnabled) createGrid(null);
+    requestRender();
+    reportState();
+  }
+
+  function reportState() {
+    if (!bridge) return;
+    bridge.stateChanged(JSON.stringify({
+      mode: currentModel ? currentMode : null,
+      format: currentFormat,
+      grid: gridEnabled ? gridUnit : null,
+      cached_models: modelCache.size,
+      camera: { position: camera.position.toArray(), target: controls.target.toArray() }
+    }));
+  }
+
+  // 라벨을 화면에서 일정한 픽셀 크기로 유지 (스프라이트는 항상 카메라를 향하므로 lookAt 불필요)
+  const labelWorldPos = new THREE.Vector3();
   function updateGridLabelScale() {
     if (!gridLabelGroup) return;
     const desiredPixelSize = 48;
-    gridLabelGroup.children.forEach(sprite => {
-      if (sprite.isSprite) {
-        const cam = camera;
-        const worldPos = sprite.getWorldPosition(new THREE.Vector3());
-        const distance = cam.position.distanceTo(worldPos);
-        const vFOV = cam.fov * Math.PI / 180;
-        const heightInWorld = 2 * Math.tan(vFOV / 2) * distance;
-        const pixelToWorld = heightInWorld / renderer.domElement.height;
-        const scale = desiredPixelSize * pixelToWorld;
-        sprite.scale.set(scale, scale * 0.5, 1.0);
-      } else if (sprite.children) {
-        sprite.children.forEach(child => {
-          if (child.isSprite) {
-            const cam = camera;
-            const worldPos = child.getWorldPosition(new THREE.Vector3());
-            const distance = cam.position.distanceTo(worldPos);
-            const vFOV = cam.fov * Math.PI / 180;
-            const heightInWorld = 2 * Math.tan(vFOV / 2) * distance;
-            const pixelToWorld = heightInWorld / renderer.domElement.height;
-            const scale = desiredPixelSize * pixelToWorld;
-            child.scale.set(scale, scale * 0.5, 1.0);
-          }
-        });
+    const worldPerPixelAtUnit = 2 * Math.tan(camera.fov * Math.PI / 360) / renderer.domElement.height;
+    gridLabelGroup.traverse(function(child) {
+      if (child.isSprite) {
+        const distance = camera.position.distanceTo(child.getWorldPosition(labelWorldPos));
+        const scale = desiredPixelSize * worldPerPixelAtUnit * distance;
+        child.scale.set(scale, scale * 0.5, 1.0);
       }
     });
   }
 
-  function animate() {
-    requestAnimationFrame(animate);
+  // ===== Render on demand =====
+  // 카메라 이동, 감쇠, 리사이즈, 씬 변경 시에만 프레임을 그리고, 화면이 멈추면 루프도 멈춤
+  let renderRequested = false;
+  function render() {
+    renderRequested = false;
+    // 감쇠가 남아 있으면 'change' 이벤트가 다음 프레임을 다시 요청
     controls.update();
+    updateGridLabelScale();
     renderer.render(scene, camera);
     customGizmo.quaternion.copy(camera.quaternion);
     gizmoRenderer.render(gizmoScene, gizmoCamera);
-    updateGridLabelScale();
-    if (gridLabelGroup) {
-      gridLabelGroup.traverse(function(child) {
-        if (child.isSprite) {
-          child.lookAt(camera.position);
-        }
-      });
-    }
   }
-  
-  function onWindowResize() {
-    const width = window.innerWidth;
-    const height = window.innerHeight;
 
-    camera.aspect = width / height;
-    camera.updateProjectionMatrix();
-    renderer.setSize(width, height);
-    
-    renderer.render(scene, camera);
+  function requestRender() {
+    if (!renderRequested) {
+      renderRequested = true;
+      requestAnimationFrame(render);
+    }
   }
+  controls.addEventListener('change', requestRender);
+  // FBX 등 모델 표시 후에 도착하는 텍스처
+  THREE.DefaultLoadingManager.onProgress = requestRender;
 
-  window.addEventListener('resize', onWindowResize);
-
-  window.addEventListener('resize', function() {
+  function onWindowResize() {
     camera.aspect = window.innerWidth / window.innerHeight;
     camera.updateProjectionMatrix();
     renderer.setSize(window.innerWidth, window.innerHeight);
-  });
+    requestRender();
+  }
+
+  window.addEventListener('resize', onWindowResize);
 
   function setViewMode(mode) {
     if (!currentModel) return;
+    currentMode = mode;
     setLightsForMode(mode);
     currentModel.traverse(function (child) {
       if (child.isMesh) {
@@ -489,16 +596,12 @@ THREEJS_HTML = '''
         } else if (mode === 'normal') {
           child.material = meshNormalMaterial;
         } else if (mode === 'wireframe') {
-          child.material = new THREE.MeshBasicMaterial({
-            wireframe: true,
-            color: 0x2cdcff,
-            side: THREE.DoubleSide,
-            depthTest: false,
-            depthWrite: false
-          });
+          child.material = wireframeMaterial;
         }
       }
     });
+    requestRender();
+    reportState();
   }
 
   // ===== Custom Gizmo Scene =====
@@ -594,67 +697,249 @@ THREEJS_HTML = '''
   customGizmo.add(zLabel);
 
   gizmoScene.add(customGizmo);
+
+  createGrid(null);
+  setGridVisible(true);
+  controls.addEventListener('end', reportState);
+  requestRender();
+
+  if (typeof QWebChannel !== 'undefined' && typeof qt !== 'undefined') {
+    new QWebChannel(qt.webChannelTransport, function(channel) {
+      bridge = channel.objects.bridge;
+      bridge.loadModelRequested.connect(loadModel);
+      bridge.clearRequested.connect(clearModel);
+      bridge.viewModeRequested.connect(setViewMode);
+      bridge.pageReady();
+    });
+  }
 </script>
 </body>
 </html>
 '''
 
+THREEJS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), 'ThreeJS'))
+THREEJS_LIBS = [
+    ('three.min.js', "https://cdn.jsdelivr.net/npm/three@0.128.0/build/three.min.js"),
+    ('GLTFLoader.js', "https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/loaders/GLTFLoader.js"),
+    ('DRACOLoader.js', "https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/loaders/DRACOLoader.js"),
+    ('draco/draco_decoder.js', "https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/libs/draco/gltf/draco_decoder.js"),
+    ('draco/draco_wasm_wrapper.js', "https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/libs/draco/gltf/draco_wasm_wrapper.js"),
+    ('draco/draco_decoder.wasm', "https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/libs/draco/gltf/draco_decoder.wasm"),
+    ('meshopt_decoder.js', "https://cdn.jsdelivr.net/npm/meshoptimizer@0.22.0/meshopt_decoder.js"),
+    ('OBJLoader.js', "https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/loaders/OBJLoader.js"),
+    ('FBXLoader.js', "https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/loaders/FBXLoader.js"),
+    ('fflate.min.js', 'https://cdn.jsdelivr.net/npm/fflate@0.8.0/umd/index.min.js'),
+    ('OrbitControls.js', 'https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/controls/OrbitControls.js'),
+]
+
+
+def prepare_assets(threejs_dir: str = THREEJS_DIR) -> str:
+    """
+    Download missing three.js files and write the viewer page if its content changed.
+    Blocking (network / disk); run it in a worker thread. Returns the page path.
+    """
+    import urllib.request
+    os.makedirs(threejs_dir, exist_ok=True)
+    for fname, url in THREEJS_LIBS:
+        dst = os.path.join(threejs_dir, fname)
+        if not os.path.exists(dst):
+            try:
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                urllib.request.urlretrieve(url, dst)
+            except Exception as e:
+                print(f"Failed to download {fname}: {e}")
+
+    html_path = os.path.join(threejs_dir, 'threejs_temp.html')
+    try:
+        with open(html_path, 'r', encoding='utf-8') as f:
+            unchanged = f.read() == THREEJS_HTML
+    except OSError:
+        unchanged = False
+    if not unchanged:
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write(THREEJS_HTML)
+    return html_path
+
+
+MODEL_FORMATS = {'.glb': 'glb', '.gltf': 'glb', '.obj': 'obj', '.fbx': 'fbx'}
+
+
+class ViewerBridge(QObject):
+    """
+    Registered on the page's QWebChannel as "bridge". The *Requested signals drive the page;
+    the camelCase slots are called from JavaScript and re-emitted as Python signals.
+    """
+    loadModelRequested = Signal(str, str, int, list)
+    clearRequested = Signal(bool)
+    viewModeRequested = Signal(str)
+
+    ready = Signal()
+    loaded = Signal(int, dict)
+    preview = Signal(int, int)
+    failed = Signal(int, str)
+    state_changed = Signal(dict)
+
+    @Slot()
+    def pageReady(self):
+        self.ready.emit()
+
+    @Slot(int, str)
+    def modelLoaded(self, token, info):
+        self.loaded.emit(token, json.loads(info))
+
+    @Slot(int, int)
+    def previewShown(self, token, level):
+        self.preview.emit(token, level)
+
+    @Slot(int, str)
+    def modelFailed(self, token, error):
+        self.failed.emit(token, error)
+
+    @Slot(str)
+    def stateChanged(self, state):
+        self.state_changed.emit(json.loads(state))
+
+
 class ThreeJSGLBViewer(QWebEngineView):
+    """
+    three.js model viewer. Construction does no I/O: call set_page() with the path returned by
+    prepare_assets() once it is ready. The page is loaded once; models are swapped in place over
+    QWebChannel, and models loaded before the page is ready are shown as soon as it is.
+    Model bytes reach the page through the comfy-model: scheme (see model_scheme), never as file:/// URLs.
+    """
+    # Emitted with the model path once the page has parsed and shown the model
+    model_loaded = Signal(str)
+    # Emitted with the model path and the LOD level (0 = coarsest) each time a finer preview is shown
+    preview_shown = Signal(str, int)
+    # Emitted with the model path and the loader's error message
+    model_failed = Signal(str, str)
+    # Emitted with the page state (view mode, grid, camera, ...) whenever it changes
+    state_changed = Signal(dict)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.page().setBackgroundColor(QColor("#000000"))
         self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        self._threejs_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), 'ThreeJS'))
-        if not os.path.exists(self._threejs_dir):
-            os.makedirs(self._threejs_dir)
-        self._ensure_threejs_dependencies()
-        self._write_html_file()
+        self.loadStarted.connect(self._on_load_started)
         self.loadFinished.connect(self._on_load_finished)
 
-    def _ensure_threejs_dependencies(self):
-        import urllib.request
-        js_libs = [
-            ('three.min.js', "https://cdn.jsdelivr.net/npm/three@0.128.0/build/three.min.js"),
-            ('GLTFLoader.js', "https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/loaders/GLTFLoader.js"),
-            ('OBJLoader.js', "https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/loaders/OBJLoader.js"),
-            ('FBXLoader.js', "https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/loaders/FBXLoader.js"),
-            ('fflate.min.js', 'https://cdn.jsdelivr.net/npm/fflate@0.8.0/umd/index.min.js'),
-            ('OrbitControls.js', 'https://cdn.jsdelivr.net/npm/three@0.128.0/examples/js/controls/OrbitControls.js'),
-        ]
-        for fname, url in js_libs:
-            dst = os.path.join(self._threejs_dir, fname)
-            if not os.path.exists(dst):
-                try:
-                    urllib.request.urlretrieve(url, dst)
-                except Exception as e:
-                    print(f"Failed to download {fname}: {e}")
-                    
+        self.bridge = ViewerBridge(self)
+        self.bridge.ready.connect(self._on_page_ready)
+        self.bridge.loaded.connect(self._on_model_loaded)
+        self.bridge.preview.connect(self._on_preview_shown)
+        self.bridge.failed.connect(self._on_model_failed)
+        self.bridge.state_changed.connect(self._on_state_changed)
+        self.channel = QWebChannel(self.page())
+        self.channel.registerObject("bridge", self.bridge)
+        self.page().setWebChannel(self.channel)
+        self.models = model_scheme.handler_for(self.page().profile())
+
+        self._html_path = None
+        self._page_ready = False
+        self._model_path = ""
+        self._model_url = None
+        self._model_format = None
+        self._lod_urls = []
+        self._token = 0
+        # 마지막으로 표시된 모델의 정점/삼각형 수, 크기
+        self.model_info = {}
+        self.state = {}
+
+    def set_page(self, html_path: str):
+        """Load the prepared viewer page once; the current model (if any) is sent when the page is ready."""
+        self._html_path = html_path
+        self.load(QUrl.fromLocalFile(html_path))
+
+    def _on_load_started(self):
+        self._page_ready = False
+
     def _on_load_finished(self, ok):
         if ok:
             # 페이지 로딩 직후, Qt 위젯의 실제 크기에 맞춰 Three.js 캔버스 크기 갱신
             self.page().runJavaScript("if (typeof onWindowResize === 'function') { onWindowResize(); }")
-            
+
+    def _on_page_ready(self):
+        self._page_ready = True
+        # 페이지 준비 전 요청된 모델 (또는 페이지가 다시 로드된 경우 현재 모델)
+        if self._model_url is not None:
+            self._send_model()
+
+    def _on_model_loaded(self, token, info):
+        if token == self._token:
+            self.model_info = info
+            self.model_loaded.emit(self._model_path)
+
+    def _on_preview_shown(self, token, level):
+        if token == self._token:
+            self.preview_shown.emit(self._model_path, level)
+
+    def _on_model_failed(self, token, error):
+        if token == self._token:
+            self.model_failed.emit(self._model_path, error)
+
+    def _on_state_changed(self, state):
+        self.state = state
+        self.state_changed.emit(state)
+
     def resizeEvent(self, event):
         super().resizeEvent(event)
         # resize 이벤트가 발생할 때마다 JS의 리사이즈 함수 호출
         # (WebEngine의 내부 resize 이벤트보다 Python 이벤트가 더 즉각적일 수 있음)
         self.page().runJavaScript("if (typeof onWindowResize === 'function') { onWindowResize(); }")
 
-    def _write_html_file(self):
-        self._html_path = os.path.join(self._threejs_dir, 'threejs_temp.html')
-        with open(self._html_path, 'w', encoding='utf-8') as f:
-            f.write(THREEJS_HTML)
-
-    def load_model(self, model_path):
-        model_url = 'file:///' + os.path.abspath(model_path).replace('\\', '/')
+    def _send_model(self):
+        self._token += 1
+        lod_urls = [url.toString() for url in self._lod_urls]
+        self.bridge.loadModelRequested.emit(self._model_url.toString(), self._model_format, self._token, lod_urls)
+
+    def _published_urls(self) -> list:
+        return [url for url in [self._model_url, *self._lod_urls] if url is not None]
+
+    def _set_model(self, model_path: str, url, lod_urls=()):
+        # 이전 모델과 LOD의 키 해제 (메모리 버퍼는 표시 중인 동안만 유지)
+        keep = {self.models.key_of(new_url) for new_url in [url, *lod_urls]}
+        for old_url in self._published_urls():
+            if self.models.key_of(old_url) not in keep:
+                self.models.release(old_url)
+        self._model_path = model_path
+        self._model_url = url
+        self._lod_urls = list(lod_urls)
+        self._model_format = MODEL_FORMATS[os.path.splitext(model_path)[1].lower()]
+        if self._page_ready:
+            self._send_model()
+
+    @staticmethod
+    def _check_format(model_path: str):
         ext = os.path.splitext(model_path)[1].lower()
-        html_path = self._html_path.replace('\\', '/')
-        if ext == '.obj':
-            html_url = f'file:///{html_path}?obj={model_url}'
-        elif ext == '.fbx':
-            html_url = f'file:///{html_path}?fbx={model_url}'
-        elif ext in ['.glb', '.gltf']:
-            html_url = f'file:///{html_path}?glb={model_url}'
-        else:
+        if ext not in MODEL_FORMATS:
             raise ValueError(f"Unsupported model format: {ext}.\nSupported formats are: .glb, .gltf, .obj, .fbx.")
-        self.load(html_url)
\ No newline at end of file
+
+    def load_model(self, model_path, lods=()):
+        """
+        Show a model file; local, UNC and network paths are read by Python and streamed to the page.
+        lods are preview GLBs (mesh_lod.build_lods, coarsest first) shown while the full model loads.
+        """
+        self._check_format(model_path)
+        lod_urls = [self.models.publish_file(lod) for lod in lods]
+        self._set_model(model_path, self.models.publish_file(model_path), lod_urls)
+
+    def load_model_data(self, data: bytes, name: str):
+        """Show a model from memory, e.g. bytes downloaded from /view. name's extension selects the loader."""
+        self._check_format(name)
+        self._set_model(name, self.models.publish_bytes(data, name))
+
+    def clear_model(self, dispose: bool = False):
+        """Remove the shown model; dispose=True also frees every model the page keeps cached."""
+        for url in self._published_urls():
+            self.models.release(url)
+        self._model_path = ""
+        self._model_url = None
+        self._lod_urls = []
+        self._token += 1
+        if self._page_ready:
+            self.bridge.clearRequested.emit(dispose)
+
+    def set_view_mode(self, mode: str):
+        """'original' (GLB only), 'mesh', 'normal' or 'wireframe'."""
+        if self._page_ready:
+            self.bridge.viewModeRequested.emit(mode)
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+CLIENT_TID = 1
+SERVER_TID = 2
+
+
+def _us(timestamp: float) -> int:
+    return int(timestamp * 1_000_000)
+
+
+class TraceRecorder:
+    """
+    Collects one Chrome trace-event timeline per job and writes it as JSON
+    (open in chrome://tracing or https://ui.perfetto.dev).
+
+    Client phases (upload, submit, wait, download, viewer load, ...) go on the "client" track,
+    websocket events for the job's prompt (queue wait, one span per executed node, progress
+    counters, cached / executed markers) on the "server" track.
+    """
+    def __init__(self, out_dir, max_traces: int = 64):
+        self.out_dir = str(out_dir)
+        self.max_traces = max_traces
+        self._traces = OrderedDict()
+        self._prompts = {}
+
+    def start(self, key: str, name: str):
+        self._traces[key] = {
+            "name": name,
+            "prompt_id": None,
+            "workflow": {},
+            "submitted": None,
+            "started": None,
+            "node": None,
+            "open": {},
+            "events": [
+                {"name": "process_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": name}},
+                {"name": "thread_name", "ph": "M", "pid": 1, "tid": CLIENT_TID, "args": {"name": "client"}},
+                {"name": "thread_name", "ph": "M", "pid": 1, "tid": SERVER_TID, "args": {"name": "server"}},
+            ],
+        }
+        while len(self._traces) > self.max_traces:
+            _, old = self._traces.popitem(last=False)
+            self._prompts.pop(old["prompt_id"], None)
+
+    def link_prompt(self, key: str, prompt_id: str, workflow: dict = None):
+        """Attach the server prompt_id (and its workflow, for node titles) to a started trace."""
+        trace = self._traces.get(key)
+        if trace is None:
+            return
+        trace["prompt_id"] = prompt_id
+        trace["workflow"] = workflow or {}
+        trace["submitted"] = time.time()
+        self._prompts[prompt_id] = key
+
+    def _add(self, trace, event: dict):
+        event.setdefault("pid", 1)
+        trace["events"].append(event)
+
+    def _complete(self, trace, name, start, end, tid, cat="client", args=None):
+        self._add(trace, {
+            "name": name, "cat": cat, "ph": "X", "tid": tid,
+            "ts": _us(start), "dur": max(_us(end) - _us(start), 0), "args": args or {},
+        })
+
+    def begin(self, key: str, name: str):
+        trace = self._traces.get(key)
+        if trace is not None:
+            trace["open"][name] = time.time()
+
+    def end(self, key: str, name: str, **args):
+        trace = self._traces.get(key)
+        if trace is None or name not in trace["open"]:
+            return
+        self._complete(trace, name, trace["open"].pop(name), time.time(), CLIENT_TID, args=args)
+
+    @contextmanager
+    def span(self, key: str, name: str, **args):
+        self.begin(key, name)
+        try:
+            yield
+        finally:
+            self.end(key, name, **args)
+
+    def instant(self, key: str, name: str, tid: int = CLIENT_TID, **args):
+        trace = self._traces.get(key)
+        if trace is not None:
+            self._add(trace, {"name": name, "ph": "i", "s": "t", "tid": tid, "ts": _us(time.time()), "args": args})
+
+    # ----- websocket events -----
+
+    def _node_label(self, trace, node_id):
+        node = trace["workflow"].get(node_id) or {}
+        title = node.get("_meta", {}).get("title") or node.get("class_type") or f"Node {node_id}"
+        return title, node.get("class_type", "")
+
+    def _close_node(self, trace, now):
+        if trace["node"] is None:
+            return
+        node_id, started = trace["node"]
+        trace["node"] = None
+        title, class_type = self._node_label(trace, node_id)
+        self._complete(trace, title, started, now, SERVER_TID, cat="node",
+                       args={"node": node_id, "class_type": class_type})
+
+    def record_message(self, msg_type: str, payload: dict):
+        """Record one parsed websocket message. Messages for prompts without a trace are ignored."""
+        key = self._prompts.get(payload.get("prompt_id"))
+        trace = self._traces.get(key) if key else None
+        if trace is None:
+            return
+        now = time.time()
+
+        if msg_type == "execution_start":
+            trace["started"] = now
+            if trace["submitted"] is not None:
+                self._complete(trace, "queue wait", trace["submitted"], now, SERVER_TID, cat="server")
+        elif msg_type == "executing":
+            self._close_node(trace, now)
+            node_id = payload.get("node")
+            if node_id:
+                trace["node"] = (node_id, now)
+            elif trace["started"] is not None:
+                self._complete(trace, "execution", trace["started"], now, SERVER_TID, cat="server")
+        elif msg_type == "progress":
+            node_id = payload.get("node") or ""
+            title, _ = self._node_label(trace, node_id)
+            self._add(trace, {
+                "name": f"progress {title}", "ph": "C", "tid": SERVER_TID, "ts": _us(now),
+                "args": {"value": payload.get("value", 0), "max": payload.get("max", 1)},
+            })
+        elif msg_type == "executed":
+            title, _ = self._node_label(trace, payload.get("node"))
+            self._add(trace, {
+                "name": f"executed {title}", "ph": "i", "s": "t", "tid": SERVER_TID, "ts": _us(now),
+                "args": {"outputs": sorted((payload.get("output") or {}).keys())},
+            })
+        elif msg_type == "execution_cached":
+            nodes = payload.get("nodes") or []
+            self._add(trace, {
+                "name": "cached", "ph": "i", "s": "t", "tid": SERVER_TID, "ts": _us(now),
+                "args": {"nodes": [self._node_label(trace, node_id)[0] for node_id in nodes]},
+            })
+        elif msg_type in ("execution_error", "execution_interrupted"):
+            self._close_node(trace, now)
+            self._add(trace, {
+                "name": msg_type, "ph": "i", "s": "t", "tid": SERVER_TID, "ts": _us(now),
+                "args": {"message": payload.get("exception_message", "")},
+            })
+
+    def write(self, key: str):
+        """Write the trace collected so far to <out_dir>/<prompt_id or key>.json. Returns the path or None."""
+        trace = self._traces.get(key)
+        if trace is None:
+            return None
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, f"{trace['prompt_id'] or key}.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace["events"], "displayTimeUnit": "ms"}, f)
+        os.replace(tmp_path, path)
+        return path
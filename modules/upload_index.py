@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import hashlib
+import threading
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class UploadIndex:
+    """
+    Local record of images already uploaded to ComfyUI, keyed by server and content hash.
+    Stored as a small JSON file so repeated generations from the same reference image skip the upload.
+    """
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _key(api_url: str, digest: str) -> str:
+        return f"{api_url.rstrip('/')}|{digest}"
+
+    def get(self, api_url: str, digest: str):
+        with self._lock:
+            entry = self._entries.get(self._key(api_url, digest))
+        return dict(entry) if entry else None
+
+    def put(self, api_url: str, digest: str, name: str, subfolder: str = ""):
+        with self._lock:
+            self._entries[self._key(api_url, digest)] = {
+                "name": name,
+                "subfolder": subfolder,
+                "uploaded_at": time.time(),
+            }
+            self._save()
+
+    def forget(self, api_url: str, digest: str):
+        with self._lock:
+            if self._entries.pop(self._key(api_url, digest), None) is not None:
+                self._save()
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+import os
+import re
+import json
+from random import randint
+
+WORKFLOW_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "workflows")
+
+# UI mode -> workflow file (without .json)
+MODE_WORKFLOWS = {
+    "Trellis2": "trellis2_img2mesh",
+}
+
+# Named parameters of each shipped workflow -> the inputs they set.
+# Selectors are "Title.input", "ClassType.input", "ClassType[input=value].input" or "node_id.input".
+_IMAGE2MESH_BINDINGS = {
+    "image": ["Load Image.image"],
+    "mesh_prefix": ["Hy3DExportMesh[file_format=obj].filename_prefix"],
+    "glb_prefix": ["Hy3DExportMesh[file_format=glb].filename_prefix"],
+    "seed": ["Hy3DDelightImage.seed", "Hy3DGenerateMesh.seed", "Hy3DSampleMultiView.seed"],
+}
+WORKFLOW_BINDINGS = {
+    "trellis2_img2mesh": {
+        "image": ["Load Image.image"],
+        "save_path": ["SaveToCustomPath.save_path"],
+        "seed": ["Trellis2ImageToShape.seed", "Trellis2ShapeToTexturedMesh.seed"],
+    },
+    "image2mesh": _IMAGE2MESH_BINDINGS,
+    "image2mesh_delight": _IMAGE2MESH_BINDINGS,
+    "text2image": {
+        "prompt": ["Image Prompt (Auto Translate).text"],
+        "seed": ["RandomNoise.noise_seed"],
+        "width": ["EmptySD3LatentImage.width", "ModelSamplingFlux.width"],
+        "height": ["EmptySD3LatentImage.height", "ModelSamplingFlux.height"],
+        "steps": ["BasicScheduler.steps"],
+        "sampler": ["KSamplerSelect.sampler_name"],
+        "scheduler": ["BasicScheduler.scheduler"],
+        "guidance": ["FluxGuidance.guidance"],
+        "filename_prefix": ["Save Image.filename_prefix"],
+    },
+}
+# Bound parameters that get a new random value per target on every build unless given
+RANDOM_PARAMS = ("seed",)
+
+_SELECTOR = re.compile(r"(?P<node>.+?)(?:\[(?P<key>[^=\]]+)=(?P<value>[^\]]*)\])?\.(?P<input>[^.\[\]]+)")
+
+
+class ParameterError(ValueError):
+    """A workflow parameter that matches no input or has the wrong type."""
+
+
+def workflow_path(name: str) -> str:
+    return name if name.endswith(".json") else os.path.join(WORKFLOW_DIR, f"{name}.json")
+
+
+def load_workflow(name: str) -> dict:
+    """Load workflows/<name>.json (or an explicit .json path)."""
+    with open(workflow_path(name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _check_type(key: str, current, value):
+    if isinstance(current, list):
+        raise ParameterError(f"{key!r} sets an input that is linked to another node")
+    if current is None:
+        return
+    if isinstance(current, bool):
+        ok = isinstance(value, bool)
+    elif isinstance(current, (int, float)):
+        # 템플릿의 정수 기본값도 실수 입력일 수 있으므로 숫자면 허용 (정확한 타입은 /object_info 검증에서)
+        ok = isinstance(value, (int, float)) and not isinstance(value, bool)
+    else:
+        ok = isinstance(value, type(current))
+    if not ok:
+        raise ParameterError(f"{key!r} expects {type(current).__name__}, got {type(value).__name__} {value!r}")
+
+
+class WorkflowTemplate:
+    """
+    A workflow parsed once, with nodes indexed by id, `_meta.title` and class_type.
+    render() returns a new workflow that shares every untouched node with the template
+    (only overridden nodes are copied), so treat both as read-only.
+    """
+    def __init__(self, name: str, workflow: dict, bindings: dict = None, mtime: int = None):
+        self.name = name
+        self.workflow = workflow
+        self.bindings = bindings or {}
+        self.mtime = mtime
+        self._by_name = {}
+        self._by_input = {}
+        for node_id, node in workflow.items():
+            title = node.get("_meta", {}).get("title")
+            for name_ in {title, node.get("class_type")} - {None}:
+                self._by_name.setdefault(name_, []).append(node_id)
+            for input_name in node.get("inputs", {}):
+                self._by_input.setdefault(input_name, []).append(node_id)
+        self._targets = {}
+
+    def _resolve(self, selector: str) -> list:
+        match = _SELECTOR.fullmatch(selector)
+        if match is None:
+            node_ids, input_name = self._by_input.get(selector, []), selector
+            if not node_ids:
+                raise ParameterError(f"No node has an input named {selector!r}")
+            return [(node_id, input_name) for node_id in node_ids]
+
+        node, input_name = match["node"], match["input"]
+        node_ids = [node] if node in self.workflow else self._by_name.get(node, [])
+        if match["key"] is not None:
+            node_ids = [
+                node_id for node_id in node_ids
+                if str(self.workflow[node_id].get("inputs", {}).get(match["key"])) == match["value"]
+            ]
+        if not node_ids:
+            raise ParameterError(f"No node matches {selector!r}")
+        targets = [(node_id, input_name) for node_id in node_ids if input_name in self.workflow[node_id].get("inputs", {})]
+        if not targets:
+            raise ParameterError(f"Node {node!r} has no input named {input_name!r}")
+        return targets
+
+    def targets(self, key: str) -> list:
+        """[(node_id, input), ...] set by parameter key: a bound name, a selector or a plain input name."""
+        targets = self._targets.get(key)
+        if targets is None:
+            if key in self.bindings:
+                targets = [target for selector in self.bindings[key] for target in self._resolve(selector)]
+            else:
+                targets = self._resolve(key)
+            self._targets[key] = targets
+        return targets
+
+    def validate(self, params: dict):
+        """Raise ParameterError for the first parameter that matches nothing or has the wrong type."""
+        for key, value in (params or {}).items():
+            for node_id, input_name in self.targets(key):
+                _check_type(key, self.workflow[node_id]["inputs"][input_name], value)
+
+    def render(self, params: dict = None, **context) -> dict:
+        """
+        Workflow with params applied. context holds values every caller passes (image, save_path);
+        they are only set where this workflow binds them. Missing RANDOM_PARAMS are randomized.
+        """
+        values = {key: value for key, value in context.items() if key in self.bindings}
+        values.update(params or {})
+        self.validate(values)
+
+        workflow = dict(self.workflow)
+        copied = set()
+
+        def set_input(node_id, input_name, value):
+            if node_id not in copied:
+                node = workflow[node_id]
+                workflow[node_id] = {**node, "inputs": dict(node["inputs"])}
+                copied.add(node_id)
+            workflow[node_id]["inputs"][input_name] = value
+
+        for key in RANDOM_PARAMS:
+            if key in self.bindings and key not in values:
+                for node_id, input_name in self.targets(key):
+                    set_input(node_id, input_name, randint(0, 2**31-1))
+        for key, value in values.items():
+            for node_id, input_name in self.targets(key):
+                set_input(node_id, input_name, value)
+        return workflow
+
+
+_templates = {}
+
+
+def get_template(name: str) -> WorkflowTemplate:
+    """Cached template for a workflow name or .json path; reloaded when the file's mtime changes."""
+    path = workflow_path(name)
+    mtime = os.stat(path).st_mtime_ns
+    template = _templates.get(path)
+    if template is None or template.mtime != mtime:
+        bindings = WORKFLOW_BINDINGS.get(os.path.splitext(os.path.basename(path))[0])
+        template = WorkflowTemplate(name, load_workflow(path), bindings, mtime)
+        _templates[path] = template
+    return template
+
+
+def build_workflow(name: str, params: dict = None, **context) -> dict:
+    return get_template(name).render(params, **context)
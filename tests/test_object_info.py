@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from modules.object_info import validate_workflow
+
+OBJECT_INFO = {
+    "Sampler": {
+        "input": {"required": {
+            "steps": ["INT", {"default": 12, "min": 1, "max": 100}],
+            "cfg": ["FLOAT", {"min": 0.0, "max": 30.0}],
+            "mode": ["TRELLIS_MODE", {"default": "fast"}],
+            "model": ["MODEL"],
+        }},
+        "output": ["LATENT"],
+    },
+    "Loader": {"input": {"required": {}}, "output": ["MODEL"]},
+}
+
+
+def sampler(**inputs) -> dict:
+    return {"1": {"class_type": "Loader", "inputs": {}},
+            "2": {"class_type": "Sampler", "inputs": {"steps": 12, "cfg": 7.0, "mode": "fast", "model": ["1", 0], **inputs}}}
+
+
+def test_valid_workflow_has_no_errors():
+    assert validate_workflow(sampler(), OBJECT_INFO) == []
+
+
+def test_float_on_int_input_is_converted_like_the_server():
+    # 서버는 int(7.5)로 받아들임 (trellis2_img2mesh의 ss_sampling_steps)
+    assert validate_workflow(sampler(steps=7.5), OBJECT_INFO) == []
+    assert validate_workflow(sampler(steps="8"), OBJECT_INFO) == []
+
+
+def test_unconvertible_and_out_of_range_values_are_reported():
+    errors = validate_workflow(sampler(steps="many", cfg=31), OBJECT_INFO)
+    assert len(errors) == 2
+    assert "cannot be converted to INT" in errors[0]
+    assert "above the maximum" in errors[1]
+
+
+def test_custom_widget_type_literal_is_not_checked():
+    assert validate_workflow(sampler(mode="anything"), OBJECT_INFO) == []
+    assert validate_workflow(sampler(mode=3), OBJECT_INFO) == []
+
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import os
+import asyncio
+
+from benchmarks.stub_server import StubConfig
+from benchmarks.run_benchmark import start_session, end_session, make_build_workflow, WORKFLOW_PATH
+from modules.job_manager import JobManager, JobState
+from modules.result_cache import ResultCache, SEED_INPUTS
+from modules.upload_index import file_sha256
+from modules.workflows import get_template
+
+
+async def run_jobs(work_dir, cache, params_of):
+    """Run jobs one after another on a stub server; params_of(previous_jobs) gives each job's params (None: stop)."""
+    server, client, monitor, listen_task = await start_session(StubConfig(node_delay=0.0, progress_steps=0, output_size=64), work_dir)
+    image_path = os.path.join(work_dir, "input.png")
+    with open(image_path, "wb") as f:
+        f.write(b"image")
+    try:
+        manager = JobManager(client, make_build_workflow(get_template(WORKFLOW_PATH)), cache=cache, validate=False)
+        jobs = []
+        while (params := params_of(jobs)) is not None:
+            # 앞 작업이 캐시에 저장된 뒤 다음 작업 제출
+            jobs += manager.submit([(image_path, os.path.join(work_dir, f"out_{len(jobs)}.glb"), params)])
+            await manager.wait(jobs)
+        return jobs, server.requests["/prompt"], file_sha256(image_path)
+    finally:
+        await end_session(server, client, monitor, listen_task)
+
+
+def same_seeds(jobs):
+    """Params for a job identical to the first one: its randomly chosen seeds, set per node."""
+    if not jobs:
+        return {}
+    if len(jobs) == 1:
+        return {
+            f"{node_id}.{name}": value
+            for node_id, node in jobs[0].workflow.items()
+            for name, value in node["inputs"].items() if name in SEED_INPUTS
+        }
+    return None
+
+
+def test_identical_job_hits_cache_with_seeds_in_key(tmp_path):
+    cache = ResultCache(tmp_path / "cache", 1 << 20, include_seeds=True)
+    jobs, prompts, digest = asyncio.run(run_jobs(str(tmp_path), cache, same_seeds))
+
+    assert [job.state for job in jobs] == [JobState.DONE, JobState.DONE]
+    assert not jobs[0].cached and jobs[1].cached
+    assert prompts == 1
+    # 결과는 그것을 만든(제출된) 워크플로의 시드로 저장됨
+    assert [entry["key"] for entry in cache.entries()] == [cache.make_key(jobs[0].workflow, digest)]
+
+
+class VanishingCache(ResultCache):
+    """Cache whose objects disappear right after lookup, like a concurrent eviction or a cleared cache dir."""
+    def get(self, key: str):
+        path = super().get(key)
+        if path:
+            os.remove(path)
+        return path
+
+
+def test_vanished_cache_entry_falls_back_to_generating(tmp_path):
+    cache = VanishingCache(tmp_path / "cache", 1 << 20, include_seeds=True)
+    jobs, prompts, digest = asyncio.run(run_jobs(str(tmp_path), cache, same_seeds))
+
+    assert [job.state for job in jobs] == [JobState.DONE, JobState.DONE]
+    assert not jobs[1].cached
+    assert prompts == 2
+    # 새로 만든 결과가 다시 캐시됨
+    assert os.path.exists(cache.entries()[0]["path"])